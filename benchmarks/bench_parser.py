@@ -0,0 +1,185 @@
+"""Benchmark the story parser against the regex-scan parser it replaced.
+
+Checks ikshanam.parser.parse_story against the expected sections in a
+corpus, then times both parsers over it.
+
+The bundled parser_corpus.jsonl is synthetic: hand-written completions in
+each format the model has been seen to produce, not captured model output.
+Its correctness counts show which layouts each parser handles, not how
+often real completions trip them up. Pass --corpus with a JSONL file of
+captured completions ({"name", "text", "expected": {"title", "story",
+"moral"}} per line) to measure real failure rates.
+
+    python benchmarks/bench_parser.py [--iterations 2000] [--corpus captured.jsonl]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ikshanam.parser import parse_story  # noqa: E402
+
+CORPUS_PATH = Path(__file__).with_name("parser_corpus.jsonl")
+
+
+# Legacy parser - copied verbatim from streamlit_app.py before the parser module
+def legacy_parse_story(text):
+    """Parse the story response into components - handles various formats and languages."""
+    result = {"title": "", "story": "", "moral": ""}
+
+
+    # Try multiple patterns to extract title
+    # Pattern 1: **TITLE:** or TITLE: at start of line
+    title_patterns = [
+        r'\*{0,2}TITLE\*{0,2}\s*:\s*\*{0,2}([^\n*]+)',  # TITLE: text
+        r'^#{1,3}\s+(.+)$',  # # Heading format
+        r'^\*\*([^*\n]+)\*\*$',  # **Title** on its own line
+    ]
+
+    for pattern in title_patterns:
+        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        if match:
+            title = match.group(1).strip()
+            title = title.replace('**', '').replace('*', '').strip()
+            # Remove surrounding double quotes
+            title = title.strip('"').strip('"').strip('"')
+            if title and len(title) > 3 and not title.upper().startswith(('STORY', 'MORAL')):
+                result["title"] = title
+                break
+
+    # Extract MORAL - check multiple patterns including translated labels
+    moral_patterns = [
+        r'\*{0,2}MORAL\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # MORAL: text
+        r'\*{0,2}नीति\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Hindi
+        r'\*{0,2}নীতিকথা\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Bengali
+        r'\*{0,2}Moraleja\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Spanish
+        r'\*{0,2}Morale\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # French/Italian
+        r'The moral of (?:the|this) story (?:is|:)\s*([^\n]+)',  # Common English pattern
+        r'Moral of the story\s*:\s*([^\n]+)',  # Another English pattern
+        r'\*{0,2}Lesson\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Lesson: format
+        r'\*{0,2}Teaching\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Teaching: format
+    ]
+
+    for pattern in moral_patterns:
+        moral_match = re.search(pattern, text, re.IGNORECASE)
+        if moral_match:
+            moral = moral_match.group(1).strip()
+            moral = moral.replace('**', '').replace('*', '').strip()
+            result["moral"] = moral
+            break
+
+    # Extract story - between STORY: and MORAL: (or end)
+    story_match = re.search(r'\*{0,2}STORY\*{0,2}\s*:\s*\n(.*?)(?=\*{0,2}MORAL\*{0,2}\s*:|$)', text, re.IGNORECASE | re.DOTALL)
+    if story_match:
+        story = story_match.group(1).strip()
+    else:
+        # Fallback: everything after TITLE line
+        story = text
+        # Remove TITLE line
+        story = re.sub(r'\*{0,2}TITLE\*{0,2}\s*:[^\n]*\n?', '', story, flags=re.IGNORECASE)
+        # Remove STORY: marker
+        story = re.sub(r'\*{0,2}STORY\*{0,2}\s*:\s*\n?', '', story, flags=re.IGNORECASE)
+
+    # Remove all moral-related lines from story
+    moral_removal_patterns = [
+        r'\*{0,2}MORAL\*{0,2}\s*:[^\n]*\n?',  # MORAL: text
+        r'\*{0,2}नीति\*{0,2}\s*:[^\n]*\n?',  # Hindi
+        r'\*{0,2}নীতিকথা\*{0,2}\s*:[^\n]*\n?',  # Bengali
+        r'\*{0,2}Moraleja\*{0,2}\s*:[^\n]*\n?',  # Spanish
+        r'\*{0,2}Morale\*{0,2}\s*:[^\n]*\n?',  # French/Italian
+        r'The moral of (?:the|this) story (?:is|:)[^\n]*\n?',  # Common English pattern
+        r'Moral of the story\s*:[^\n]*\n?',  # Another English pattern
+        r'\*{0,2}Lesson\*{0,2}\s*:[^\n]*\n?',  # Lesson: format
+        r'\*{0,2}Teaching\*{0,2}\s*:[^\n]*\n?',  # Teaching: format
+    ]
+    for pattern in moral_removal_patterns:
+        story = re.sub(pattern, '', story, flags=re.IGNORECASE)
+
+    # Clean story
+    story = story.replace('**', '').strip()
+
+    # Remove title from story if it appears at the beginning
+    if result["title"]:
+        lines = story.split('\n')
+        if lines and lines[0].strip().replace('*', '') == result["title"]:
+            story = '\n'.join(lines[1:]).strip()
+
+    result["story"] = story
+
+    # If still no title, take first non-empty line as title
+    if not result["title"] and result["story"]:
+        lines = result["story"].split('\n')
+        for i, line in enumerate(lines):
+            line_clean = line.replace('**', '').replace('*', '').strip()
+            if line_clean and 3 < len(line_clean) < 200:
+                if not line_clean.upper().startswith(('TITLE', 'STORY', 'MORAL', 'IN THE', 'ONCE', 'LONG AGO')):
+                    result["title"] = line_clean
+                    result["story"] = '\n'.join(lines[i+1:]).strip()
+                break
+
+    # Final fallback - generate title from first sentence
+    if not result["title"] and result["story"]:
+        first_sentence = result["story"].split('.')[0]
+        if first_sentence and len(first_sentence) < 100:
+            result["title"] = first_sentence[:60] + "..." if len(first_sentence) > 60 else first_sentence
+
+    if not result["title"]:
+        result["title"] = "A Unique Tale"
+
+    if not result["story"]:
+        result["story"] = text
+
+    return result
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check(parser, corpus):
+    """Return the names of samples the parser gets wrong."""
+    return [sample["name"] for sample in corpus if parser(sample["text"]) != sample["expected"]]
+
+
+def throughput(parser, corpus, iterations):
+    """Return parses per second over the whole corpus."""
+    texts = [sample["text"] for sample in corpus]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            parser(text)
+    elapsed = time.perf_counter() - start
+    return iterations * len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH, help="JSONL corpus (default: the synthetic sample corpus)")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    label = "synthetic samples" if args.corpus == CORPUS_PATH else "samples"
+    print(f"Corpus: {len(corpus)} {label} ({args.corpus.name})")
+
+    results = {}
+    for name, parse in [("legacy", legacy_parse_story), ("current", parse_story)]:
+        failures = check(parse, corpus)
+        rate = throughput(parse, corpus, args.iterations)
+        results[name] = rate
+        print(f"{name:>8}: {len(corpus) - len(failures)}/{len(corpus)} correct, {rate:,.0f} parses/s")
+        if failures:
+            print(f"          wrong: {', '.join(failures)}")
+
+    print(f"Speedup: {results['current'] / results['legacy']:.2f}x")
+    return 1 if check(parse_story, corpus) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Benchmark the video render backends on a static-background narration.
+
+Builds a synthetic background image and narration track with ffmpeg, then
+renders the same five-scene video with every available backend and reports
+wall time and CPU time (including ffmpeg child processes). With --reference,
+each output is also compared against that backend's video (PSNR in dB), to
+check that the ffmpeg filter graph matches the Movis composition.
+
+    python benchmarks/bench_render.py [--duration 120] [--backends ffmpeg,movis] [--reference movis]
+"""
+
+import argparse
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ikshanam.encoder import find_ffmpeg, run_ffmpeg  # noqa: E402
+from ikshanam.media import RENDER_BACKENDS, available_render_backends  # noqa: E402
+
+SCENES = 5
+
+
+def make_inputs(work_dir, duration):
+    """Write a 854x480 background and an mp3 narration of the given length."""
+    image_path = work_dir / "background.png"
+    audio_path = work_dir / "narration.mp3"
+    run_ffmpeg(["-f", "lavfi", "-i", "testsrc2=size=854x480", "-frames:v", "1", str(image_path)])
+    run_ffmpeg(["-f", "lavfi", "-i", f"sine=frequency=220:duration={duration}",
+                "-c:a", "libmp3lame", "-b:a", "48k", str(audio_path)])
+    return str(image_path), str(audio_path)
+
+
+def psnr(reference_path, video_path):
+    """Average PSNR of video_path against reference_path, frame by frame."""
+    result = subprocess.run(
+        [find_ffmpeg(), "-hide_banner", "-i", str(video_path), "-i", str(reference_path),
+         "-lavfi", "[0:v][1:v]scale2ref[a][b];[a][b]psnr", "-f", "null", "-"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    match = re.search(r'average:(\S+)', result.stderr.decode('utf-8', errors='replace'))
+    return match.group(1) if match else "n/a"
+
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument("--duration", type=float, default=120.0, help="narration length in seconds")
+    parser.add_argument("--backends", default=",".join(available_render_backends(still=True)))
+    parser.add_argument("--reference", help="backend whose output the others are compared against")
+    args = parser.parse_args()
+
+    if not find_ffmpeg():
+        print("ffmpeg not found - install it or imageio-ffmpeg")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        image_path, audio_path = make_inputs(work_dir, args.duration)
+        image_paths = [image_path] * SCENES
+        scene_durations = [args.duration / SCENES] * SCENES
+        scene_starts = [i * args.duration / SCENES for i in range(SCENES)]
+
+        print(f"{SCENES} scenes, {args.duration:.0f}s narration")
+        print(f"{'backend':>15}  {'wall':>8}  {'cpu':>8}  {'size':>9}")
+        rendered = {}
+        for name in args.backends.split(','):
+            video_path = work_dir / f"{name}.mp4"
+            wall_start, cpu_start = time.perf_counter(), cpu_seconds()
+            try:
+                RENDER_BACKENDS[name](image_paths, audio_path, scene_starts, scene_durations, args.duration, str(video_path))
+            except Exception as e:
+                print(f"{name:>15}  failed: {e}")
+                continue
+            wall, cpu = time.perf_counter() - wall_start, cpu_seconds() - cpu_start
+            size_kb = os.path.getsize(video_path) / 1024
+            print(f"{name:>15}  {wall:7.2f}s  {cpu:7.2f}s  {size_kb:7.0f}KB")
+            rendered[name] = video_path
+
+        if args.reference in rendered:
+            print(f"PSNR against {args.reference}:")
+            for name, video_path in rendered.items():
+                if name != args.reference:
+                    print(f"{name:>15}  {psnr(rendered[args.reference], video_path)} dB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Benchmark cold-start cost of the modules the Streamlit app imports.
+
+Every run starts a fresh interpreter, imports the ikshanam modules that
+streamlit_app.py imports (Streamlit itself excluded) and reports the import
+time and the process's peak RSS before and after. The "lazy" mode is what a
+worker pays now; "eager" also imports every optional library (Groq, Edge TTS,
+gTTS, TextBlob, deep-translator, MoviePy, Movis, ffmpeg-python, imageio), as
+the app used to at startup.
+
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_MODULES = [
+    "ikshanam.dictionary", "ikshanam.engine", "ikshanam.groq_service", "ikshanam.image_service", "ikshanam.imaging",
+    "ikshanam.jobs", "ikshanam.media", "ikshanam.media_server", "ikshanam.parser", "ikshanam.story",
+    "ikshanam.story_cache", "ikshanam.story_pool", "ikshanam.story_translations",
+]
+
+CHILD = """
+import importlib, json, resource, sys, time
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+from ikshanam import capabilities
+if sys.argv[1] == "eager":
+    capabilities.load_all()
+seconds = time.perf_counter() - start
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": seconds, "rss_before_kb": rss_before, "rss_after_kb": rss_after,
+                   "optional_loaded": capabilities.loaded()}}))
+"""
+
+
+def measure(mode):
+    """Import the app's modules in a fresh interpreter and return its measurements."""
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(modules=APP_MODULES), mode],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per mode (the median is reported)")
+    args = parser.parse_args()
+
+    print(f"{'mode':>6}  {'import':>9}  {'rss before':>11}  {'rss after':>10}  optional modules loaded")
+    for mode in ("lazy", "eager"):
+        try:
+            runs = [measure(mode) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{mode:>6}  failed: {e.stderr.strip().splitlines()[-1] if e.stderr.strip() else e}")
+            continue
+        seconds = statistics.median(run["seconds"] for run in runs)
+        rss_before = statistics.median(run["rss_before_kb"] for run in runs) / 1024
+        rss_after = statistics.median(run["rss_after_kb"] for run in runs) / 1024
+        loaded = ', '.join(runs[-1]["optional_loaded"]) or "none"
+        print(f"{mode:>6}  {seconds * 1000:7.0f}ms  {rss_before:9.1f}MB  {rss_after:8.1f}MB  {loaded}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
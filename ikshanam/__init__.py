@@ -0,0 +1,9 @@
+"""Ikshanam - A Smart Cultural Storyteller.
+
+The story engine, with no Streamlit dependency: streamlit_app.py and the
+batch CLI (python -m ikshanam) are both clients of it. ikshanam.engine ties
+the pipeline together (story pool, story cache, generation, translation,
+illustration); narration and video rendering are in ikshanam.media. Import
+the modules you need directly - nothing is imported here, so starting a
+worker stays cheap.
+"""
@@ -0,0 +1,7 @@
+"""Run the headless batch generator: python -m ikshanam --help"""
+
+import sys
+
+from ikshanam.cli import main
+
+sys.exit(main())
@@ -0,0 +1,110 @@
+"""Content-addressed on-disk cache with a size cap and LRU eviction."""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+# Root for every on-disk cache (narration, images, ...)
+CACHE_DIR = Path(os.getenv("IKSHANAM_CACHE_DIR", ".cache"))
+
+
+class DiskCache:
+    """Store files under a directory, keyed by a hash of their inputs.
+    
+    Writes go to a temporary file in the same directory and are moved into
+    place with os.replace, so readers never see a half-written entry (also
+    across processes). A hit refreshes the entry's mtime; once the directory
+    grows past max_bytes, the least recently used files are deleted.
+    """
+    
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(*parts):
+        """Hash the given inputs into a stable cache key."""
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def path(self, key, suffix=""):
+        return self.directory / f"{key}{suffix}"
+    
+    def get(self, key, suffix=""):
+        """Return the path of a cached entry, or None on a miss."""
+        path = self.path(key, suffix)
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            return None
+        return path
+    
+    def get_bytes(self, key, suffix=""):
+        path = self.get(key, suffix)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+    
+    def put_bytes(self, key, data, suffix=""):
+        """Atomically store data under key and return the entry's path."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(key, suffix))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+        return self.path(key, suffix)
+    
+    def put_file(self, key, source_path, suffix=""):
+        """Atomically copy an existing file into the cache under key."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, self.path(key, suffix))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+        return self.path(key, suffix)
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            try:
+                for entry in os.scandir(self.directory):
+                    if not entry.is_file() or entry.name.endswith(".tmp"):
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            except OSError:
+                return
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, path in entries:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
@@ -0,0 +1,71 @@
+"""Optional dependencies: probed without importing them, imported on first use.
+
+The video, speech, NLP and API client libraries are large, and most sessions
+never render a video, so importing them eagerly made every worker start pay
+for all of them. has(name) only asks the import system whether the module
+can be found; lazy(name) returns a stand-in that imports the real module the
+first time one of its attributes is used. An installed module that fails to
+import only fails at that point, where the callers already fall back (the
+next render backend, gTTS instead of Edge TTS, a neutral mood).
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+from functools import lru_cache
+
+_registry = {}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def has(name):
+    """True if the module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """Stand-in for a module that is imported the first time one of its attributes is used."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._name in sys.modules else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy(name):
+    """Shared lazy stand-in for module name."""
+    with _lock:
+        if name not in _registry:
+            _registry[name] = LazyModule(name)
+        return _registry[name]
+
+
+def loaded():
+    """Names of the registered optional modules that have actually been imported."""
+    return sorted(name for name in _registry if name in sys.modules)
+
+
+def load_all():
+    """Import every registered optional module that is installed (what the app used to do at startup)."""
+    for name, module in list(_registry.items()):
+        if has(name):
+            try:
+                module._load()
+            except Exception:
+                pass  # Installed but broken - the callers' fallbacks handle it
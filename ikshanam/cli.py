@@ -0,0 +1,216 @@
+"""Headless batch generation - stories, narration and videos without the Streamlit UI.
+
+    python -m ikshanam --cultures all --types "Folk Tale,Legend" --tones all --languages English,Tamil --count 2 --video
+    python -m ikshanam --jobs classroom.jsonl --audio --concurrency 8
+
+Every combination of the chosen cultures, story types, tones and languages
+(or every line of a --jobs JSONL file) is a job, repeated --count times. Jobs
+run on a thread pool, since story generation, translation and image fetches
+wait on the network; video renders go to a process pool. Each job writes its
+media into its own directory and appends one record to results.jsonl.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Settings are read when the ikshanam modules are imported, so .env has to be loaded first
+load_dotenv()
+
+from ikshanam.engine import localize, new_story, story_image  # noqa: E402
+from ikshanam.media import NARRATION_VOICES, generate_audio, generate_video  # noqa: E402
+from ikshanam.story import CULTURES, LANGUAGES, STORY_TYPES, TONES  # noqa: E402
+
+OTHER = "Other (type below)"
+JOB_FIELDS = ("culture", "story_type", "tone", "language", "custom_prompt", "voice")
+
+
+def resolve_options(value, options):
+    """Expand a comma-separated list ("all" = every catalog entry), matching catalog names case-insensitively.
+
+    Names that are not in the catalog are kept as given, like the app's "Other" fields.
+    """
+    catalog = [option for option in options if option != OTHER]
+    by_name = {option.lower(): option for option in catalog}
+    names = []
+    for name in (part.strip() for part in value.split(',')):
+        if name.lower() == "all":
+            names.extend(catalog)
+        elif name:
+            names.append(by_name.get(name.lower(), name))
+    return names
+
+
+def matrix_jobs(args):
+    """One job per culture x story type x tone x language combination."""
+    combinations = itertools.product(
+        resolve_options(args.cultures, CULTURES),
+        resolve_options(args.types, STORY_TYPES),
+        resolve_options(args.tones, TONES),
+        resolve_options(args.languages, LANGUAGES),
+    )
+    return [
+        {"culture": culture, "story_type": story_type, "tone": tone, "language": language,
+         "custom_prompt": args.prompt, "voice": args.voice}
+        for culture, story_type, tone, language in combinations
+    ]
+
+
+def file_jobs(path, args):
+    """Jobs from a JSONL file; missing fields fall back to the command-line defaults."""
+    defaults = next(iter(matrix_jobs(args)), {})
+    jobs = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                raise SystemExit(f"{path}:{line_number}: {e}")
+            jobs.append({field: entry.get(field, defaults.get(field, "")) for field in JOB_FIELDS})
+    return jobs
+
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')[:24] or "custom"
+
+
+class BatchRunner:
+    """Run story jobs concurrently and append one JSONL record per story."""
+
+    def __init__(self, output_dir, image=False, audio=False, video=False, render_workers=1, use_cache=False):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.image = image
+        self.audio = audio
+        self.video = video
+        # Off by default: a batch asks for new stories, not the cached variants the app rotates through
+        self.use_cache = use_cache
+        self._results_lock = threading.Lock()
+        self._results_path = self.output_dir / "results.jsonl"
+        # spawn keeps render workers free of the runner's threads
+        self._renders = ProcessPoolExecutor(max_workers=render_workers, mp_context=multiprocessing.get_context("spawn")) if video else None
+
+    def run(self, jobs, concurrency):
+        """Run every job and return the list of records written."""
+        records = []
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                futures = [pool.submit(self.run_job, index, job) for index, job in enumerate(jobs)]
+                for future in as_completed(futures):
+                    record = future.result()
+                    records.append(record)
+                    status = f"failed: {record['error']}" if record['error'] else record['title']
+                    print(f"[{len(records)}/{len(jobs)}] {record['culture']} / {record['story_type']} / "
+                          f"{record['tone']} / {record['language']} - {status} ({record['seconds']:.1f}s)", flush=True)
+        finally:
+            if self._renders:
+                self._renders.shutdown()
+        return records
+
+    def run_job(self, index, job):
+        """Generate one story and its media; never raises, failures are recorded in the record."""
+        started = time.perf_counter()
+        job_dir = self.output_dir / f"{index:05d}-{slug(job['culture'])}-{slug(job['story_type'])}-{slug(job['language'])}"
+        record = dict(job, source=None, title=None, story=None, moral=None, dir=str(job_dir), image=None, audio=None,
+                      video=None, captions=None, error=None)
+        try:
+            self._generate(index, job, job_dir, record)
+        except Exception as e:
+            record['error'] = str(e)
+        record['seconds'] = round(time.perf_counter() - started, 2)
+        self._write(record)
+        return record
+
+    def _generate(self, index, job, job_dir, record):
+        # Seeds are offset by the job index, so jobs started in the same millisecond still get different illustrations
+        parsed_story, record['source'], error = new_story(
+            job['culture'], job['story_type'], job['tone'], job['custom_prompt'],
+            image_seed=int(time.time() * 1000) + index, use_cache=self.use_cache)
+        if error:
+            record['error'] = error
+            return
+        parsed_story = localize(parsed_story, job['language'])
+        record.update(title=parsed_story['title'], story=parsed_story['story'], moral=parsed_story.get('moral'))
+
+        job_dir.mkdir(parents=True, exist_ok=True)
+        with open(job_dir / "story.json", 'w', encoding='utf-8') as f:
+            json.dump(parsed_story, f, ensure_ascii=False, indent=2)
+
+        if self.image:
+            image_bytes, mime = story_image(parsed_story, job['culture'])
+            image_path = job_dir / ("image.jpg" if mime == "image/jpeg" else "image.png")
+            image_path.write_bytes(image_bytes)
+            record['image'] = str(image_path)
+
+        if self.video:
+            # The render narrates the story itself (narration.mp3 in the same directory)
+            video_path, srt_path, error = self._renders.submit(
+                generate_video, parsed_story, str(job_dir), job['voice'], job['culture']).result()
+            if error:
+                record['error'] = f"video: {error}"
+            record.update(video=video_path, captions=srt_path)
+            if (job_dir / "narration.mp3").exists():
+                record['audio'] = str(job_dir / "narration.mp3")
+        elif self.audio:
+            audio_path, _, error = generate_audio(parsed_story['story'], str(job_dir / "narration.mp3"), voice_id=job['voice'])
+            if error:
+                record['error'] = f"audio: {error}"
+            record['audio'] = audio_path
+
+    def _write(self, record):
+        with self._results_lock:
+            with open(self._results_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ikshanam", description=__doc__.split('\n')[0])
+    parser.add_argument("--cultures", default="Indian", help='comma-separated cultures, or "all"')
+    parser.add_argument("--types", default="Folk Tale", help='comma-separated story types, or "all"')
+    parser.add_argument("--tones", default="Simple & Easy", help='comma-separated tones, or "all"')
+    parser.add_argument("--languages", default="English", help='comma-separated languages, or "all"')
+    parser.add_argument("--prompt", default="", help="custom story prompt for every job")
+    parser.add_argument("--jobs", help="JSONL file of jobs (culture, story_type, tone, language, custom_prompt, voice)")
+    parser.add_argument("--count", type=int, default=1, help="stories per job")
+    parser.add_argument("--voice", default=next(iter(NARRATION_VOICES.values())), help="Edge TTS voice id")
+    parser.add_argument("--image", action="store_true", help="fetch an illustration per story")
+    parser.add_argument("--audio", action="store_true", help="narrate each story")
+    parser.add_argument("--video", action="store_true", help="render a narrated video per story (includes audio)")
+    parser.add_argument("--story-cache", action="store_true",
+                        help="serve mythology, legend and historical stories from the app's story cache instead of generating each one")
+    parser.add_argument("--concurrency", type=int, default=4, help="stories generated at the same time")
+    parser.add_argument("--render-workers", type=int, default=2, help="video render processes")
+    parser.add_argument("--output", default="outputs/batch", help="directory for results.jsonl and media")
+    args = parser.parse_args(argv)
+
+    jobs = file_jobs(args.jobs, args) if args.jobs else matrix_jobs(args)
+    jobs = [job for job in jobs for _ in range(max(1, args.count))]
+    if not jobs:
+        parser.error("no jobs to run")
+
+    runner = BatchRunner(args.output, image=args.image, audio=args.audio, video=args.video,
+                         render_workers=max(1, args.render_workers), use_cache=args.story_cache)
+    print(f"Generating {len(jobs)} stories into {runner.output_dir} ({args.concurrency} at a time)", flush=True)
+    started = time.perf_counter()
+    records = runner.run(jobs, max(1, args.concurrency))
+    elapsed = time.perf_counter() - started
+
+    failed = sum(1 for record in records if record['error'])
+    print(f"{len(records) - failed} stories, {failed} failed in {elapsed:.1f}s "
+          f"({(len(records) - failed) / elapsed * 60:.1f} stories per minute)")
+    return 1 if failed == len(records) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
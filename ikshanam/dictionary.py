@@ -0,0 +1,245 @@
+"""English dictionary lookups from a local WordNet index, with the Free Dictionary API as a fallback.
+
+The first time it is needed, the WordNet corpus that TextBlob already relies
+on is compiled into a small SQLite index under the cache directory (in a
+background thread; nltk is only imported for that). After that, a lookup is
+an in-memory LRU hit or a single indexed query - inflected forms such as
+"wandered" or "geese" resolve to their headword. Words WordNet does not know
+go to dictionaryapi.dev over a pooled session, and its answers are kept in an
+on-disk cache. Entries use the Free Dictionary API's shape (word, phonetic,
+meanings -> partOfSpeech, definitions -> definition, example) whichever
+source they come from.
+
+After a story is generated, prefetch_glossary picks its rare words and
+resolves them in the background, so the words readers get stuck on are
+already answered when they look them up.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ikshanam.cache import CACHE_DIR, DiskCache
+from ikshanam.scenes import STOPWORDS
+
+DICTIONARY_API_URL = "https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
+DICTIONARY_INDEX = CACHE_DIR / "wordnet.sqlite3"
+DICTIONARY_CACHE_MB = 16
+LRU_SIZE = 4096
+GLOSSARY_SIZE = 15
+# Words WordNet has seen at most this often in its tagged corpus count as rare
+RARE_COUNT = 2
+WORDNET_POS = {'n': "noun", 'v': "verb", 'a': "adjective", 's': "adjective", 'r': "adverb"}
+DEFINITIONS_PER_POS = 4
+
+# WordNet's detachment rules (as in nltk's morphy), for inflected forms that are not exceptions
+SUFFIX_RULES = [
+    ("s", ""), ("ses", "s"), ("xes", "x"), ("zes", "z"), ("ches", "ch"), ("shes", "sh"), ("men", "man"),
+    ("ies", "y"), ("es", "e"), ("es", ""), ("ed", "e"), ("ed", ""), ("ing", "e"), ("ing", ""),
+    ("er", ""), ("est", ""), ("er", "e"), ("est", "e"),
+]
+WORD = re.compile(r"[A-Za-z][A-Za-z'-]*[A-Za-z]")
+
+
+def normalize_word(word):
+    return ' '.join(word.strip().lower().split())
+
+
+def wordnet_entry(wordnet, name):
+    """Free Dictionary API-shaped entry for a WordNet lemma name, and how often WordNet saw it."""
+    meanings = OrderedDict()
+    count = 0
+    for synset in wordnet.synsets(name):
+        part_of_speech = WORDNET_POS.get(synset.pos(), synset.pos())
+        definitions = meanings.setdefault(part_of_speech, [])
+        if len(definitions) < DEFINITIONS_PER_POS:
+            examples = synset.examples()
+            definitions.append({"definition": synset.definition(), "example": examples[0] if examples else ""})
+        count += sum(lemma.count() for lemma in synset.lemmas() if lemma.name().lower() == name)
+    entry = {
+        "word": name.replace('_', ' '),
+        "phonetic": "",
+        "meanings": [{"partOfSpeech": pos, "definitions": definitions} for pos, definitions in meanings.items()],
+    }
+    return entry, count
+
+
+def build_index(path):
+    """Compile WordNet into a SQLite index at path (raises if nltk or the corpus is missing)."""
+    from nltk.corpus import wordnet
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute("CREATE TABLE entries (word TEXT PRIMARY KEY, entry TEXT NOT NULL, count INTEGER NOT NULL)")
+        connection.execute("CREATE TABLE aliases (form TEXT PRIMARY KEY, word TEXT NOT NULL)")
+        rows = []
+        for name in wordnet.all_lemma_names():
+            entry, count = wordnet_entry(wordnet, name)
+            rows.append((name.replace('_', ' '), json.dumps(entry, ensure_ascii=False), count))
+        connection.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", rows)
+        # Irregular forms (geese -> goose, went -> go) from WordNet's exception lists
+        aliases = []
+        for exceptions in getattr(wordnet, "_exception_map", {}).values():
+            for form, lemmas in exceptions.items():
+                if lemmas:
+                    aliases.append((form.replace('_', ' '), lemmas[0].replace('_', ' ')))
+        connection.executemany("INSERT OR IGNORE INTO aliases VALUES (?, ?)", aliases)
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+
+
+class DictionaryService:
+    """Look up English words locally first, remotely second, remembering every answer."""
+
+    def __init__(self, index_path, cache, timeout=10, workers=4, lru_size=LRU_SIZE):
+        self.index_path = index_path
+        self.cache = cache
+        self.timeout = timeout
+        self.lru_size = lru_size
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dictionary")
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self._connection = None
+        self._index_state = None  # None: not tried yet, "building", "ready" or "unavailable"
+
+    def _index(self):
+        """Open the index, starting its build in the background the first time; None until it is ready."""
+        with self._lock:
+            if self._index_state == "ready":
+                return self._connection
+            if self._index_state is None:
+                if os.path.exists(self.index_path):
+                    self._open()
+                    return self._connection
+                self._index_state = "building"
+                threading.Thread(target=self._build, name="dictionary-index", daemon=True).start()
+            return None
+
+    def _open(self):
+        self._connection = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, check_same_thread=False)
+        self._index_state = "ready"
+
+    def _build(self):
+        try:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            build_index(self.index_path)
+        except Exception:
+            with self._lock:
+                self._index_state = "unavailable"  # No nltk or WordNet corpus - remote lookups only
+            return
+        with self._lock:
+            self._open()
+
+    def _query(self, sql, args):
+        connection = self._index()
+        if connection is None:
+            return None
+        with self._lock:
+            return connection.execute(sql, args).fetchone()
+
+    def _local(self, word):
+        """(entry, count) for word or the headword of one of its inflections, or None."""
+        candidates = [word]
+        alias = self._query("SELECT word FROM aliases WHERE form = ?", (word,))
+        if alias:
+            candidates.append(alias[0])
+        candidates += [word[:-len(suffix)] + ending for suffix, ending in SUFFIX_RULES
+                       if word.endswith(suffix) and len(word) > len(suffix) + 1]
+        for candidate in candidates:
+            row = self._query("SELECT entry, count FROM entries WHERE word = ?", (candidate,))
+            if row:
+                return json.loads(row[0]), row[1]
+        return None
+
+    def _remote(self, word):
+        """(entry or None, error) from the Free Dictionary API, cached on disk."""
+        key = DiskCache.key("dictionary", word)
+        cached = self.cache.get_bytes(key, ".json")
+        if cached is not None:
+            return json.loads(cached) or None, None
+        try:
+            response = self.session.get(DICTIONARY_API_URL.format(word=urllib.parse.quote(word)), timeout=self.timeout)
+        except requests.RequestException as e:
+            return None, str(e)
+        if response.status_code == 404:
+            entry = None
+        elif response.status_code == 200:
+            data = response.json()
+            entry = data[0] if data else None
+        else:
+            return None, f"Dictionary service returned {response.status_code}"
+        # Misses are remembered too, so unknown words are not asked for again
+        self.cache.put_bytes(key, json.dumps(entry, ensure_ascii=False).encode('utf-8'), ".json")
+        return entry, None
+
+    def lookup(self, word):
+        """Return (entry, error); entry is None when the word is not in the dictionary."""
+        word = normalize_word(word)
+        if not word:
+            return None, None
+        with self._lock:
+            if word in self._lru:
+                self._lru.move_to_end(word)
+                return self._lru[word], None
+        local = self._local(word)
+        entry, error = (local[0], None) if local else self._remote(word)
+        if error:
+            return None, error
+        with self._lock:
+            self._lru[word] = entry
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+        return entry, None
+
+    def glossary(self, text, size=GLOSSARY_SIZE):
+        """The story's rarest words - WordNet's least seen, or the longest while the index is not ready."""
+        counts = {}
+        for word in WORD.findall(text):
+            lower = word.lower()
+            if len(lower) > 4 and lower not in STOPWORDS:
+                counts[lower] = counts.get(lower, 0) + 1
+        if self._index() is None:
+            return sorted(counts, key=lambda word: (-len(word), word))[:size]
+        scored = []
+        for word in counts:
+            local = self._local(word)
+            # Words WordNet does not know (names, borrowed words like "dharma") are worth explaining too
+            corpus_count = local[1] if local else 0
+            if corpus_count <= RARE_COUNT:
+                scored.append((corpus_count, -len(word), word))
+        return [word for _, _, word in sorted(scored)[:size]]
+
+    def prefetch_glossary(self, text, size=GLOSSARY_SIZE):
+        """Pick the story's rare words, resolve them in the background and return them."""
+        words = self.glossary(text, size)
+        for word in words:
+            self._pool.submit(self.lookup, word)
+        return words
+
+
+dictionary_service = DictionaryService(str(DICTIONARY_INDEX), DiskCache(CACHE_DIR / "dictionary", DICTIONARY_CACHE_MB * 1024 * 1024))
+
+
+def lookup_word(word):
+    """Look up an English word (entry, error) through the shared dictionary service."""
+    return dictionary_service.lookup(word)
+
+
+def prefetch_glossary(text):
+    """Start resolving a story's rare words in the background; returns the words."""
+    return dictionary_service.prefetch_glossary(text)
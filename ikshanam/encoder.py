@@ -0,0 +1,251 @@
+"""Encode narrated videos by driving the ffmpeg binary directly.
+
+A static-background video is one looped still image plus the narration, so
+there is no need to push frames through Python: ffmpeg decodes the image
+once, x264's stillimage tuning makes every repeated frame nearly free, and
+the narration is muxed in by the same process. Several scene images become
+a slideshow of such stills, cut at the scene starts.
+
+Animated videos express the scene timeline (slow zoom per scene, crossfade
+into each following scene) as a single filter graph, so all pixel work
+happens inside ffmpeg as well. encode_parallel_video renders the same
+timeline one scene per ffmpeg process, then stitches the segments with the
+concat demuxer (no re-encode) and muxes the narration once.
+"""
+
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+VIDEO_SIZE = (1280, 720)
+# A still picture needs very few frames per second; keyframes every few seconds keep seeking snappy
+STILL_FPS = 2
+STILL_KEYFRAME_SECONDS = 5
+# Slideshows cut between scenes on frame boundaries - a finer rate keeps the cuts on the narration
+SLIDESHOW_FPS = 10
+
+# Animated timeline, matching the Movis composition: each scene zooms from 1.0 to 1.05 over its
+# duration and stays on screen FADE_SECONDS longer while the next scene fades in over it
+ANIMATED_FPS = 30
+ZOOM_END = 1.05
+FADE_SECONDS = 0.5
+# zoompan crops whole pixels; zooming into an upscaled copy keeps the motion smooth
+ZOOM_SUPERSAMPLE = 2
+
+
+@lru_cache(maxsize=1)
+def find_ffmpeg():
+    """Path of an ffmpeg binary (from PATH, else the one bundled with imageio-ffmpeg), or None."""
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None  # Not installed, or no bundled binary for this platform
+
+
+def run_ffmpeg(args):
+    """Run ffmpeg with the given arguments, raising RuntimeError with its stderr on failure."""
+    ffmpeg_path = find_ffmpeg()
+    if not ffmpeg_path:
+        raise RuntimeError("ffmpeg not found")
+    result = subprocess.run(
+        [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', errors='replace').strip().splitlines()
+        raise RuntimeError(message[-1] if message else f"ffmpeg exited with status {result.returncode}")
+
+
+def fit_filter(size):
+    """Scale and centre-crop to exactly size, in the pixel format every browser plays."""
+    width, height = size
+    return f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},setsar=1,format=yuv420p"
+
+
+def encode_still_video(image_path, audio_path, output_path, duration=None, size=VIDEO_SIZE):
+    """Encode a looped still image with the narration muxed in."""
+    args = [
+        "-loop", "1", "-framerate", str(STILL_FPS), "-i", str(image_path),
+        "-i", str(audio_path),
+        "-map", "0:v", "-map", "1:a",
+        "-vf", fit_filter(size),
+        "-c:v", "libx264", "-tune", "stillimage", "-preset", "veryfast", "-crf", "23",
+        "-g", str(STILL_FPS * STILL_KEYFRAME_SECONDS),
+        "-c:a", "aac", "-b:a", "128k",
+        "-shortest",
+    ]
+    if duration:
+        args += ["-t", f"{duration:.3f}"]
+    args += ["-movflags", "+faststart", str(output_path)]
+    run_ffmpeg(args)
+    return str(output_path)
+
+
+def slideshow_filter_graph(count, size=VIDEO_SIZE):
+    """Filter graph that plays count still scene images one after another; input i is image i, output is [video]."""
+    chains = [f"[{i}:v]{fit_filter(size)}[scene{i}]" for i in range(count)]
+    chains.append(''.join(f"[scene{i}]" for i in range(count)) + f"concat=n={count}:v=1:a=0[video]")
+    return ';'.join(chains)
+
+
+def encode_slideshow_video(image_paths, audio_path, output_path, scene_starts, duration, size=VIDEO_SIZE):
+    """Encode still scene images with hard cuts at scene_starts, with the narration muxed in."""
+    fps = SLIDESHOW_FPS
+    # Frame counts from the cumulative timeline, so rounding never drifts away from the narration
+    bounds = [round(start * fps) for start in scene_starts] + [round(duration * fps)]
+    args = []
+    for i, image_path in enumerate(image_paths):
+        frames = max(1, bounds[i + 1] - bounds[i])
+        args += ["-loop", "1", "-framerate", str(fps), "-t", f"{frames / fps:.3f}", "-i", str(image_path)]
+    args += [
+        "-i", str(audio_path),
+        "-filter_complex", slideshow_filter_graph(len(image_paths), size),
+        "-map", "[video]", "-map", f"{len(image_paths)}:a",
+        "-c:v", "libx264", "-tune", "stillimage", "-preset", "veryfast", "-crf", "23",
+        "-g", str(fps * STILL_KEYFRAME_SECONDS),
+        "-c:a", "aac", "-b:a", "128k",
+        "-shortest", "-t", f"{duration:.3f}",
+        "-movflags", "+faststart", str(output_path),
+    ]
+    run_ffmpeg(args)
+    return str(output_path)
+
+
+def _layer_size(image_path, canvas):
+    """Size a scene image is shown at - its own size, shrunk to fit if it is larger than the canvas."""
+    with Image.open(image_path) as image:
+        width, height = image.size
+    scale = min(1.0, canvas[0] / width, canvas[1] / height)
+    return int(width * scale) // 2 * 2, int(height * scale) // 2 * 2
+
+
+def _scene_chain(input_index, image_path, frames, zoom_frames, size, fps, label):
+    """One scene image zoomed over zoom_frames (0 = held at full zoom) for frames frames, centred on the canvas."""
+    width, height = size
+    layer_width, layer_height = _layer_size(image_path, size)
+    zoom = f"1+{ZOOM_END - 1:.4f}*min(on/{zoom_frames},1)" if zoom_frames else f"{ZOOM_END}"
+    return (
+        f"[{input_index}:v]scale={layer_width * ZOOM_SUPERSAMPLE}:{layer_height * ZOOM_SUPERSAMPLE},"
+        f"zoompan=z='{zoom}':x='iw/2-iw/zoom/2':y='ih/2-ih/zoom/2':d={frames}:s={layer_width}x{layer_height}:fps={fps},"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1,format=yuv420p[{label}]"
+    )
+
+
+def animated_filter_graph(image_paths, scene_starts, scene_durations, size=VIDEO_SIZE, fps=ANIMATED_FPS):
+    """Filter graph for the zoom-and-crossfade timeline; input i is scene image i, output is [video]."""
+    chains = []
+    for i, (image_path, scene_duration) in enumerate(zip(image_paths, scene_durations)):
+        zoom_frames = max(1, round(scene_duration * fps))
+        total_frames = max(1, round((scene_duration + FADE_SECONDS) * fps))
+        chains.append(_scene_chain(i, image_path, total_frames, zoom_frames, size, fps, f"scene{i}"))
+
+    # Each crossfade starts where the next scene starts on the narration timeline
+    previous = "scene0"
+    for i in range(1, len(image_paths)):
+        output = "video" if i == len(image_paths) - 1 else f"fade{i}"
+        chains.append(f"[{previous}][scene{i}]xfade=transition=fade:duration={FADE_SECONDS}:offset={scene_starts[i]:.3f}[{output}]")
+        previous = output
+    if len(image_paths) == 1:
+        chains.append("[scene0]null[video]")
+    return ';'.join(chains)
+
+
+def encode_animated_video(image_paths, audio_path, output_path, scene_starts, scene_durations, duration=None, size=VIDEO_SIZE):
+    """Encode the zoom-and-crossfade scene timeline with the narration muxed in."""
+    args = []
+    for image_path in image_paths:
+        args += ["-i", str(image_path)]
+    args += [
+        "-i", str(audio_path),
+        "-filter_complex", animated_filter_graph(image_paths, scene_starts, scene_durations, size),
+        "-map", "[video]", "-map", f"{len(image_paths)}:a",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
+        "-c:a", "aac", "-b:a", "128k",
+        "-shortest",
+    ]
+    if duration:
+        args += ["-t", f"{duration:.3f}"]
+    args += ["-movflags", "+faststart", str(output_path)]
+    run_ffmpeg(args)
+    return str(output_path)
+
+
+def segment_filter_graph(image_paths, index, frames, size=VIDEO_SIZE, fps=ANIMATED_FPS):
+    """Filter graph for scene index on its own, including the crossfade in from the previous scene.
+
+    During a crossfade the previous scene has finished zooming, so its part is
+    a single held frame - each segment only needs its own image and the
+    previous one, and the stitched segments match animated_filter_graph.
+    """
+    if index == 0:
+        return _scene_chain(0, image_paths[0], frames, frames, size, fps, "video")
+    fade_frames = max(1, min(round(FADE_SECONDS * fps), frames))
+    return ';'.join([
+        _scene_chain(0, image_paths[index - 1], fade_frames, 0, size, fps, "previous"),
+        _scene_chain(1, image_paths[index], frames, frames, size, fps, "scene"),
+        f"[previous][scene]xfade=transition=fade:duration={fade_frames / fps:.3f}:offset=0[video]",
+    ])
+
+
+def encode_parallel_video(image_paths, audio_path, output_path, scene_starts, scene_durations, duration=None,
+                          size=VIDEO_SIZE, workers=None):
+    """Encode the animated timeline one scene per ffmpeg process, then stitch the segments and add narration."""
+    fps = ANIMATED_FPS
+    workers = max(1, min(workers or os.cpu_count() or 1, len(image_paths)))
+    # Split the encoder's threads between the segments running side by side
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    # Frame counts from the cumulative timeline, so rounding never drifts away from the narration
+    total = duration or scene_starts[-1] + scene_durations[-1]
+    bounds = [round(start * fps) for start in scene_starts] + [round(total * fps)]
+    output_path = Path(output_path)
+    segment_paths = [output_path.with_name(f"{output_path.stem}_scene{i}.mp4") for i in range(len(image_paths))]
+
+    def encode_segment(index):
+        inputs = ["-i", str(image_paths[index])] if index == 0 else ["-i", str(image_paths[index - 1]), "-i", str(image_paths[index])]
+        frames = max(1, bounds[index + 1] - bounds[index])
+        run_ffmpeg([
+            *inputs,
+            "-filter_complex", segment_filter_graph(image_paths, index, frames, size, fps),
+            "-map", "[video]", "-frames:v", str(frames), "-an",
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "20", "-threads", str(threads),
+            str(segment_paths[index]),
+        ])
+
+    list_path = output_path.with_name(f"{output_path.stem}_scenes.txt")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(encode_segment, range(len(image_paths))))
+
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for segment_path in segment_paths:
+                escaped = str(segment_path.resolve()).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        # Same encoder settings for every segment, so the video stream is copied as-is
+        args = [
+            "-f", "concat", "-safe", "0", "-i", str(list_path),
+            "-i", str(audio_path),
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy", "-c:a", "aac", "-b:a", "128k",
+            "-shortest",
+        ]
+        if duration:
+            args += ["-t", f"{duration:.3f}"]
+        args += ["-movflags", "+faststart", str(output_path)]
+        run_ffmpeg(args)
+    finally:
+        for path in [list_path, *segment_paths]:
+            if path.exists():
+                path.unlink()
+    return str(output_path)
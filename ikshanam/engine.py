@@ -0,0 +1,112 @@
+"""The story pipeline as plain functions, shared by the Streamlit app, the batch CLI and the story pool.
+
+Nothing here imports Streamlit or reads session state: every input is an
+argument, and every step can run in the app's script thread, a CLI worker
+thread, a render process or another machine.
+
+    parsed_story, source, error = new_story("Indian", "Folk Tale", "Child-friendly")
+    parsed_story = localize(parsed_story, "Tamil")
+    image, mime = story_image(parsed_story, "Indian")
+    audio_path, timing, error = generate_audio(parsed_story['story'], "narration.mp3", voice_id)
+    video_path, srt_path, error = generate_video(parsed_story, "outputs/story", voice_id, "Indian")
+
+generate_audio and generate_video live in ikshanam.media; story text,
+translation and catalogs in ikshanam.story.
+"""
+
+import time
+
+from ikshanam.image_service import fetch_image
+from ikshanam.imaging import gradient_png
+from ikshanam.parser import parse_story
+from ikshanam.story import (
+    TRANSLATOR_AVAILABLE, generate_parsed_story, generate_story, generate_story_streaming, story_image_prompt,
+    translate_parsed_story,
+)
+from ikshanam.story_cache import story_cache
+
+# Size of the story page illustration; pooled stories warm the image cache at this size
+STORY_IMAGE_SIZE = (800, 400)
+
+
+def language_of(parsed_story):
+    """The language a story is written in (stories are generated in English)."""
+    return parsed_story.get('language') or "English"
+
+
+def needs_translation(parsed_story, language):
+    """True if the story has to be translated to be read in language and a translator is installed."""
+    return bool(language) and TRANSLATOR_AVAILABLE and language.strip().lower() != language_of(parsed_story).lower()
+
+
+def localize(parsed_story, language):
+    """The story in language: a Google translated copy, or the story itself if no translation is needed (or possible)."""
+    if not needs_translation(parsed_story, language):
+        return parsed_story
+    translated_story = translate_parsed_story(parsed_story, language)
+    translated_story['language'] = language
+    return translated_story
+
+
+def attach_image(parsed_story, culture, seed=None):
+    """Give the story its illustration prompt and seed, unless it has them already.
+
+    The page, the video and every translation read the same prompt and seed,
+    so they all share one illustration from the image cache.
+    """
+    if 'image_prompt' not in parsed_story:
+        parsed_story['image_prompt'] = story_image_prompt(parsed_story['title'], culture)
+        parsed_story['image_seed'] = int(time.time() * 1000) if seed is None else seed
+    return parsed_story
+
+
+def story_image(parsed_story, culture, size=STORY_IMAGE_SIZE):
+    """Return (image bytes, mime type) for the story's illustration, or the culture gradient if the fetch fails."""
+    image = fetch_image(parsed_story['image_prompt'], size, parsed_story['image_seed'])
+    if image:
+        return image, "image/jpeg"
+    culture_short = culture.split(' ', 1)[1] if ' ' in culture else culture
+    return gradient_png(culture_short, size), "image/png"
+
+
+def new_story(culture, story_type, tone, custom_prompt="", language="English", voice=None, pool=None, on_update=None,
+              image_seed=None, use_cache=True):
+    """Get a story for a selection from the story pool, the story cache or Groq.
+
+    Args:
+        pool: a started StoryPool, or None; its stories are already localized to language
+        voice: narrator voice, so the pool can narrate this selection ahead of time
+        on_update: if given, the story is streamed and on_update(parser, new_paragraphs)
+            is called as it arrives (see generate_story_streaming)
+        image_seed: illustration seed for a generated story (default: the current time in ms)
+        use_cache: serve and store factual stories through the story cache; without it
+            every call generates a new story
+
+    Returns:
+        (parsed_story, source, error) - source is "pool", "cache" or "generated".
+        The story always has its illustration prompt and seed.
+    """
+    custom = bool(custom_prompt and custom_prompt.strip())
+    if pool is not None and not custom:
+        pooled_story = pool.take(culture, story_type, tone, language, voice)
+        if pooled_story:
+            return pooled_story, "pool", None
+
+    # Mythology, legends and historical stories come from the story cache once it holds enough variants.
+    # It holds the English originals; localize() translates them like freshly generated stories.
+    cached_story = story_cache.get(culture, story_type, tone, "English", custom_prompt) if use_cache else None
+    if cached_story:
+        return cached_story, "cache", None
+
+    # Always generate the story in English first
+    if on_update:
+        story_text, error = generate_story_streaming(culture, story_type, tone, "English", custom_prompt, on_update=on_update)
+        parsed_story = None if error else parse_story(story_text)
+    else:
+        parsed_story, error = generate_parsed_story(generate_story, culture, story_type, tone, "English", custom_prompt)
+    if error:
+        return None, "generated", error
+    attach_image(parsed_story, culture, seed=image_seed)
+    if use_cache:
+        story_cache.put(culture, story_type, tone, "English", custom_prompt, parsed_story)
+    return parsed_story, "generated", None
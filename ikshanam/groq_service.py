@@ -0,0 +1,202 @@
+"""Groq chat completions through one shared client, per-model rate limits and retries.
+
+Every caller in the process (all Streamlit sessions, the batch CLI's worker
+threads) goes through one long-lived Groq client, so its HTTP connection pool
+is reused. Before a request is sent, the model's request and token budgets are
+charged - tokens as a prompt estimate plus max_tokens, which is what Groq
+checks against its per-minute limit - and the difference to the real usage is
+refunded afterwards. Callers over budget wait their turn instead of tripping a
+429. Rate limits, timeouts, dropped connections and 5xx errors are retried
+with jittered exponential backoff; a 429's retry-after pauses the model's
+budget for every caller, not just the one that hit it.
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from ikshanam.capabilities import has, lazy
+
+# Groq SDK (imported when the first client is created)
+groq = lazy("groq")
+GROQ_AVAILABLE = has("groq")
+
+# Per-model budgets (Groq's free tier for llama-3.3-70b-versatile); raise them for paid plans
+GROQ_RPM = int(os.getenv("IKSHANAM_GROQ_RPM", "30"))
+GROQ_TPM = int(os.getenv("IKSHANAM_GROQ_TPM", "12000"))
+# Longest a call may queue for its budget (or be told to back off) before it fails
+GROQ_MAX_WAIT = float(os.getenv("IKSHANAM_GROQ_MAX_WAIT", "60"))
+GROQ_ATTEMPTS = int(os.getenv("IKSHANAM_GROQ_ATTEMPTS", "4"))
+GROQ_TIMEOUT = 120
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 20.0
+# Rough size of a token, to estimate prompt and streamed completion usage from characters
+CHARS_PER_TOKEN = 4
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class RateLimitWait(Exception):
+    """The call would have to wait longer than the configured maximum for its budget."""
+
+
+class TokenBucket:
+    """Budget refilled continuously at per_minute, holding up to capacity (default: one minute's worth).
+
+    reserve takes the amount straight away, letting the level go negative, and
+    returns how long the caller has to wait for the bucket to pay it back - so
+    callers are served in arrival order without polling.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.capacity = float(capacity or per_minute)
+        self.rate = per_minute / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Take amount from the bucket and return the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            self._level -= amount
+            return max(0.0, -self._level / self.rate, self._paused_until - now)
+
+    def refund(self, amount):
+        """Give back part of a reservation that was not used."""
+        if amount > 0:
+            with self._lock:
+                self._level = min(self.capacity, self._level + amount)
+
+    def pause(self, seconds):
+        """Make new reservations wait at least seconds from now."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _retry_after(error):
+    """Seconds the server asked us to wait (retry-after-ms / retry-after headers), or None."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retryable(error):
+    if GROQ_AVAILABLE and isinstance(error, groq.APIConnectionError):
+        return True  # Includes timeouts
+    return getattr(error, "status_code", None) in RETRY_STATUS
+
+
+def _estimate_tokens(request):
+    prompt_chars = sum(len(message.get("content") or "") for message in request.get("messages", []))
+    return prompt_chars // CHARS_PER_TOKEN, request.get("max_tokens") or 1024
+
+
+class GroqService:
+    """Send chat completions through a shared client under per-model request and token budgets."""
+
+    def __init__(self, requests_per_minute=GROQ_RPM, tokens_per_minute=GROQ_TPM, max_wait=GROQ_MAX_WAIT,
+                 attempts=GROQ_ATTEMPTS):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait = max_wait
+        self.attempts = max(1, attempts)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._clients = {}
+
+    def client(self):
+        """The shared client for the current GROQ_API_KEY (the SDK's own retries are off - ours honor the budgets)."""
+        api_key = os.getenv("GROQ_API_KEY")
+        with self._lock:
+            if api_key not in self._clients:
+                self._clients[api_key] = groq.Groq(api_key=api_key, max_retries=0, timeout=GROQ_TIMEOUT)
+            return self._clients[api_key]
+
+    def buckets(self, model):
+        """(requests, tokens) buckets for a model, created on first use."""
+        with self._lock:
+            if model not in self._buckets:
+                self._buckets[model] = (TokenBucket(self.requests_per_minute), TokenBucket(self.tokens_per_minute))
+            return self._buckets[model]
+
+    def _acquire(self, model, tokens):
+        requests_bucket, tokens_bucket = self.buckets(model)
+        wait = max(requests_bucket.reserve(1), tokens_bucket.reserve(min(tokens, tokens_bucket.capacity)))
+        if wait > self.max_wait:
+            requests_bucket.refund(1)
+            tokens_bucket.refund(min(tokens, tokens_bucket.capacity))
+            raise RateLimitWait(f"Groq is busy - try again in about {wait:.0f} seconds")
+        if wait:
+            time.sleep(wait)
+
+    def _settle(self, model, reserved, used):
+        self.buckets(model)[1].refund(min(reserved, self.tokens_per_minute) - used)
+
+    def chat_completion(self, **request):
+        """client.chat.completions.create(**request) under the model's budget, retrying transient failures.
+
+        Streams (stream=True) are retried until the first response arrives; the
+        returned iterator settles the token budget once it is consumed.
+        """
+        model = request["model"]
+        prompt_tokens, max_tokens = _estimate_tokens(request)
+        reserved = prompt_tokens + max_tokens
+        for attempt in range(self.attempts):
+            self._acquire(model, reserved)
+            try:
+                response = self.client().chat.completions.create(**request)
+            except Exception as e:
+                self._settle(model, reserved, 0)
+                if not _retryable(e) or attempt == self.attempts - 1:
+                    raise
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    if retry_after > self.max_wait:
+                        raise
+                    # Every caller of this model waits it out; the jitter spreads out the retries
+                    for bucket in self.buckets(model):
+                        bucket.pause(retry_after)
+                    time.sleep(random.uniform(0, BACKOFF_BASE))
+                else:
+                    # Full jitter: anywhere between no wait and the exponential backoff
+                    time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+                continue
+            if request.get("stream"):
+                return self._settled_stream(response, model, reserved, prompt_tokens)
+            usage = getattr(response, "usage", None)
+            self._settle(model, reserved, getattr(usage, "total_tokens", None) or reserved)
+            return response
+
+    def _settled_stream(self, stream, model, reserved, prompt_tokens):
+        completion_chars = 0
+        try:
+            for chunk in stream:
+                if chunk.choices:
+                    completion_chars += len(chunk.choices[0].delta.content or "")
+                yield chunk
+        finally:
+            self._settle(model, reserved, prompt_tokens + completion_chars // CHARS_PER_TOKEN)
+
+
+groq_service = GroqService()
+
+
+def chat_completion(**request):
+    """Create a chat completion through the shared, rate-limited Groq client."""
+    return groq_service.chat_completion(**request)
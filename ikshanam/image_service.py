@@ -0,0 +1,127 @@
+"""Pollinations image fetches with connection reuse, caching and coalescing.
+
+Every prompt is generated upstream once, at MASTER_SIZE, through a pooled
+requests.Session. The master is stored in an on-disk cache keyed by
+(prompt, size, seed), and sizes close to its aspect ratio (the story page and
+the video scenes) are cropped and downscaled from it locally, so they share
+one illustration. Sizes that would lose more than MAX_MASTER_CROP of the
+master, or need upscaling (the 4:3 Generate Image), are generated natively
+instead. Concurrent requests for the same image share one upstream fetch.
+"""
+
+import os
+import threading
+import urllib.parse
+from concurrent.futures import Future
+from io import BytesIO
+
+import requests
+from PIL import Image, ImageOps
+from requests.adapters import HTTPAdapter
+
+from ikshanam.cache import CACHE_DIR, DiskCache
+
+POLLINATIONS_URL = "https://image.pollinations.ai/prompt/{prompt}?width={width}&height={height}&nologo=true&seed={seed}"
+# Generated once per (prompt, seed); every other size is derived from it
+MASTER_SIZE = (1024, 576)
+# Largest share of the master a derived size may crop away before it is fetched natively
+MAX_MASTER_CROP = 0.15
+IMAGE_CACHE_MB = int(os.getenv("IKSHANAM_IMAGE_CACHE_MB", "256"))
+# Smaller responses are Pollinations error pages, not images
+MIN_IMAGE_BYTES = 1000
+
+
+class ImageService:
+    """Fetch Pollinations images at any size from one cached master per (prompt, seed)."""
+
+    def __init__(self, cache, master_size=MASTER_SIZE, timeout=60, pool_size=8):
+        self.cache = cache
+        self.master_size = master_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def fetch(self, prompt, size, seed):
+        """Return JPEG bytes of the image at size (width, height), or None if Pollinations failed."""
+        size = tuple(size)
+        if size == tuple(self.master_size) or not self.derives(size):
+            return self._fetch_upstream(prompt, size, seed)
+
+        key = DiskCache.key("image", prompt, size, seed)
+        cached = self.cache.get_bytes(key, ".jpg")
+        if cached is not None:
+            return cached
+        master = self.fetch_master(prompt, seed)
+        if master is None:
+            return None
+        try:
+            image = ImageOps.fit(Image.open(BytesIO(master)).convert('RGB'), size, Image.Resampling.LANCZOS)
+        except Exception:
+            return None
+        buffer = BytesIO()
+        image.save(buffer, format='JPEG', quality=92)
+        self.cache.put_bytes(key, buffer.getvalue(), ".jpg")
+        return buffer.getvalue()
+
+    def derives(self, size):
+        """True if size can be cropped from the master without upscaling or losing much of the picture."""
+        width, height = size
+        master_width, master_height = self.master_size
+        # The part of the master with the target's aspect ratio, as ImageOps.fit crops it
+        scale = min(master_width / width, master_height / height)
+        crop_width, crop_height = width * scale, height * scale
+        lost = 1 - (crop_width * crop_height) / (master_width * master_height)
+        return scale >= 1 and lost <= MAX_MASTER_CROP
+
+    def fetch_master(self, prompt, seed):
+        """Return the master image bytes, fetching them upstream at most once at a time."""
+        return self._fetch_upstream(prompt, tuple(self.master_size), seed)
+
+    def _fetch_upstream(self, prompt, size, seed):
+        """Return the image generated by Pollinations at size, from the cache or a single in-flight fetch."""
+        key = DiskCache.key("image", prompt, size, seed)
+        cached = self.cache.get_bytes(key, ".jpg")
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()  # Another thread is already fetching this image
+
+        data = None
+        try:
+            data = self._download(prompt, size, seed)
+            if data is not None:
+                self.cache.put_bytes(key, data, ".jpg")
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            future.set_result(data)
+        return data
+
+    def _download(self, prompt, size, seed):
+        width, height = size
+        url = POLLINATIONS_URL.format(prompt=urllib.parse.quote(prompt), width=width, height=height, seed=seed)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200 or len(response.content) <= MIN_IMAGE_BYTES:
+            return None
+        return response.content
+
+
+image_service = ImageService(DiskCache(CACHE_DIR / "images", IMAGE_CACHE_MB * 1024 * 1024))
+
+
+def fetch_image(prompt, size, seed):
+    """Fetch an image through the shared service (JPEG bytes, or None on failure)."""
+    return image_service.fetch(prompt, size, seed)
@@ -0,0 +1,56 @@
+"""Procedural images for when Pollinations is unavailable.
+
+Culture gradients are built with NumPy array math instead of per-pixel
+loops, and memoized per (culture, size), so repeated fallbacks cost nothing.
+"""
+
+from functools import lru_cache
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+# Top and bottom gradient colors per culture (the part of the culture name after the flag)
+GRADIENT_COLORS = {
+    'Indian': [(255, 153, 51), (128, 0, 128)],
+    'Japanese': [(255, 183, 197), (100, 149, 237)],
+    'African': [(255, 140, 0), (139, 69, 19)],
+    'Celtic': [(34, 139, 34), (75, 0, 130)],
+    'Chinese': [(255, 0, 0), (255, 215, 0)],
+    'Greek': [(30, 144, 255), (255, 255, 255)],
+    'Egyptian': [(255, 215, 0), (139, 69, 19)],
+    'Native American': [(210, 105, 30), (34, 139, 34)],
+}
+DEFAULT_GRADIENT = [(50, 50, 100), (100, 50, 80)]
+
+
+def culture_colors(culture):
+    """Gradient colors for a culture, given as "Indian" or with its flag ("🇮🇳 Indian")."""
+    if culture not in GRADIENT_COLORS and ' ' in culture:
+        culture = culture.split(' ', 1)[1]
+    return GRADIENT_COLORS.get(culture, DEFAULT_GRADIENT)
+
+
+@lru_cache(maxsize=32)
+def gradient_array(culture, size):
+    """Vertical top-to-bottom culture gradient as a read-only (height, width, 3) uint8 array."""
+    width, height = size
+    top, bottom = (np.array(color, dtype=np.float64) for color in culture_colors(culture))
+    ratio = (np.arange(height) / height)[:, None]
+    rows = (top * (1 - ratio) + bottom * ratio).astype(np.uint8)
+    array = np.ascontiguousarray(np.broadcast_to(rows[:, None, :], (height, width, 3)))
+    array.flags.writeable = False
+    return array
+
+
+def gradient_image(culture, size):
+    """Culture gradient as a new PIL image of the given (width, height)."""
+    return Image.fromarray(gradient_array(culture, size))
+
+
+@lru_cache(maxsize=32)
+def gradient_png(culture, size):
+    """PNG bytes of the culture gradient (encoded once per culture and size)."""
+    buffer = BytesIO()
+    gradient_image(culture, size).save(buffer, format='PNG')
+    return buffer.getvalue()
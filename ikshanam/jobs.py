@@ -0,0 +1,183 @@
+"""Background video render jobs.
+
+Renders run in a process pool so CPU-heavy encodes never block the Streamlit
+script threads. Each job gets a directory under the jobs root holding its
+story, a status.json with the current stage and percent, and the finished
+story_video.mp4 / captions.srt. Status lives on disk, so any session (or a
+refreshed browser tab) can poll a job by id.
+
+A render that can no longer finish is reported as failed rather than left
+"running": the pool's future marks jobs failed when a worker dies, workers
+touch a heartbeat file while they render, and jobs queued by an earlier
+server process are failed when polled. Finished job directories are
+deleted once they are older than RENDER_KEEP_HOURS.
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from ikshanam.media import generate_video
+
+# Seconds between a worker's heartbeats, and without one before a running job counts as dead
+HEARTBEAT_SECONDS = 5
+STALE_SECONDS = int(os.getenv("IKSHANAM_RENDER_STALE_SECONDS", "120"))
+# Finished and failed job directories older than this are deleted
+RENDER_KEEP_HOURS = float(os.getenv("IKSHANAM_RENDER_KEEP_HOURS", "24"))
+FINAL_STATES = ("done", "failed")
+
+
+def _write_status(job_dir, **status):
+    """Atomically replace a job's status.json."""
+    fd, tmp_path = tempfile.mkstemp(dir=job_dir, suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(status, f)
+    os.replace(tmp_path, Path(job_dir) / "status.json")
+
+
+def _heartbeat(job_dir, stopped):
+    """Touch the job's heartbeat file until stopped is set."""
+    path = Path(job_dir) / "heartbeat"
+    while True:
+        path.touch()
+        if stopped.wait(HEARTBEAT_SECONDS):
+            return
+
+
+def _render_job(job_dir, story_data, voice_id, culture):
+    """Worker entry point - runs the full TTS -> image -> SRT -> video chain for one job."""
+    job_dir = Path(job_dir)
+
+    def progress(stage, percent):
+        _write_status(job_dir, state="running", stage=stage, percent=percent)
+
+    stopped = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job_dir, stopped), daemon=True).start()
+    try:
+        progress("Starting", 0)
+        video_path, srt_path, error = generate_video(story_data, str(job_dir), voice_id=voice_id, culture=culture, progress=progress)
+        if error:
+            _write_status(job_dir, state="failed", stage="Failed", percent=100, error=error)
+        else:
+            _write_status(job_dir, state="done", stage="Done", percent=100, video_path=video_path, srt_path=srt_path)
+    except Exception as e:
+        _write_status(job_dir, state="failed", stage="Failed", percent=100, error=str(e))
+    finally:
+        stopped.set()
+
+
+class RenderJobs:
+    """Submit video renders to a process pool and poll their progress by job id."""
+
+    def __init__(self, jobs_dir, max_workers=2, keep_hours=RENDER_KEEP_HOURS):
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.keep_hours = keep_hours
+        self._lock = threading.Lock()
+        # Jobs submitted by this process; anything else still "queued" or "running" was cut off by a restart
+        self._futures = {}
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        # spawn keeps workers free of the app server's threads and UI runtime
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, story_data, voice_id=None, culture="🇮🇳 Indian"):
+        """Queue a render and return its job id."""
+        self.cleanup()
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = self.jobs_dir / job_id
+        job_dir.mkdir()
+        with open(job_dir / "story.json", 'w', encoding='utf-8') as f:
+            json.dump({"story_data": story_data, "voice_id": voice_id, "culture": culture}, f, ensure_ascii=False)
+        _write_status(job_dir, state="queued", stage="Queued", percent=0)
+        with self._lock:
+            try:
+                future = self._pool.submit(_render_job, str(job_dir), story_data, voice_id, culture)
+            except BrokenProcessPool:
+                # A worker died and took the pool with it - start a new one
+                self._pool = self._new_pool()
+                future = self._pool.submit(_render_job, str(job_dir), story_data, voice_id, culture)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda future: self._finished(job_id, future))
+        return job_id
+
+    def _finished(self, job_id, future):
+        """Mark the job failed if its worker never got to write a final status (crash, broken pool)."""
+        with self._lock:
+            self._futures.pop(job_id, None)
+        error = None if future.cancelled() else future.exception()
+        if future.cancelled() or error is not None:
+            self._fail(job_id, f"Render worker stopped: {error or 'cancelled'}")
+
+    def _fail(self, job_id, error):
+        status = self._read(job_id, "status.json")
+        if status is None or status.get('state') in FINAL_STATES:
+            return status
+        status = dict(state="failed", stage="Failed", percent=100, error=error)
+        _write_status(self.jobs_dir / job_id, **status)
+        return status
+
+    def status(self, job_id):
+        """Return the job's status dict, or None if the id is unknown.
+
+        A job that can no longer finish - its worker stopped sending heartbeats,
+        or it was queued before the server restarted - is marked failed.
+        """
+        status = self._read(job_id, "status.json")
+        if status is None or status.get('state') in FINAL_STATES:
+            return status
+        with self._lock:
+            ours = job_id in self._futures
+        if not ours:
+            return self._fail(job_id, "The render was interrupted by a server restart")
+        if status.get('state') == "running":
+            try:
+                silent = time.time() - (self.jobs_dir / job_id / "heartbeat").stat().st_mtime
+            except OSError:
+                silent = 0  # The worker has not written its first heartbeat yet
+            if silent > STALE_SECONDS:
+                return self._fail(job_id, "The render worker stopped responding")
+        return status
+
+    def cleanup(self):
+        """Delete finished and failed job directories older than keep_hours."""
+        cutoff = time.time() - self.keep_hours * 3600
+        try:
+            entries = list(os.scandir(self.jobs_dir))
+        except OSError:
+            return
+        for entry in entries:
+            status_path = Path(entry.path) / "status.json"
+            try:
+                if status_path.stat().st_mtime > cutoff:
+                    continue
+            except OSError:
+                continue
+            status = self.status(entry.name)
+            if status is not None and status.get('state') in FINAL_STATES:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def story(self, job_id):
+        """Return the job's submitted story, voice and culture, or None if the id is unknown."""
+        return self._read(job_id, "story.json")
+
+    def _read(self, job_id, name):
+        # Job ids come back from the URL, so only accept ones we could have issued
+        if not job_id or not re.fullmatch(r'[0-9a-f]{12}', job_id):
+            return None
+        try:
+            with open(self.jobs_dir / job_id / name, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,645 @@
+"""Narration and video rendering for Ikshanam stories.
+
+Everything here is plain Python with explicit inputs, so it can run inside the
+Streamlit script thread as well as in background worker processes.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ikshanam.cache import CACHE_DIR, DiskCache
+from ikshanam.capabilities import has, lazy
+from ikshanam.encoder import (
+    VIDEO_SIZE, encode_animated_video, encode_parallel_video, encode_slideshow_video, encode_still_video, find_ffmpeg,
+)
+from ikshanam.image_service import fetch_image
+from ikshanam.imaging import gradient_png
+from ikshanam.scenes import scene_prompt, segment_scenes
+
+# Optional libraries are only probed here; each is imported the first time it is used
+
+# gTTS - fallback narration
+gtts = lazy("gtts")
+
+# Edge TTS for natural-sounding neural voices (Microsoft)
+edge_tts = lazy("edge_tts")
+EDGE_TTS_AVAILABLE = has("edge_tts")
+
+# Sentiment Analysis for emotional audio control
+textblob = lazy("textblob")
+TEXTBLOB_AVAILABLE = has("textblob")
+
+# MoviePy
+moviepy = lazy("moviepy")
+MOVIEPY_AVAILABLE = has("moviepy")
+
+# Movis for advanced animations and compositions
+mv = lazy("movis")
+MOVIS_AVAILABLE = has("movis")
+
+# FFmpeg for high-quality video processing
+ffmpeg = lazy("ffmpeg")
+FFMPEG_AVAILABLE = has("ffmpeg")
+
+# Imageio for frame-based video
+imageio = lazy("imageio")
+IMAGEIO_AVAILABLE = has("imageio")
+
+
+# Available narration voices (Edge TTS Neural Voices - free and high quality)
+NARRATION_VOICES = {
+    "Jenny (US, Clear)": "en-US-JennyNeural",
+    "Aria (US, Warm)": "en-US-AriaNeural",
+    "Guy (US, Male)": "en-US-GuyNeural",
+    "Davis (US, Male Deep)": "en-US-DavisNeural",
+    "Sonia (UK, Expressive)": "en-GB-SoniaNeural",
+    "Ryan (UK, Male)": "en-GB-RyanNeural",
+    "Natasha (AU, Female)": "en-AU-NatashaNeural",
+    "William (AU, Male)": "en-AU-WilliamNeural",
+    "Libby (UK, Warm)": "en-GB-LibbyNeural",
+    "Maisie (UK, Young)": "en-GB-MaisieNeural",
+    "Ana (US, Child)": "en-US-AnaNeural",
+    "Christopher (US, News)": "en-US-ChristopherNeural",
+}
+
+# Analyze text sentiment for voice selection
+def analyze_story_mood(text):
+    """Analyze story mood using TextBlob for voice selection."""
+    if TEXTBLOB_AVAILABLE:
+        try:
+            blob = textblob.TextBlob(text[:1000])  # Analyze first 1000 chars
+            polarity = blob.sentiment.polarity
+            if polarity > 0.2:
+                return "positive"
+            elif polarity < -0.2:
+                return "dramatic"
+            return "neutral"
+        except:
+            return "neutral"
+    return "neutral"
+
+# On-disk cache for synthesized narration, shared by the audio and video buttons
+NARRATION_CACHE_MB = int(os.getenv("IKSHANAM_NARRATION_CACHE_MB", "256"))
+narration_cache = DiskCache(CACHE_DIR / "narration", NARRATION_CACHE_MB * 1024 * 1024)
+
+# Maximum number of Edge TTS requests in flight at once
+TTS_MAX_CONCURRENCY = 4
+# Longest piece of text sent to Edge TTS in a single request
+TTS_CHUNK_CHARS = 1500
+# Attempts per chunk before the whole narration falls back to gTTS
+TTS_CHUNK_ATTEMPTS = 3
+# Edge TTS reports WordBoundary offsets in 100 ns ticks and streams 48 kbit/s mono MP3
+EDGE_TTS_TICKS_PER_SECOND = 10_000_000
+EDGE_TTS_BYTES_PER_SECOND = 48_000 / 8
+
+# Split narration text into chunks that can be synthesized independently
+def split_narration_chunks(text, max_chars=TTS_CHUNK_CHARS):
+    """Split text into paragraph chunks, breaking long paragraphs on sentence boundaries."""
+    chunks = []
+    for paragraph in text.split('\n'):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            chunks.append(paragraph)
+            continue
+        current = ""
+        for sentence in re.split(r'(?<=[.!?।])\s+', paragraph):
+            if current and len(current) + len(sentence) + 1 > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}".strip()
+        if current:
+            chunks.append(current)
+    return chunks
+
+# Cache key for a narration - keyed on the chunks actually spoken, so whitespace differences don't matter
+def narration_cache_key(text, voice, rate, engine):
+    return DiskCache.key('\n'.join(split_narration_chunks(text)), voice, rate, engine)
+
+# Synthesize one piece of text with Edge TTS and return the MP3 bytes with its word timings
+async def synthesize_edge_tts(text, voice, rate="+0%"):
+    """Run a single Edge TTS request, collecting its audio and WordBoundary events in memory.
+    
+    Returns (audio_bytes, words) where words is a list of [start, end, text] in seconds.
+    """
+    try:
+        communicate = edge_tts.Communicate(text, voice, rate=rate, boundary="WordBoundary")
+    except TypeError:
+        # edge-tts < 7 always emits WordBoundary events and has no boundary argument
+        communicate = edge_tts.Communicate(text, voice, rate=rate)
+    audio = bytearray()
+    words = []
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+        elif chunk["type"] == "WordBoundary":
+            start = chunk["offset"] / EDGE_TTS_TICKS_PER_SECOND
+            end = (chunk["offset"] + chunk["duration"]) / EDGE_TTS_TICKS_PER_SECOND
+            words.append([start, end, chunk["text"]])
+    if not audio:
+        raise RuntimeError("Edge TTS returned no audio")
+    return bytes(audio), words
+
+# Join synthesized segments into one MP3 and one timing track
+def write_narration_segments(segments, output_path):
+    """Write (audio, words) segments back to back and return the combined timing track.
+    
+    Edge TTS streams constant-bitrate MP3, so each segment's duration follows from its
+    size and the word offsets of later segments can be shifted without decoding audio.
+    """
+    words = []
+    offset = 0.0
+    with open(output_path, 'wb') as f:
+        for audio, segment_words in segments:
+            f.write(audio)
+            words.extend([start + offset, end + offset, text] for start, end, text in segment_words)
+            offset += len(audio) / EDGE_TTS_BYTES_PER_SECOND
+    return {"duration": offset, "words": words}
+
+# Load a cached narration and its timing track into output_path
+def load_cached_narration(cache_key, output_path):
+    """Copy a cached narration to output_path and return its timing track (None if not recorded)."""
+    cached = narration_cache.get(cache_key, ".mp3")
+    if not cached:
+        return False, None
+    shutil.copyfile(cached, output_path)
+    timing = narration_cache.get_bytes(cache_key, ".json")
+    return True, json.loads(timing) if timing else None
+
+# Store a narration and its timing track in the cache
+def store_cached_narration(cache_key, audio_path, timing):
+    narration_cache.put_file(cache_key, audio_path, ".mp3")
+    if timing:
+        narration_cache.put_bytes(cache_key, json.dumps(timing).encode('utf-8'), ".json")
+
+# Retry a single chunk with backoff so one flaky request doesn't sink the whole narration
+async def synthesize_edge_tts_with_retry(text, voice, rate="+0%", attempts=TTS_CHUNK_ATTEMPTS):
+    """Synthesize text with Edge TTS, retrying failed requests with exponential backoff."""
+    for attempt in range(attempts):
+        try:
+            return await synthesize_edge_tts(text, voice, rate)
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(0.5 * 2 ** attempt + random.random() * 0.25)
+
+# Synthesize narration chunks concurrently, keeping their order
+async def synthesize_edge_tts_chunks(chunks, voice, rate="+0%"):
+    """Synthesize all chunks with at most TTS_MAX_CONCURRENCY requests in flight."""
+    limit = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+    
+    async def synthesize_chunk(chunk):
+        async with limit:
+            return await synthesize_edge_tts_with_retry(chunk, voice, rate)
+    
+    return await asyncio.gather(*(synthesize_chunk(chunk) for chunk in chunks))
+
+# Narrate story paragraphs while the story is still being streamed
+class NarrationPipeline:
+    """Hand each completed story paragraph to Edge TTS as soon as it is written.
+    
+    Synthesis runs on a private event loop in a background thread, so earlier
+    paragraphs are narrated while the LLM is still writing later ones. The
+    segments are joined in paragraph order by finish(); Edge TTS emits plain
+    MP3 frames, so byte concatenation plays back without gaps.
+    """
+    
+    def __init__(self, voice, rate="+0%"):
+        self.voice = voice
+        self.rate = rate
+        self._texts = []
+        self._segments = []
+        self._loop = asyncio.new_event_loop()
+        self._limit = None
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+    
+    async def _synthesize(self, text):
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+        async with self._limit:
+            return await synthesize_edge_tts_with_retry(text, self.voice, self.rate)
+    
+    def submit(self, paragraph):
+        """Queue a completed paragraph for synthesis."""
+        for chunk in split_narration_chunks(paragraph):
+            self._texts.append(chunk)
+            self._segments.append(asyncio.run_coroutine_threadsafe(self._synthesize(chunk), self._loop))
+    
+    def finish(self, output_path, timeout=120):
+        """Wait for every segment and write the joined narration to output_path.
+        
+        Returns (path, timing, error) like generate_audio.
+        """
+        try:
+            if not self._segments:
+                return None, None, "No paragraphs were narrated"
+            deadline = time.time() + timeout
+            segments = [segment.result(timeout=max(0, deadline - time.time())) for segment in self._segments]
+            timing = write_narration_segments(segments, output_path)
+            # Let the audio and video buttons reuse this narration
+            cache_key = narration_cache_key('\n'.join(self._texts), self.voice, self.rate, "edge-tts")
+            store_cached_narration(cache_key, output_path, timing)
+            return output_path, timing, None
+        except Exception as e:
+            return None, None, str(e)
+        finally:
+            self.close()
+    
+    def close(self):
+        """Cancel outstanding segments and stop the background loop."""
+        for segment in self._segments:
+            segment.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+# Generate audio function with natural neural voices
+def generate_audio(text, output_path, voice_id=None):
+    """Generate audio using Edge TTS (Microsoft neural voices) or gTTS fallback.
+    
+    Args:
+        text: The text to convert to speech
+        output_path: Path to save the audio file
+        voice_id: Specific voice ID to use (e.g., 'en-US-JennyNeural')
+    
+    Returns:
+        (path, timing, error) - timing is {"duration": seconds, "words": [[start, end, text], ...]}
+        built from Edge TTS WordBoundary events, or None when gTTS was used.
+    """
+    
+    # Try Edge TTS first (much more natural sounding)
+    if EDGE_TTS_AVAILABLE:
+        try:
+            # Use provided voice or default based on mood
+            if voice_id:
+                voice = voice_id
+                rate = "+0%"
+            else:
+                # Analyze mood for voice selection (fallback)
+                mood = analyze_story_mood(text)
+                if mood == "positive":
+                    voice = "en-US-AriaNeural"
+                    rate = "+5%"
+                elif mood == "dramatic":
+                    voice = "en-GB-SoniaNeural"
+                    rate = "-10%"
+                else:
+                    voice = "en-US-JennyNeural"
+                    rate = "+0%"
+            
+            # Reuse narration already synthesized for the same text and voice
+            cache_key = narration_cache_key(text, voice, rate, "edge-tts")
+            hit, timing = load_cached_narration(cache_key, output_path)
+            if hit:
+                return output_path, timing, None
+            
+            # Synthesize paragraph/sentence chunks concurrently and join the MP3 frames in order
+            chunks = split_narration_chunks(text) or [text]
+            segments = asyncio.run(synthesize_edge_tts_chunks(chunks, voice, rate))
+            timing = write_narration_segments(segments, output_path)
+            store_cached_narration(cache_key, output_path, timing)
+            return output_path, timing, None
+            
+        except Exception as e:
+            # Fall back to gTTS
+            pass
+    
+    # Fallback to gTTS
+    try:
+        cache_key = narration_cache_key(text, "en", "+0%", "gtts")
+        hit, _ = load_cached_narration(cache_key, output_path)
+        if hit:
+            return output_path, None, None
+        tts = gtts.gTTS(text=text, lang='en', slow=False)
+        tts.save(output_path)
+        store_cached_narration(cache_key, output_path, None)
+        return output_path, None, None
+    except Exception as e:
+        return None, None, str(e)
+
+# Split paragraphs into caption sentences, remembering which paragraph each came from
+def split_caption_sentences(paragraphs):
+    sentences = []
+    for index, paragraph in enumerate(paragraphs):
+        for sentence in re.split(r'(?<=[.!?])\s+', paragraph.strip()):
+            if sentence.strip():
+                sentences.append((index, sentence.strip()))
+    return sentences
+
+# Find when each sentence starts by walking the TTS word boundaries in order
+def align_sentence_starts(sentences, words):
+    """Match sentences to WordBoundary events by their letters and digits.
+    
+    Comparing only word characters keeps the alignment robust to punctuation and
+    tokenization differences. Returns None if the words run out before the sentences do.
+    """
+    starts = []
+    position = 0
+    for sentence in sentences:
+        target = len(re.sub(r'\W+', '', sentence))
+        if position >= len(words):
+            return None
+        starts.append(words[position][0])
+        consumed = 0
+        while position < len(words) and (consumed < target or consumed == 0):
+            consumed += len(re.sub(r'\W+', '', words[position][2]))
+            position += 1
+    return starts
+
+# Time each caption sentence from the TTS timing track, or estimate it from word counts
+def build_caption_cues(sentences, audio_duration, timing=None):
+    """Return (start, end, paragraph_index, sentence) cues covering the narration."""
+    starts = None
+    if timing and timing.get("words"):
+        starts = align_sentence_starts([sentence for _, sentence in sentences], timing["words"])
+    
+    if starts is None:
+        # Estimate speaking time from word counts when no word boundaries are available
+        total_words = sum(len(sentence.split()) for _, sentence in sentences)
+        time_per_word = audio_duration / total_words if total_words > 0 else 0.4
+        starts = []
+        current_time = 0
+        for _, sentence in sentences:
+            starts.append(current_time)
+            current_time += len(sentence.split()) * time_per_word
+    
+    cues = []
+    for i, (index, sentence) in enumerate(sentences):
+        next_start = starts[i + 1] if i + 1 < len(starts) else audio_duration
+        end = max(starts[i], next_start - 0.05)  # Small gap to prevent overlap
+        cues.append((starts[i], end, index, sentence))
+    return cues
+
+# Scene start times and durations - each scene begins when its first sentence is narrated
+def build_scene_timeline(cues, scene_first_cues, audio_duration):
+    scene_count = len(scene_first_cues)
+    starts = [0.0]
+    for first in scene_first_cues[1:]:
+        start = cues[first][0] if first < len(cues) else None
+        if start is None or start <= starts[-1]:
+            # No usable narration timing - split evenly
+            starts = [i * audio_duration / scene_count for i in range(scene_count)]
+            break
+        starts.append(start)
+    durations = [end - start for start, end in zip(starts, starts[1:] + [audio_duration])]
+    return starts, durations
+
+# "still" encodes the scene images as stills with hard cuts; "animated" adds the slow zoom and fades
+VIDEO_STYLE = os.getenv("IKSHANAM_VIDEO_STYLE", "still")
+# Illustrate every scene separately ("0" = one background image for the whole video)
+SCENE_IMAGES = os.getenv("IKSHANAM_SCENE_IMAGES", "1") != "0"
+# Scene illustrations fetched from Pollinations at the same time
+IMAGE_FETCH_WORKERS = int(os.getenv("IKSHANAM_IMAGE_WORKERS", "4"))
+# ffmpeg processes rendering the scenes of one animated video side by side (1 = a single filter graph)
+SCENE_WORKERS = int(os.getenv("IKSHANAM_SCENE_WORKERS", "0")) or os.cpu_count() or 1
+
+# Fetch every scene's illustration at once, falling back to the culture gradient per image
+def fetch_scene_images(prompts, seed, culture_short, output_dir, size=(854, 480)):
+    """Return one image path per prompt; identical prompts share one fetch and one file."""
+    unique_prompts = list(dict.fromkeys(prompts))
+    with ThreadPoolExecutor(max_workers=max(1, min(IMAGE_FETCH_WORKERS, len(unique_prompts)))) as pool:
+        images = dict(zip(unique_prompts, pool.map(lambda prompt: fetch_image(prompt, size, seed), unique_prompts)))
+    
+    paths = {}
+    for i, prompt in enumerate(unique_prompts):
+        if images[prompt]:
+            path = Path(output_dir) / f"scene_{i}.jpg"
+            path.write_bytes(images[prompt])
+        else:
+            path = Path(output_dir) / f"scene_{i}.png"
+            path.write_bytes(gradient_png(culture_short, size))
+        paths[prompt] = str(path)
+    return [paths[prompt] for prompt in prompts]
+
+# Render backends - each writes video_path from the scene images and narration, raising on failure
+def render_ffmpeg_still(image_paths, audio_path, scene_starts, scene_durations, audio_duration, video_path):
+    """Still scene images cut at the scene starts (or one image for the whole narration), encoded by ffmpeg."""
+    # Consecutive scenes showing the same image are a single shot
+    shots = [(path, start) for i, (path, start) in enumerate(zip(image_paths, scene_starts)) if i == 0 or path != image_paths[i - 1]]
+    if len(shots) == 1:
+        encode_still_video(image_paths[0], audio_path, video_path, duration=audio_duration)
+    else:
+        encode_slideshow_video([path for path, _ in shots], audio_path, video_path, [start for _, start in shots], audio_duration)
+
+def render_ffmpeg_animated(image_paths, audio_path, scene_starts, scene_durations, audio_duration, video_path):
+    """The Movis zoom-and-crossfade timeline as a single ffmpeg filter graph."""
+    encode_animated_video(image_paths, audio_path, video_path, scene_starts, scene_durations, duration=audio_duration)
+
+def render_ffmpeg_parallel(image_paths, audio_path, scene_starts, scene_durations, audio_duration, video_path):
+    """The animated timeline rendered one scene per ffmpeg process, stitched without re-encoding."""
+    encode_parallel_video(image_paths, audio_path, video_path, scene_starts, scene_durations,
+                          duration=audio_duration, workers=SCENE_WORKERS)
+
+def render_movis(image_paths, audio_path, scene_starts, scene_durations, audio_duration, video_path):
+    # Create composition with movis
+    composition = mv.Composition(size=VIDEO_SIZE, duration=audio_duration)
+    
+    # Add each scene with zoom animation and crossfade
+    for i, img_path in enumerate(image_paths):
+        start_time = scene_starts[i]
+        scene_duration = scene_durations[i]
+        
+        # Create image layer with Ken Burns zoom effect
+        layer = mv.layer.Image(img_path, duration=scene_duration + 0.5)  # Slight overlap for crossfade
+        
+        # Add subtle zoom animation (1.0 to 1.1 scale)
+        layer.scale.enable_motion().extend([0, scene_duration], [1.0, 1.05])
+        
+        # Add layer to composition
+        composition.add_layer(layer, name=f"scene_{i}", offset=start_time)
+        
+        # Add crossfade by controlling opacity
+        if i > 0:
+            layer.opacity.enable_motion().extend([0, 0.5], [0, 1.0])  # Fade in
+    
+    # Add audio track
+    audio_layer = mv.layer.Audio(audio_path)
+    composition.add_layer(audio_layer, name="narration")
+    
+    # Export video
+    composition.write_video(video_path, fps=30, codec="libx264", audio_codec="aac")
+
+def render_moviepy(image_paths, audio_path, scene_starts, scene_durations, audio_duration, video_path):
+    audio_clip = moviepy.AudioFileClip(audio_path)
+    
+    clips = []
+    for i, img_path in enumerate(image_paths):
+        clip = moviepy.ImageClip(img_path).with_duration(scene_durations[i])
+        clips.append(clip)
+    
+    final_clip = moviepy.concatenate_videoclips(clips, method="compose")
+    final_clip = final_clip.with_audio(audio_clip)
+    
+    # Export video
+    final_clip.write_videofile(
+        video_path,
+        fps=24,
+        codec='libx264',
+        audio_codec='aac',
+        logger=None
+    )
+    
+    final_clip.close()
+    audio_clip.close()
+
+def render_imageio(image_paths, audio_path, scene_starts, scene_durations, audio_duration, video_path):
+    writer = imageio.get_writer(video_path, fps=24)
+    
+    for img_path, scene_duration in zip(image_paths, scene_durations):
+        img = imageio.imread(img_path)
+        for _ in range(int(scene_duration * 24)):
+            writer.append_data(img)
+    
+    writer.close()
+
+RENDER_BACKENDS = {
+    "ffmpeg": render_ffmpeg_still,
+    "ffmpeg-parallel": render_ffmpeg_parallel,
+    "ffmpeg-animated": render_ffmpeg_animated,
+    "movis": render_movis,
+    "moviepy": render_moviepy,
+    "imageio": render_imageio,
+}
+
+# Backends to try, fastest first; the ffmpeg still encoder has no zoom or crossfades
+def available_render_backends(still=True):
+    available = {
+        "ffmpeg": still and find_ffmpeg() is not None,
+        "ffmpeg-parallel": SCENE_WORKERS > 1 and find_ffmpeg() is not None,
+        "ffmpeg-animated": find_ffmpeg() is not None,
+        "movis": MOVIS_AVAILABLE,
+        "moviepy": MOVIEPY_AVAILABLE,
+        "imageio": IMAGEIO_AVAILABLE,
+    }
+    return [name for name in RENDER_BACKENDS if available[name]]
+
+# Generate video function with FFmpeg for high quality
+def generate_video(story_data, output_dir, voice_id=None, culture="🇮🇳 Indian", progress=None):
+    """Generate a high-quality story video using FFmpeg with transitions.
+    
+    Args:
+        story_data: dict with title, story, etc.
+        output_dir: directory to save output files
+        voice_id: optional voice ID for narration
+        culture: culture the story belongs to (drives the image prompt and fallback colors)
+        progress: optional callback progress(stage, percent) called as the render advances
+    """
+    
+    title = story_data['title']
+    story = story_data['story']
+    report = progress or (lambda stage, percent: None)
+    
+    # Split story into paragraphs and caption sentences
+    paragraphs = [p.strip() for p in story.split('\n') if p.strip()]
+    if not paragraphs:
+        paragraphs = [story[:300]]
+    sentences = split_caption_sentences(paragraphs)
+    
+    # Group the sentences into up to 5 visually coherent scenes
+    scenes = segment_scenes(sentences)
+    
+    try:
+        # Create temp directory
+        temp_dir = Path(output_dir)
+        temp_dir.mkdir(exist_ok=True)
+        
+        # Generate audio first with selected voice
+        report("Narrating the story", 5)
+        audio_path = temp_dir / "narration.mp3"
+        _, timing, _ = generate_audio(story, str(audio_path), voice_id=voice_id)
+        
+        # Get audio duration - Edge TTS reports it with the word timings, otherwise decode the file
+        audio_duration = 30  # Default fallback
+        
+        if timing and timing.get("duration"):
+            audio_duration = timing["duration"]
+        # Try MoviePy first (most reliable)
+        elif MOVIEPY_AVAILABLE:
+            try:
+                audio_clip = moviepy.AudioFileClip(str(audio_path))
+                audio_duration = audio_clip.duration
+                audio_clip.close()
+            except:
+                pass
+        # Try FFmpeg probe as backup
+        elif FFMPEG_AVAILABLE:
+            try:
+                probe = ffmpeg.probe(str(audio_path))
+                audio_duration = float(probe['streams'][0]['duration'])
+            except:
+                pass
+        
+        # Caption cues for the whole narration - exact when Edge TTS word boundaries are available
+        caption_cues = build_caption_cues(sentences, audio_duration, timing)
+        scene_starts, scene_durations = build_scene_timeline(caption_cues, [first for first, _ in scenes], audio_duration)
+        
+        # Illustrate the scenes
+        report("Painting the scenery", 25)
+        culture_short = culture.split(' ', 1)[1] if ' ' in culture else culture
+        
+        # The opening scene reuses the story page's image (same prompt and seed, so a cache hit) when the story has one
+        opening_prompt = story_data.get('image_prompt') or f"Cinematic illustration for '{title}'. {culture_short} cultural style, beautiful scenery, dramatic lighting, fantasy art, painterly style, no text, 4k quality"
+        scene_seed = story_data.get('image_seed', int(time.time() * 1000))
+        if SCENE_IMAGES:
+            scene_texts = [' '.join(sentence for _, sentence in sentences[first:end]) for first, end in scenes]
+            prompts = [opening_prompt] + [scene_prompt(text, title, culture_short) for text in scene_texts[1:]]
+        else:
+            prompts = [opening_prompt] * len(scenes)
+        image_paths = fetch_scene_images(prompts, scene_seed, culture_short, temp_dir)
+        
+        # Generate SRT subtitle file - one sentence at a time
+        report("Writing captions", 45)
+        srt_path = temp_dir / "captions.srt"
+        
+        # Format time as HH:MM:SS,mmm
+        def format_srt_time(seconds):
+            hours = int(seconds // 3600)
+            minutes = int((seconds % 3600) // 60)
+            secs = int(seconds % 60)
+            millis = int((seconds % 1) * 1000)
+            return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+        
+        with open(srt_path, 'w', encoding='utf-8') as srt_file:
+            for i, (start_time, end_time, _, sentence) in enumerate(caption_cues):
+                # Write SRT entry - one sentence at a time
+                srt_file.write(f"{i + 1}\n")
+                srt_file.write(f"{format_srt_time(start_time)} --> {format_srt_time(end_time)}\n")
+                srt_file.write(f"{sentence}\n\n")
+        
+        video_path = temp_dir / "story_video.mp4"
+        report("Rendering video", 55)
+        
+        # Still videos go straight to ffmpeg, one image or one per scene; the frame-by-frame backends are fallbacks
+        still = VIDEO_STYLE == "still"
+        backends = available_render_backends(still)
+        if not backends:
+            return None, None, "No video library available"
+        
+        error = None
+        for name in backends:
+            try:
+                RENDER_BACKENDS[name](image_paths, str(audio_path), scene_starts, scene_durations, audio_duration, str(video_path))
+                break
+            except Exception as e:
+                error = f"{name}: {e}"  # Try the next backend
+        else:
+            return None, None, error
+        
+        # Cleanup images
+        for img_path in set(image_paths):
+            if os.path.exists(img_path):
+                os.remove(img_path)
+        
+        return str(video_path), str(srt_path), None
+        
+    except Exception as e:
+        return None, None, str(e)
@@ -0,0 +1,173 @@
+"""Static file server for generated media.
+
+Videos, narration and caption files are served straight from disk by a small
+threaded HTTP server, so the browser can stream them with Range requests and
+cache them instead of receiving base64 copies on every Streamlit rerun.
+The server binds to the loopback interface by default, and only the app's
+own origins get CORS access (the player requests media with crossorigin so
+caption tracks load).
+"""
+
+import os
+import re
+import threading
+import urllib.parse
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Only media the app generates is ever served
+MEDIA_TYPES = {
+    ".mp4": "video/mp4",
+    ".mp3": "audio/mpeg",
+    ".vtt": "text/vtt",
+    ".srt": "application/x-subrip",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+}
+
+CHUNK_SIZE = 64 * 1024
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD handler with single-range requests, ETags and caching headers."""
+
+    root = None  # Set on the subclass created by start_media_server
+    allowed_origins = frozenset()
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def log_message(self, format, *args):
+        pass  # Keep the Streamlit console quiet
+
+    def _resolve(self, url_path):
+        """Map a URL path to a file inside root, or None if it is outside or not media."""
+        relative = urllib.parse.unquote(url_path).lstrip('/')
+        path = (self.root / relative).resolve()
+        if self.root not in path.parents or path.suffix.lower() not in MEDIA_TYPES:
+            return None
+        return path if path.is_file() else None
+
+    def _serve(self, send_body):
+        url = urllib.parse.urlsplit(self.path)
+        path = self._resolve(url.path)
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        stat = path.stat()
+        size = stat.st_size
+        etag = f'"{size:x}-{int(stat.st_mtime):x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        if self._not_modified(etag, stat.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_common_headers(path, etag, last_modified, url.query)
+            self.end_headers()
+            return
+
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", etag) == etag:
+            byte_range = self._parse_range(range_header, size)
+            if byte_range is None:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            start, end = byte_range
+            status = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(status)
+        self._send_common_headers(path, etag, last_modified, url.query)
+        self.send_header("Content-Type", MEDIA_TYPES[path.suffix.lower()])
+        self.send_header("Content-Length", str(end - start + 1))
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+
+        if send_body:
+            with open(path, 'rb') as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    try:
+                        self.wfile.write(chunk)
+                    except (BrokenPipeError, ConnectionResetError):
+                        return  # The browser seeked elsewhere and dropped this request
+                    remaining -= len(chunk)
+
+    def _send_common_headers(self, path, etag, last_modified, query):
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        # URLs carry the file's mtime (?v=...), so a changed file always gets a new URL
+        self.send_header("Cache-Control", "public, max-age=86400")
+        # The player lives in the Streamlit origin; caption tracks need CORS, for that origin only
+        origin = self.headers.get("Origin")
+        if origin and origin in self.allowed_origins:
+            self.send_header("Access-Control-Allow-Origin", origin)
+        self.send_header("Vary", "Origin")
+        download = urllib.parse.parse_qs(query).get("download")
+        if download:
+            filename = os.path.basename(download[0]) or path.name
+            self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _parse_range(header, size):
+        """Parse a single 'bytes=start-end' range into inclusive offsets, or None if unsatisfiable."""
+        match = RANGE_PATTERN.match(header.strip())
+        if not match or size == 0:
+            return None
+        first, last = match.groups()
+        if not first and not last:
+            return None
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+        if start >= size or end < start:
+            return None
+        return start, min(end, size - 1)
+
+
+def start_media_server(root, host="127.0.0.1", port=8502, allowed_origins=()):
+    """Serve media files under root from a background thread and return the server.
+
+    allowed_origins are the browser origins (e.g. "http://localhost:8501") that get
+    CORS access. Raises OSError if the port cannot be bound.
+    """
+    handler = type("BoundMediaRequestHandler", (MediaRequestHandler,),
+                   {"root": Path(root).resolve(), "allowed_origins": frozenset(allowed_origins)})
+    Path(root).mkdir(parents=True, exist_ok=True)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,339 @@
+"""Parse LLM story completions into title, story and moral.
+
+All patterns are compiled once at import time, and parse_story classifies the
+completion in a single pass over its lines. Section labels are recognised in
+English and in every language the app offers (including the translated
+"Moral" labels shown on the story page), so translated completions parse the
+same way as English ones.
+
+In JSON mode the model returns an object matching STORY_JSON_SCHEMA instead,
+and parse_story_json validates it without any pattern matching.
+"""
+
+import json
+import re
+
+# "Moral" as shown on the story page, by story language
+MORAL_LABELS = {
+    "english": "Moral",
+    "hindi": "नीति",
+    "bengali": "নীতিকথা",
+    "tamil": "நீதி",
+    "telugu": "నీతి",
+    "marathi": "नीति",
+    "gujarati": "નીતિ",
+    "kannada": "ನೀತಿ",
+    "malayalam": "സാരാംശം",
+    "punjabi": "ਸਿੱਖਿਆ",
+    "odia": "ନୀତି",
+    "sanskrit": "नीतिः",
+    "urdu": "سبق",
+    "maithili": "नीति",
+    "spanish": "Moraleja",
+    "french": "Morale",
+    "german": "Moral",
+    "italian": "Morale",
+    "portuguese": "Moral",
+    "russian": "Мораль",
+    "japanese": "教訓",
+    "chinese": "寓意",
+    "korean": "교훈",
+    "arabic": "العبرة",
+    "persian": "درس",
+    "turkish": "Ders",
+    "greek": "Ηθικό δίδαγμα",
+    "dutch": "Moraal",
+    "swedish": "Moral",
+    "polish": "Morał",
+}
+
+# Section labels models use when they translate the TITLE:/STORY: markers
+TITLE_LABELS = [
+    "TITLE", "शीर्षक", "শিরোনাম", "தலைப்பு", "శీర్షిక", "શીર્ષક", "ಶೀರ್ಷಿಕೆ", "തലക്കെട്ട്", "ਸਿਰਲੇਖ", "ଶୀର୍ଷକ",
+    "Título", "Titre", "Titel", "Titolo", "Заголовок", "Название", "タイトル", "題名", "标题", "標題", "제목", "العنوان",
+]
+STORY_LABELS = [
+    "STORY", "कहानी", "कथा", "গল্প", "கதை", "కథ", "વાર્તા", "ಕಥೆ", "കഥ", "ਕਹਾਣੀ", "ଗଳ୍ପ",
+    "Historia", "Histoire", "Geschichte", "Storia", "História", "История", "物語", "故事", "이야기", "القصة",
+]
+# Moral labels in priority order - when a completion has several, the earliest label in this list wins
+MORAL_LABEL_PRIORITY = list(dict.fromkeys(
+    ["MORAL", "नीति", "নীতিকথা", "Moraleja", "Morale", "Lesson", "Teaching"]
+    + [label for label in MORAL_LABELS.values() if label.upper() != "MORAL"]
+))
+
+_LEAD = r'^\s*(?:#{1,3}\s*)?(?:✨\s*)?\*{0,2}'
+_COLON = r'\*{0,2}\s*[:：]\s*\*{0,2}'
+
+
+def _alternation(labels):
+    return '|'.join(re.escape(label) for label in sorted(set(labels), key=len, reverse=True))
+
+
+TITLE_LABEL = re.compile(_LEAD + r'(?:' + _alternation(TITLE_LABELS) + r')' + _COLON + r'(.*)$', re.IGNORECASE)
+STORY_LABEL = re.compile(_LEAD + r'(?:' + _alternation(STORY_LABELS) + r')' + _COLON + r'(.*)$', re.IGNORECASE)
+# One named group per moral label so a single search also tells us which label matched
+MORAL_LABEL = re.compile(
+    '|'.join(
+        [_LEAD + rf'(?P<m{rank}>{re.escape(label)})' + _COLON for rank, label in enumerate(MORAL_LABEL_PRIORITY)]
+        + [r'\*{0,2}(?P<inline>MORAL)\*{0,2}\s*:\s*\*{0,2}',  # MORAL: part-way through a line
+           r'(?P<phrase>The moral of (?:the|this) story (?:is\s*:?|:)|Moral of the story\s*:)\s*']
+    ),
+    re.IGNORECASE,
+)
+HEADING = re.compile(r'^#{1,3}\s+(.+)$')
+BOLD_LINE = re.compile(r'^\*\*([^*\n]+)\*\*$')
+SECTION_WORDS = ('STORY', 'MORAL')
+NON_TITLE_STARTS = ('TITLE', 'STORY', 'MORAL', 'IN THE', 'ONCE', 'LONG AGO')
+
+
+# JSON mode response schema (included in the prompt, validated by parse_story_json)
+STORY_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "paragraphs": {"type": "array", "items": {"type": "string"}, "minItems": 1},
+        "moral": {"type": "string"},
+        "language": {"type": "string"},
+    },
+    "required": ["title", "paragraphs", "moral", "language"],
+}
+
+
+def _clean_label_text(text):
+    return text.replace('**', '').replace('*', '').strip()
+
+
+def _has_label(line):
+    """Cheap pre-check - every label form needs a colon, and the moral phrases say "moral"."""
+    return ':' in line or '：' in line or 'moral' in line.lower()
+
+
+def _moral_rank(match):
+    if match.lastgroup == 'inline':
+        return 0
+    if match.lastgroup and match.lastgroup.startswith('m'):
+        return int(match.lastgroup[1:])
+    return len(MORAL_LABEL_PRIORITY)  # "The moral of the story is ..." phrases rank last
+
+
+def parse_story(text):
+    """Parse the story response into components - handles various formats and languages."""
+    result = {"title": "", "story": "", "moral": ""}
+
+    # Best title candidate per source: 0 = TITLE label, 1 = # heading, 2 = **bold** line
+    title_candidates = [None, None, None]
+    moral = None
+    moral_rank = None
+    story_seen = False
+    story_ended = False
+    lines_before_story = []  # Used when there is no STORY: marker
+    story_lines = []
+
+    for line in text.split('\n'):
+        stripped = line.strip()
+        labelled = _has_label(stripped)
+
+        title_match = labelled and TITLE_LABEL.match(stripped)
+        if title_match:
+            if title_candidates[0] is None:
+                title_candidates[0] = title_match.group(1).split('*')[0]
+            continue
+
+        story_match = labelled and STORY_LABEL.match(stripped)
+        if story_match:
+            story_seen = True
+            story_ended = False
+            rest = story_match.group(1).strip()
+            if rest:
+                story_lines.append(rest)
+            continue
+
+        moral_match = labelled and MORAL_LABEL.search(line)
+        if moral_match:
+            rank = _moral_rank(moral_match)
+            if moral_rank is None or rank < moral_rank:
+                moral = _clean_label_text(line[moral_match.end():])
+                moral_rank = rank
+            # Keep any story text written before the label on the same line
+            line = line[:moral_match.start()]
+            if story_seen:
+                story_ended = True
+            if not line.strip():
+                continue
+
+        if title_candidates[1] is None and stripped.startswith('#'):
+            heading = HEADING.match(stripped)
+            if heading:
+                title_candidates[1] = heading.group(1)
+        if title_candidates[2] is None and stripped.startswith('**'):
+            bold = BOLD_LINE.match(stripped)
+            if bold:
+                title_candidates[2] = bold.group(1)
+
+        if story_seen:
+            if not story_ended:
+                story_lines.append(line)
+        else:
+            lines_before_story.append(line)
+
+    for candidate in title_candidates:
+        if candidate is None:
+            continue
+        title = _clean_label_text(candidate).strip('"“”').strip()
+        if title and len(title) > 3 and not title.upper().startswith(SECTION_WORDS):
+            result["title"] = title
+            break
+
+    if moral is not None:
+        result["moral"] = moral
+
+    # Clean story
+    story = '\n'.join(story_lines if story_seen else lines_before_story)
+    story = story.replace('**', '').strip()
+
+    # Remove title from story if it appears at the beginning
+    if result["title"]:
+        lines = story.split('\n')
+        if lines and lines[0].strip().replace('*', '').lstrip('#').strip() == result["title"]:
+            story = '\n'.join(lines[1:]).strip()
+
+    result["story"] = story
+
+    # If still no title, take first non-empty line as title
+    if not result["title"] and result["story"]:
+        lines = result["story"].split('\n')
+        for i, line in enumerate(lines):
+            line_clean = line.replace('**', '').replace('*', '').strip()
+            if line_clean and 3 < len(line_clean) < 200:
+                if not line_clean.upper().startswith(NON_TITLE_STARTS):
+                    result["title"] = line_clean
+                    result["story"] = '\n'.join(lines[i+1:]).strip()
+                break
+
+    # Final fallback - generate title from first sentence
+    if not result["title"] and result["story"]:
+        first_sentence = result["story"].split('.')[0]
+        if first_sentence and len(first_sentence) < 100:
+            result["title"] = first_sentence[:60] + "..." if len(first_sentence) > 60 else first_sentence
+
+    if not result["title"]:
+        result["title"] = "A Unique Tale"
+
+    if not result["story"]:
+        result["story"] = text
+
+    return result
+
+
+def parse_story_json(text):
+    """Validate a JSON mode response against STORY_JSON_SCHEMA.
+
+    Returns the same title/story/moral dict as parse_story, or None if the
+    response is not JSON or does not match the schema.
+    """
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    title = data.get("title")
+    paragraphs = data.get("paragraphs")
+    moral = data.get("moral")
+    if not all(isinstance(value, str) for value in (title, moral, data.get("language"))):
+        return None
+    if not isinstance(paragraphs, list) or not all(isinstance(p, str) for p in paragraphs):
+        return None
+
+    paragraphs = [p.strip() for p in paragraphs if p.strip()]
+    if not title.strip() or not paragraphs:
+        return None
+    return {"title": title.strip(), "story": '\n\n'.join(paragraphs), "moral": moral.strip()}
+
+
+class StreamingStoryParser:
+    """Split a streamed TITLE/STORY/MORAL completion into sections as lines complete.
+
+    Every completed line of the STORY section is one paragraph, matching how the
+    story text is split into scenes for the video. Uses the same section labels
+    as parse_story.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.title = ""
+        self.paragraphs = []
+        self.moral = ""
+        self.section = None
+        self._line = ""
+
+    @property
+    def pending(self):
+        """The unfinished line currently being written, if it belongs to the story."""
+        line = self._line.strip()
+        if self.section == "moral" or TITLE_LABEL.match(line) or STORY_LABEL.match(line) or MORAL_LABEL.search(line):
+            return ""
+        return line.replace('**', '').strip()
+
+    def feed(self, delta):
+        """Consume a streamed text delta and return the story paragraphs it completed."""
+        self.text += delta
+        self._line += delta
+        completed = []
+        while '\n' in self._line:
+            line, self._line = self._line.split('\n', 1)
+            paragraph = self._consume_line(line)
+            if paragraph:
+                completed.append(paragraph)
+        return completed
+
+    def close(self):
+        """Flush the final line once the stream has ended."""
+        line, self._line = self._line, ""
+        paragraph = self._consume_line(line)
+        return [paragraph] if paragraph else []
+
+    def _consume_line(self, line):
+        line = line.strip()
+        if not line:
+            return None
+
+        title_match = TITLE_LABEL.match(line)
+        if title_match:
+            self.section = "title"
+            self.title = _clean_label_text(title_match.group(1)).strip('"“”')
+            return None
+
+        story_match = STORY_LABEL.match(line)
+        if story_match:
+            self.section = "story"
+            line = story_match.group(1).strip()  # STORY: followed by text on the same line
+            if not line:
+                return None
+
+        moral_match = MORAL_LABEL.search(line)
+        if moral_match:
+            self.section = "moral"
+            self.moral = _clean_label_text(line[moral_match.end():])
+            line = line[:moral_match.start()].strip()
+            if not line:
+                return None
+            clean = line.replace('**', '').strip()
+            self.paragraphs.append(clean)
+            return clean
+
+        clean = line.replace('**', '').strip()
+        if self.section == "moral":
+            self.moral = f"{self.moral} {clean}".strip()
+            return None
+
+        heading = HEADING.match(clean)
+        if heading and not self.title and not self.paragraphs:
+            self.title = heading.group(1).strip()
+            return None
+
+        self.section = "story"
+        self.paragraphs.append(clean)
+        return clean
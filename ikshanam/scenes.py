@@ -0,0 +1,108 @@
+"""Split a story into visual scenes and describe each one for the illustrator.
+
+Paragraph breaks are a poor guide to what a video should show: models write
+one-line paragraphs and half-page ones. segment_scenes starts from the
+paragraphs, splits long ones where the narrative jumps (a new time or place),
+then merges the most similar or too-short neighbours until there are at most
+max_scenes beats. Similarity is word overlap between beats, so a scene keeps
+talking about the same people, places and things.
+"""
+
+import re
+from collections import Counter
+
+MAX_SCENES = 5
+# Shortest beat worth its own illustration, and the length above which a paragraph is split
+MIN_SCENE_WORDS = 40
+MAX_SCENE_WORDS = 160
+
+# Sentence openings that usually move the story to a new time or place
+TRANSITION = re.compile(
+    r'^(?:one (?:day|morning|evening|night)|that (?:day|night|evening|morning)|the next (?:day|morning|night)'
+    r'|(?:many |some |several )?(?:years|days|months|seasons) (?:later|passed)|meanwhile|later|suddenly|finally'
+    r'|at (?:dawn|dusk|last|night|sunrise|sunset)|when (?:morning|night|dawn) came|soon|after)\b',
+    re.IGNORECASE,
+)
+WORD = re.compile(r'\w+')
+STOPWORDS = frozenset("""
+    a about after again all also an and any are as at be because been before being but by came can could did do does
+    each even ever every for from had has have he her here him his how i if in into is it its just like made many me
+    more most much my never no not now of on once one only or other our out over said she so some such than that the
+    their them then there these they this those through to too under until up upon very was we were what when where
+    which while who whom why will with would you your
+""".split())
+
+
+def content_words(text):
+    """Lower-cased words that carry meaning (no stopwords, no short words)."""
+    return [word for word in WORD.findall(text.lower()) if len(word) > 3 and word not in STOPWORDS]
+
+
+def _similarity(a, b):
+    words_a, words_b = set(content_words(a)), set(content_words(b))
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def _word_count(sentences, beat):
+    return sum(len(sentences[i].split()) for i in range(*beat))
+
+
+def _beat_text(sentences, beat):
+    return ' '.join(sentences[i] for i in range(*beat))
+
+
+def segment_scenes(sentences, max_scenes=MAX_SCENES):
+    """Group (paragraph_index, sentence) pairs into at most max_scenes beats.
+
+    Returns (first, end) sentence index ranges covering every sentence in order.
+    """
+    if not sentences:
+        return [(0, 0)]
+    texts = [sentence for _, sentence in sentences]
+
+    # Start from paragraphs, splitting long ones at sentences that open a new time or place
+    beats = []
+    first = 0
+    for i in range(1, len(sentences) + 1):
+        if i == len(sentences) or sentences[i][0] != sentences[first][0]:
+            beats.append((first, i))
+            first = i
+        elif TRANSITION.match(texts[i]) and _word_count(texts, (first, i)) >= MIN_SCENE_WORDS \
+                and _word_count(texts, (first, i)) + len(texts[i].split()) > MAX_SCENE_WORDS:
+            beats.append((first, i))
+            first = i
+
+    # Merge the weakest boundary until every beat is long enough and there are few enough of them
+    def cut_score(i):
+        left, right = beats[i], beats[i + 1]
+        score = 1.0 - _similarity(_beat_text(texts, left), _beat_text(texts, right))
+        if TRANSITION.match(texts[right[0]]):
+            score += 0.5
+        if min(_word_count(texts, left), _word_count(texts, right)) < MIN_SCENE_WORDS:
+            score -= 1.0
+        return score
+
+    while len(beats) > 1:
+        too_many = len(beats) > max_scenes
+        too_short = any(_word_count(texts, beat) < MIN_SCENE_WORDS for beat in beats)
+        if not too_many and not too_short:
+            break
+        i = min(range(len(beats) - 1), key=cut_score)
+        if not too_many and cut_score(i) >= 0:
+            break  # Remaining short beats sit between strong boundaries
+        beats[i:i + 2] = [(beats[i][0], beats[i + 1][1])]
+    return beats
+
+
+def scene_prompt(text, title, culture_short):
+    """Pollinations prompt for one scene: its opening sentence plus its most frequent visual words."""
+    opening = re.split(r'(?<=[.!?])\s+', text.strip(), maxsplit=1)[0]
+    if len(opening) > 180:
+        opening = opening[:180].rsplit(' ', 1)[0]
+    known_words = set(content_words(title)) | set(content_words(opening))
+    keywords = [word for word, _ in Counter(content_words(text)).most_common(12) if word not in known_words][:5]
+    details = f" Featuring {', '.join(keywords)}." if keywords else ""
+    return (f"Cinematic illustration: {opening.rstrip('.!?')}.{details} From the story '{title}'. "
+            f"{culture_short} cultural style, beautiful scenery, dramatic lighting, fantasy art, painterly style, no text, 4k quality")
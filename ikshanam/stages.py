@@ -0,0 +1,45 @@
+"""Story stages that keep running across Streamlit script reruns.
+
+After a story is drawn, its illustration, translation or narration and
+glossary run on a small thread pool. The runner is kept in session state and
+each rerun collects the stages that have finished since. A stage may be
+submitted when another one finishes (narration once the translation is in),
+so the pool stays open until the caller closes it.
+
+    stages = StoryStages()
+    stages.submit("translation", localize, parsed_story, "Tamil")
+    for name, result in stages.collect(timeout=1):
+        ...
+    if not stages.pending():
+        stages.close()
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class StoryStages:
+    """Thread-pool runner for a story's stages, collected as they finish."""
+
+    def __init__(self, max_workers=4):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="story-stage")
+        self._pending = {}
+
+    def submit(self, name, fn, *args):
+        self._pending[self._pool.submit(fn, *args)] = name
+
+    def pending(self):
+        return bool(self._pending)
+
+    def collect(self, timeout):
+        """Wait up to timeout for a stage to finish; return [(name, result), ...] for every finished stage."""
+        done, _ = wait(self._pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        return [(self._pending.pop(future), future.result()) for future in done]
+
+    def close(self):
+        """Release the pool once every stage, including any submitted while collecting, has been collected."""
+        self._pool.shutdown(wait=False)
+
+    def cancel(self):
+        """Drop the remaining stages (a new story replaced this one)."""
+        self._pending = {}
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,343 @@
+"""Story generation, translation and the catalogs the app offers.
+
+Plain functions with explicit inputs, shared by the Streamlit app and the
+command-line batch generator. Errors are returned, not raised, as
+(result, error) pairs.
+"""
+
+import json
+import os
+import random
+
+from ikshanam.groq_service import chat_completion
+from ikshanam.parser import STORY_JSON_SCHEMA, StreamingStoryParser, parse_story, parse_story_json
+from ikshanam.translation import TRANSLATOR_AVAILABLE, translation_service
+
+# Cultural knowledge for prompts
+CULTURES = {
+    "Indian": "Indian culture with elements of dharma, karma, wisdom, festivals, and village life. Style: poetic with nature metaphors.",
+    "Japanese": "Japanese culture with honor, nature spirits (kami), zen philosophy, cherry blossoms. Style: contemplative and elegant.",
+    "African": "African culture with community wisdom, animal tricksters like Anansi, ancestral spirits. Style: vibrant with proverbs.",
+    "Celtic": "Celtic culture with faeries, druids, ancient magic, sacred groves. Style: mystical and lyrical.",
+    "Chinese": "Chinese culture with dragons, filial piety, immortals, Jade Emperor. Style: elegant and wise.",
+    "Greek": "Greek culture with gods of Olympus, heroes, quests, fate. Style: epic and dramatic.",
+    "Arabian": "Arabian culture with djinn, magic lamps, desert wisdom, merchants. Style: rich and ornate.",
+    "Native American": "Native American culture with animal spirits, creation stories, harmony with nature. Style: reverent and earthy."
+}
+
+
+STORY_TYPES = ["Folk Tale", "Mythology", "Historical Story", "Moral Story", "Legend", "Other (type below)"]
+TONES = ["Simple & Easy", "Dramatic & Epic", "Child-friendly", "Mysterious", "Humorous", "Other (type below)"]
+LANGUAGES = ["English", "Bengali", "Marathi", "Odia", "Assamese", "Maithili", "Malayalam", "Tamil", "Gujarati", "Punjabi", "Italian", "Spanish", "French", "German", "Japanese", "Chinese", "Arabic", "Other (type below)"]
+
+# Ask for stories and translations as schema-validated JSON instead of the TITLE:/STORY:/MORAL: layout
+JSON_MODE = os.getenv("IKSHANAM_JSON_MODE", "0") == "1"
+
+# Story types retold from known material (lower temperature, strict accuracy instructions)
+FACTUAL_STORY_TYPES = ("mythology", "legend", "historical story")
+
+def is_factual_story_type(story_type):
+    return story_type.strip().lower() in FACTUAL_STORY_TYPES
+
+# Response format instructions for JSON mode
+def json_format_instruction(language):
+    """Describe the STORY_JSON_SCHEMA object the model must return."""
+    return f"""Respond with ONLY a JSON object matching this schema:
+{json.dumps(STORY_JSON_SCHEMA)}
+
+- "title": the title
+- "paragraphs": the story, one string per paragraph
+- "moral": the moral
+- "language": the language the story is written in ({language})"""
+
+# Build the GROQ chat completion request for a story
+def build_story_request(culture_name, story_type, tone, language="English", custom_prompt="", json_mode=False):
+    """Build the chat completion arguments for a cultural story (shared by blocking and streaming modes)."""
+    
+    culture_context = CULTURES.get(culture_name, f"A rich cultural tradition with unique stories, values, and wisdom from {culture_name} culture.")
+    culture_short = culture_name.split(' ', 1)[1] if ' ' in culture_name else culture_name
+    
+    # Random elements to ensure variety
+    import random
+    import time
+    random.seed(int(time.time() * 1000) % 1000000)
+    
+    # Varied story elements for uniqueness
+    story_seeds = [
+        "a fateful encounter", "an ancient mystery", "a forbidden journey",
+        "a sacred promise", "a forgotten prophecy", "an unexpected friendship",
+        "a test of courage", "a moment of transformation", "a clash of worlds",
+        "a redemption arc", "a sacrifice for love", "a discovery of truth"
+    ]
+    
+    emotions = [
+        "longing and hope", "fear transforming into courage", "grief becoming wisdom",
+        "love conquering doubt", "pride humbled by compassion", "joy found in sorrow",
+        "anger tempered by understanding", "despair reborn as faith"
+    ]
+    
+    sensory_focus = random.choice([
+        "the sounds of nature - rustling leaves, flowing water, distant thunder",
+        "the textures and temperatures - cool morning mist, warm embrace, rough earth",
+        "the colors and light - golden sunsets, silver moonlight, vibrant festivals",
+        "the aromas and tastes - fragrant flowers, sacred incense, traditional foods"
+    ])
+    
+    chosen_seed = random.choice(story_seeds)
+    chosen_emotion = random.choice(emotions)
+    
+    # Tone-specific writing instructions
+    tone_instructions = {
+        "Simple & Easy": "Use clear, flowing language that a child could understand, but with hidden depth. Short sentences that paint vivid pictures.",
+        "Dramatic & Epic": "Use powerful, sweeping prose with intense imagery. Build tension with long, flowing sentences that crescendo at key moments. Use metaphors of storms, fire, and destiny.",
+        "Child-friendly": "Use warm, gentle language with wonder and magic. Include friendly characters and reassuring moments. End with comfort and hope.",
+        "Mysterious": "Use atmospheric, shadowy descriptions. Create suspense with pauses and unanswered questions. Let secrets unfold slowly like morning fog lifting.",
+        "Humorous": "Weave wit and clever observations throughout. Include amusing misunderstandings, playful dialogue, and situations that make readers smile."
+    }
+    
+    tone_guide = tone_instructions.get(tone, f"Write with a {tone} style that matches the mood described.")
+    
+    # Language instruction
+    language_instruction = ""
+    if language and language.lower() != "english":
+        language_instruction = f"\n\n🗣️ **IMPORTANT - WRITE THE ENTIRE STORY IN {language.upper()}** (not English)"
+    
+    # Special handling for Mythology, Legend, Historical Story, and Literature - must be factually accurate
+    factual_instruction = ""
+    requires_factual_accuracy = is_factual_story_type(story_type)
+    story_type_lower = story_type.lower()
+    if requires_factual_accuracy:
+        if story_type_lower == "mythology":
+            story_type_name = "MYTHOLOGY"
+            examples = "Ramayana, Mahabharata, Greek/Norse myths, Egyptian mythology"
+        elif story_type_lower == "legend":
+            story_type_name = "LEGEND"
+            examples = "King Arthur, Robin Hood, Vikram-Betal, Akbar-Birbal, local folk heroes"
+        else:
+            story_type_name = "HISTORICAL"
+            examples = "Chandragupta Maurya, Ashoka, Shivaji, Rani Lakshmibai, Alexander the Great"
+        
+        factual_instruction = f"""
+
+📚 **CRITICAL - {story_type_name} ACCURACY REQUIREMENT**:
+Since this is a {story_type_name} story, you MUST follow these strict guidelines:
+
+⚠️ DO NOT HALLUCINATE OR INVENT:
+- DO NOT create fictional characters, events, or places
+- DO NOT invent dialogues or scenes that contradict historical/mythological records
+- DO NOT modify established facts, relationships, timelines, or outcomes
+- DO NOT mix different mythologies or historical periods incorrectly
+
+✅ YOU MUST:
+- Base the story on REAL, well-documented figures and events (e.g., {examples})
+- Use ACCURATE names, dates, relationships, and facts as recorded in authentic sources
+- Follow the ACTUAL narrative as it exists in traditional texts and historical records
+- Include only authentic elements, places, and cultural attributes of that era
+- If adding descriptive detail (weather, emotions), ensure it doesn't contradict known facts
+- Cite the source tradition if relevant (e.g., "from the Mahabharata", "according to Greek tradition")
+
+📖 This is a FAITHFUL RETELLING with beautiful language - NOT a creative reimagining."""
+    
+    prompt = f"""You are a legendary storyteller, the kind whose voice makes listeners forget time itself. Your tales have been passed down through generations because they touch the soul.{language_instruction}{factual_instruction}
+
+CREATE A UNIQUE {story_type.upper()} from {culture_short} culture that will make the reader FEEL deeply.
+
+🎭 TONE: {tone}
+{tone_guide}
+
+🌍 CULTURAL SOUL:
+{culture_context}
+
+🎲 THIS STORY'S UNIQUE ELEMENTS:
+- Central theme: {chosen_seed}
+- Emotional journey: {chosen_emotion}
+- Sensory focus: {sensory_focus}
+{f'- Special request: {custom_prompt}' if custom_prompt else ''}
+
+📝 STORYTELLING REQUIREMENTS:
+
+1. **EMOTIONAL DEPTH**: Make the reader's heart race, ache, or soar. Show characters' inner struggles. Use the emotional journey of "{chosen_emotion}" as an undercurrent.
+
+2. **SENSORY IMMERSION**: Transport readers there! Describe how things look, sound, smell, feel. Focus especially on: {sensory_focus}
+
+3. **AUTHENTIC VOICE**: Write as if this tale has been told by firelight for a thousand years. Use rhythms, phrases, and wisdom authentic to {culture_short} storytelling traditions.
+
+4. **LIVING CHARACTERS**: Give your main character(s) a clear desire, a deep fear, and a moment of choice that defines them. Even in a short tale, make us CARE.
+
+5. **MEANINGFUL JOURNEY**: Begin with a hook that grabs attention. Build through meaningful conflict. End with a resolution that lingers in the mind like a beautiful melody.
+
+{"6. **FACTUAL ACCURACY**: Retell or expand upon a KNOWN " + story_type.lower() + " with accurate characters, dates, and events. You may add emotional depth and sensory detail, but keep ALL FACTS TRUE to history/tradition as it is widely known. DO NOT HALLUCINATE." if story_type_lower in ["mythology", "legend", "historical story"] else "6. **UNIQUE NARRATIVE**: This must be ORIGINAL - not a retelling of a famous story. Create something fresh that FEELS timeless."}
+
+{"7. **LANGUAGE**: Write the ENTIRE story in " + language + ". The title, story, and moral must all be in " + language + "." if language.lower() != "english" else ""}
+
+Write 400-500 words of rich, immersive storytelling.
+
+"""
+    if json_mode:
+        prompt += f"""TITLE: An evocative, poetic title that hints at the story's soul
+STORY: Your masterpiece - multiple paragraphs with natural breaks for pacing
+MORAL: A profound truth, stated beautifully - not preachy, but wise
+
+{json_format_instruction(language)}"""
+    else:
+        prompt += """FORMAT:
+TITLE: [An evocative, poetic title that hints at the story's soul]
+
+STORY:
+[Your masterpiece - multiple paragraphs with natural breaks for pacing]
+
+MORAL: [A profound truth, stated beautifully - not preachy, but wise]"""
+
+    # Determine temperature based on story type
+    # Lower temperature for factual content to reduce hallucination
+    if requires_factual_accuracy:
+        story_temperature = 0.5  # Lower temperature for factual accuracy
+        system_content = f"""You are a scholar-storyteller from the {culture_short} tradition. 
+You have spent your life studying authentic texts, historical records, and traditional narratives.
+You are deeply knowledgeable about {culture_short} mythology, history, and legends.
+Your stories are ALWAYS factually accurate - you never invent or modify established facts.
+You retell known stories with beautiful language while maintaining complete historical/mythological accuracy.
+When telling mythology or legends, you draw from authentic sources like ancient texts, scriptures, and documented traditions.
+You believe that the truth of these stories is sacred and must be preserved."""
+    else:
+        story_temperature = 0.95  # Higher temperature for creative/original stories
+        system_content = f"""You are a master storyteller from the {culture_short} tradition. 
+You have spent your life collecting and telling tales that make people laugh, cry, and think. 
+Your voice carries the wisdom of ancestors and the wonder of a child seeing magic for the first time.
+Every story you tell is unique - never the same tale twice.
+You believe that a good story is not just heard, but FELT in the bones."""
+    
+    request = dict(
+        model="llama-3.3-70b-versatile",
+        messages=[
+            {
+                "role": "system", 
+                "content": system_content
+            },
+            {"role": "user", "content": prompt}
+        ],
+        temperature=story_temperature,
+        max_tokens=2000,
+        top_p=0.9 if not requires_factual_accuracy else 0.7  # Lower top_p for factual content
+    )
+    if json_mode:
+        request["response_format"] = {"type": "json_object"}
+    return request
+
+# Generate story function using GROQ
+def generate_story(culture_name, story_type, tone, language="English", custom_prompt="", json_mode=False):
+    """Generate a cultural story using GROQ API with rich emotional depth."""
+    try:
+        response = chat_completion(
+            **build_story_request(culture_name, story_type, tone, language, custom_prompt, json_mode)
+        )
+        return response.choices[0].message.content, None
+    except Exception as e:
+        return None, str(e)
+
+# Stream a story from GROQ, reporting progress as the completion arrives
+def generate_story_streaming(culture_name, story_type, tone, language="English", custom_prompt="", on_update=None):
+    """Generate a story with stream=True, calling on_update(parser, new_paragraphs) after every delta.
+    
+    Returns the full completion text and an error, like generate_story.
+    """
+    parser = StreamingStoryParser()
+    try:
+        stream = chat_completion(
+            **build_story_request(culture_name, story_type, tone, language, custom_prompt),
+            stream=True
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if not delta:
+                continue
+            new_paragraphs = parser.feed(delta)
+            if on_update:
+                on_update(parser, new_paragraphs)
+        new_paragraphs = parser.close()
+        if on_update:
+            on_update(parser, new_paragraphs)
+        return parser.text, None
+    except Exception as e:
+        return None, str(e)
+
+# Translate story function using GROQ
+def translate_story(story_text, title, moral, target_language, json_mode=False):
+    """Translate the story to target language using GROQ API."""
+    
+    prompt = f"""Translate the following story into {target_language}. 
+Maintain the emotional tone, cultural essence, and storytelling style.
+Translate ONLY the content, do not add any explanations or notes.
+
+TITLE (translate this):
+{title}
+
+STORY (translate this):
+{story_text}
+
+MORAL (translate this):
+{moral}
+
+"""
+    if json_mode:
+        prompt += json_format_instruction(target_language)
+    else:
+        prompt += """Provide the translation in this exact format:
+TITLE: [translated title]
+
+STORY:
+[translated story]
+
+MORAL: [translated moral]
+"""
+    
+    try:
+        response = chat_completion(
+            model="llama-3.3-70b-versatile",
+            messages=[
+                {
+                    "role": "system", 
+                    "content": f"You are an expert translator specializing in {target_language}. Translate with cultural sensitivity and maintain the storytelling essence."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,  # Lower temperature for more accurate translation
+            max_tokens=3000,
+            **({"response_format": {"type": "json_object"}} if json_mode else {})
+        )
+        return response.choices[0].message.content, None
+    except Exception as e:
+        return None, str(e)
+
+# Run a story or translation completion and parse it into title/story/moral
+def generate_parsed_story(generate, *args):
+    """Call generate(*args) (generate_story or translate_story) and return (parsed_story, error).
+    
+    In JSON mode the response is validated against the schema; if it does not
+    match (or GROQ rejects the generated JSON), the request is repeated in the
+    TITLE:/STORY:/MORAL: layout and parsed with parse_story.
+    """
+    if JSON_MODE:
+        text, error = generate(*args, json_mode=True)
+        parsed_story = None if error else parse_story_json(text)
+        if parsed_story:
+            return parsed_story, None
+    text, error = generate(*args)
+    if error:
+        return None, error
+    return parse_story(text), None
+
+# Translate a parsed story with Google Translate, keeping the English text if it fails
+def translate_parsed_story(parsed_story, language):
+    """Return a translated copy of parsed_story (title, story and moral, through the translation memory)."""
+    if not TRANSLATOR_AVAILABLE:
+        return dict(parsed_story)
+    return translation_service.translate_story(parsed_story, language)
+
+# Image prompt for a story's illustration
+def story_image_prompt(title, culture_name):
+    culture_short = culture_name.split(' ', 1)[1] if ' ' in culture_name else culture_name
+    random_style = random.choice(["watercolor", "oil painting", "digital art", "fantasy art", "illustration", "concept art"])
+    return f"Beautiful {random_style} for story '{title}', {culture_short} cultural theme, mystical atmosphere, cinematic lighting, 4k quality, no text, unique composition"
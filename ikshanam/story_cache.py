@@ -0,0 +1,95 @@
+"""Cache of finished stories for the factual story types.
+
+Mythology, legends and historical stories retell known material at a low
+temperature, so generating them afresh for every reader mostly repeats the
+same tale at full latency and quota. For these types the cache keeps up to
+STORY_CACHE_VARIANTS parsed stories per normalized request (culture, story
+type, tone, custom prompt), each for at most the TTL. Until a request has
+all its variants, stories are generated and added; after that the request
+is served from the cache, rotating through the variants so repeat readers
+still get different tellings.
+
+Stories are always generated in English, so the app caches the English
+original (language "English") and readers of other languages get it
+through translation, which has its own translation memory. The language
+stays part of the key for callers that cache stories generated in another
+language.
+"""
+
+import json
+import os
+import threading
+import time
+
+from ikshanam.cache import CACHE_DIR, DiskCache
+from ikshanam.story import is_factual_story_type
+
+STORY_CACHE = os.getenv("IKSHANAM_STORY_CACHE", "1") != "0"
+STORY_CACHE_VARIANTS = int(os.getenv("IKSHANAM_STORY_CACHE_VARIANTS", "3"))
+STORY_CACHE_TTL_HOURS = float(os.getenv("IKSHANAM_STORY_CACHE_TTL_HOURS", "168"))
+STORY_CACHE_MB = 32
+# What a cached variant keeps: the parsed story and its illustration (so the image comes from the image cache too)
+STORY_FIELDS = ("title", "story", "moral", "image_prompt", "image_seed")
+
+
+def normalize(text):
+    """Case- and whitespace-insensitive form of a request parameter."""
+    return ' '.join(str(text or '').split()).casefold()
+
+
+class StoryCache:
+    """Keep several variants per factual story request and serve them round-robin."""
+
+    def __init__(self, cache, variants=STORY_CACHE_VARIANTS, ttl_seconds=STORY_CACHE_TTL_HOURS * 3600, enabled=STORY_CACHE):
+        self.cache = cache
+        self.variants = max(1, variants)
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # Next variant to serve per key (per process - any order is fine across processes)
+        self._next = {}
+
+    def cacheable(self, story_type):
+        return self.enabled and is_factual_story_type(story_type)
+
+    @staticmethod
+    def key(culture, story_type, tone, language, custom_prompt):
+        return DiskCache.key("story", *(normalize(part) for part in (culture, story_type, tone, custom_prompt, language)))
+
+    def _load(self, key):
+        """Unexpired variants stored under key, oldest first."""
+        data = self.cache.get_bytes(key, ".json")
+        try:
+            variants = json.loads(data) if data else []
+        except ValueError:
+            return []
+        now = time.time()
+        return [variant for variant in variants if now - variant.get("created", 0) < self.ttl_seconds]
+
+    def get(self, culture, story_type, tone, language="English", custom_prompt=""):
+        """A copy of the next cached variant once the request has all its variants, else None."""
+        if not self.cacheable(story_type):
+            return None
+        key = self.key(culture, story_type, tone, language, custom_prompt)
+        with self._lock:
+            variants = self._load(key)
+            if len(variants) < self.variants:
+                return None
+            index = self._next.get(key, 0) % len(variants)
+            self._next[key] = index + 1
+        return dict(variants[index]["story"])
+
+    def put(self, culture, story_type, tone, language, custom_prompt, parsed_story):
+        """Add a freshly generated story as a variant (the oldest one goes once there are enough)."""
+        if not self.cacheable(story_type):
+            return
+        key = self.key(culture, story_type, tone, language, custom_prompt)
+        story = {field: parsed_story[field] for field in STORY_FIELDS if field in parsed_story}
+        with self._lock:
+            variants = self._load(key)
+            variants.append({"created": time.time(), "story": story})
+            payload = json.dumps(variants[-self.variants:], ensure_ascii=False)
+            self.cache.put_bytes(key, payload.encode('utf-8'), ".json")
+
+
+story_cache = StoryCache(DiskCache(CACHE_DIR / "stories", STORY_CACHE_MB * 1024 * 1024))
@@ -0,0 +1,156 @@
+"""Warm pool of ready stories for the most requested selections.
+
+A "Generate Story" click normally waits for a full 70B completion. For the
+selections people pick again and again (culture, story type, tone and
+language, without a custom prompt) a background thread can keep a few
+stories ready: generated, parsed, translated, with the illustration - and optionally
+the narration - already in the image and narration caches. A click takes one
+instantly and the thread refills the pool behind it, spending at most a fixed
+token budget per hour. Every generation request randomizes its story seed,
+emotion and sensory focus, so pooled stories are as varied as fresh ones.
+
+The refills share the Groq key (and its daily quota) with interactive
+requests, so the pool is off unless POOL_SIZE is set. Only the configured
+selections and catalog selections requested at least POOL_MIN_REQUESTS
+times are warmed - never free-typed cultures, types, tones or languages.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+
+from ikshanam.engine import attach_image, localize, story_image
+from ikshanam.groq_service import TokenBucket
+from ikshanam.media import generate_audio
+from ikshanam.story import CULTURES, LANGUAGES, STORY_TYPES, TONES, generate_parsed_story, generate_story
+
+# Ready stories kept per selection (0, the default, turns the pool off)
+POOL_SIZE = int(os.getenv("IKSHANAM_POOL_SIZE", "0"))
+# Groq tokens the refiller may spend per hour; up to a quarter of it can go out in one burst
+POOL_TOKENS_PER_HOUR = int(os.getenv("IKSHANAM_POOL_TOKENS_PER_HOUR", "60000"))
+# Also narrate pooled stories (with the voice last used for that selection)
+POOL_NARRATION = os.getenv("IKSHANAM_POOL_NARRATION", "0") == "1"
+# Selections warmed from startup, as "culture/story type/tone/language" separated by ";"
+POOL_CONFIGS = os.getenv("IKSHANAM_POOL_CONFIGS", "Indian/Folk Tale/Child-friendly/English")
+# Selections kept warm at once - the most recently requested ones
+POOL_MAX_CONFIGS = int(os.getenv("IKSHANAM_POOL_MAX_CONFIGS", "8"))
+# Requests (per server process) before a selection outside POOL_CONFIGS is warmed
+POOL_MIN_REQUESTS = int(os.getenv("IKSHANAM_POOL_MIN_REQUESTS", "3"))
+# Budget charged per pooled story (about 1.5k prompt tokens plus up to 2k completion tokens)
+STORY_TOKENS = 3500
+# Pause after a failed refill, so an outage does not burn the budget
+FAILURE_BACKOFF = 30
+
+
+def is_catalog_selection(culture, story_type, tone, language):
+    """True if every part of the selection comes from the app's catalogs (not an "Other" entry)."""
+    return culture in CULTURES and story_type in STORY_TYPES[:-1] and tone in TONES[:-1] and language in LANGUAGES[:-1]
+
+
+def parse_configs(value):
+    """Parse "culture/story type/tone/language;..." into (culture, story_type, tone, language) tuples."""
+    configs = []
+    for entry in value.split(';'):
+        parts = tuple(part.strip() for part in entry.split('/'))
+        if len(parts) == 4 and all(parts):
+            configs.append(parts)
+    return configs
+
+
+class StoryPool:
+    """Keep up to size ready stories per selection, refilled by a background thread."""
+
+    def __init__(self, size=POOL_SIZE, tokens_per_hour=POOL_TOKENS_PER_HOUR, narration=POOL_NARRATION,
+                 configs=None, max_configs=POOL_MAX_CONFIGS, min_requests=POOL_MIN_REQUESTS):
+        self.size = size
+        self.tokens_per_hour = tokens_per_hour
+        self.narration = narration
+        self.max_configs = max(1, max_configs)
+        self.min_requests = max(1, min_requests)
+        self._budget = TokenBucket(tokens_per_hour / 60, capacity=max(STORY_TOKENS, tokens_per_hour / 4))
+        self._changed = threading.Condition()
+        # Selection -> ready stories, least recently requested first
+        configs = parse_configs(POOL_CONFIGS) if configs is None else configs
+        self._stories = OrderedDict((tuple(config), deque()) for config in configs)
+        self._voices = {}
+        self._requests = {}
+        self._thread = None
+
+    def start(self):
+        """Start the refiller thread (no-op when the pool is turned off or already running)."""
+        if self.size > 0 and self.tokens_per_hour > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._refill_loop, name="story-pool", daemon=True)
+            self._thread.start()
+        return self
+
+    def take(self, culture, story_type, tone, language, voice=None):
+        """Pop a ready story for the selection, or None.
+
+        Warm selections are kept warm; other catalog selections become warm once
+        they have been requested min_requests times.
+        """
+        if self._thread is None:
+            return None
+        config = (culture, story_type, tone, language)
+        with self._changed:
+            if config not in self._stories:
+                if not is_catalog_selection(*config):
+                    return None
+                self._requests[config] = self._requests.get(config, 0) + 1
+                if self._requests[config] < self.min_requests:
+                    return None
+            stories = self._stories.setdefault(config, deque())
+            self._stories.move_to_end(config)
+            if voice:
+                self._voices[config] = voice
+            while len(self._stories) > self.max_configs:
+                dropped, _ = self._stories.popitem(last=False)
+                self._voices.pop(dropped, None)
+            story = stories.popleft() if stories else None
+            self._changed.notify()
+        return story
+
+    def _next_config(self):
+        """The emptiest selection that is not full, preferring the most recently requested."""
+        candidates = [(len(stories), -order, config) for order, (config, stories) in enumerate(self._stories.items())
+                      if len(stories) < self.size]
+        return min(candidates)[2] if candidates else None
+
+    def _refill_loop(self):
+        while True:
+            with self._changed:
+                config = self._next_config()
+                while config is None:
+                    self._changed.wait()
+                    config = self._next_config()
+                voice = self._voices.get(config)
+            time.sleep(self._budget.reserve(STORY_TOKENS))
+            try:
+                story = self._make_story(config, voice)
+            except Exception:
+                story = None
+            if story is None:
+                time.sleep(FAILURE_BACKOFF)
+                continue
+            with self._changed:
+                stories = self._stories.get(config)
+                if stories is not None and len(stories) < self.size:
+                    stories.append(story)
+
+    def _make_story(self, config, voice):
+        """Generate a story the way a click would, warming its image and narration caches; None on failure."""
+        culture, story_type, tone, language = config
+        parsed_story, error = generate_parsed_story(generate_story, culture, story_type, tone, "English", "")
+        if error:
+            return None
+        # The illustration prompt comes from the English title, as for a click; localize copies it through
+        parsed_story = localize(attach_image(parsed_story, culture), language)
+        # Fetched at the story page's size; the page and the video then read it from the image cache
+        story_image(parsed_story, culture)
+        if self.narration and voice:
+            # Narrating into a scratch file stores the audio in the narration cache, where the click finds it
+            with tempfile.TemporaryDirectory() as tmp:
+                generate_audio(parsed_story['story'], os.path.join(tmp, "narration.mp3"), voice_id=voice)
+        return parsed_story
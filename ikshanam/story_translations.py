@@ -0,0 +1,72 @@
+"""Groq translations of a story into several languages at once.
+
+Stories are published in many languages, so translate_story_languages takes
+a list of target languages and sends the missing translations concurrently,
+each through the shared, rate-limited Groq client. Every finished
+translation is stored on disk per (story, language), so asking for a
+language again - from any session - returns it instantly.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from ikshanam.cache import CACHE_DIR, DiskCache
+from ikshanam.story import generate_parsed_story, translate_story
+from ikshanam.story_cache import normalize
+
+# Groq translations in flight at once (the Groq rate limiter still applies on top)
+TRANSLATE_WORKERS = int(os.getenv("IKSHANAM_TRANSLATE_WORKERS", "4"))
+STORY_TRANSLATIONS_MB = 32
+
+
+class StoryTranslations:
+    """Translate a story into many languages concurrently, caching each translation."""
+
+    def __init__(self, cache, workers=TRANSLATE_WORKERS):
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="groq-translate")
+
+    @staticmethod
+    def key(parsed_story, language):
+        source = (parsed_story.get('title'), parsed_story.get('story'), parsed_story.get('moral'))
+        return DiskCache.key("story-translation", DiskCache.key(*source), normalize(language))
+
+    def cached(self, parsed_story, language):
+        """The cached translation into language, or None."""
+        data = self.cache.get_bytes(self.key(parsed_story, language), ".json")
+        try:
+            return json.loads(data) if data else None
+        except ValueError:
+            return None
+
+    def translate(self, parsed_story, languages):
+        """Return {language: (translated_story, error)} for every language, in the order given."""
+        languages = list(dict.fromkeys(language.strip() for language in languages if language.strip()))
+        results = {}
+        futures = {}
+        for language in languages:
+            cached = self.cached(parsed_story, language)
+            if cached:
+                results[language] = (cached, None)
+            else:
+                futures[language] = self._pool.submit(self._translate, parsed_story, language)
+        for language, future in futures.items():
+            results[language] = future.result()
+        return {language: results[language] for language in languages}
+
+    def _translate(self, parsed_story, language):
+        translated_story, error = generate_parsed_story(
+            translate_story, parsed_story['story'], parsed_story['title'], parsed_story.get('moral', ''), language)
+        if not error:
+            payload = json.dumps(translated_story, ensure_ascii=False)
+            self.cache.put_bytes(self.key(parsed_story, language), payload.encode('utf-8'), ".json")
+        return translated_story, error
+
+
+story_translations = StoryTranslations(DiskCache(CACHE_DIR / "story_translations", STORY_TRANSLATIONS_MB * 1024 * 1024))
+
+
+def translate_story_languages(parsed_story, languages):
+    """Translate parsed_story into each of languages with Groq; returns {language: (translated_story, error)}."""
+    return story_translations.translate(parsed_story, languages)
@@ -0,0 +1,167 @@
+"""Google Translate with a translation memory and concurrent, packed requests.
+
+A story is translated as units - the title, each paragraph (long ones split
+at sentence boundaries) and the moral. Every unit is looked up in an on-disk
+translation memory keyed by (source hash, target language, backend), so
+re-translating a story, or any paragraph or moral seen before, costs nothing.
+The remaining units are packed into requests of up to TRANSLATION_CHUNK_CHARS,
+one unit per line, and sent concurrently from a shared thread pool; a short
+story's title, story and moral go out as a single request. If the backend
+merges or splits lines in a packed request, its units are translated one by
+one instead.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from ikshanam.cache import CACHE_DIR, DiskCache
+from ikshanam.capabilities import has, lazy
+
+# Google Translate (imported on the first translation)
+deep_translator = lazy("deep_translator")
+TRANSLATOR_AVAILABLE = has("deep_translator")
+
+# Google Translate rejects requests over 5000 characters
+TRANSLATION_CHUNK_CHARS = 4000
+TRANSLATION_WORKERS = int(os.getenv("IKSHANAM_TRANSLATION_WORKERS", "4"))
+TRANSLATION_CACHE_MB = int(os.getenv("IKSHANAM_TRANSLATION_CACHE_MB", "64"))
+# Title used when a story could not be parsed - kept as it is
+PLACEHOLDER_TITLE = "A Unique Tale"
+
+SENTENCE_END = re.compile(r'(?<=[.!?।])\s+')
+
+
+def split_long(text, max_chars=TRANSLATION_CHUNK_CHARS):
+    """Split text into pieces of at most max_chars, at sentence boundaries where possible."""
+    if len(text) <= max_chars:
+        return [text]
+    pieces = []
+    current = ""
+    for sentence in SENTENCE_END.split(text):
+        # A sentence longer than a whole request is cut at the last space that fits
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def pack_lines(texts, max_chars=TRANSLATION_CHUNK_CHARS):
+    """Group texts, in order, into batches whose newline-joined length stays within max_chars."""
+    batches = []
+    current = []
+    size = 0
+    for text in texts:
+        if current and size + 1 + len(text) > max_chars:
+            batches.append(current)
+            current = []
+            size = 0
+        size += len(text) + (1 if current else 0)
+        current.append(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class TranslationService:
+    """Translate story units through a translation memory and a bounded pool of concurrent requests."""
+
+    def __init__(self, cache, backend="google", max_chars=TRANSLATION_CHUNK_CHARS, workers=TRANSLATION_WORKERS):
+        self.cache = cache
+        self.backend = backend
+        self.max_chars = max_chars
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="translate")
+
+    def _key(self, text, target):
+        return DiskCache.key("translation", DiskCache.key(text), target, self.backend)
+
+    def _request(self, text, target):
+        return deep_translator.GoogleTranslator(source='en', target=target).translate(text)
+
+    def _translate_one(self, text, target):
+        try:
+            translated = self._request(text, target)
+        except Exception:
+            return None
+        return ' '.join(translated.split('\n')).strip() if translated else None
+
+    def _translate_batch(self, batch, target):
+        """Translate a batch of single-line texts in one request, falling back to one request per text."""
+        if len(batch) == 1:
+            return [self._translate_one(batch[0], target)]
+        try:
+            translated = self._request('\n'.join(batch), target)
+        except Exception:
+            translated = None
+        lines = translated.strip().split('\n') if translated else []
+        if len(lines) == len(batch) and all(line.strip() for line in lines):
+            return [line.strip() for line in lines]
+        # The backend merged or split lines, so the translations cannot be matched up - send them separately
+        return [self._translate_one(text, target) for text in batch]
+
+    def translate_texts(self, texts, language):
+        """Translate single-line texts to language; failed translations are None."""
+        target = language.strip().lower()
+        results = [None] * len(texts)
+        pending = {}
+        for i, text in enumerate(texts):
+            cached = self.cache.get_bytes(self._key(text, target), ".txt")
+            if cached is not None:
+                results[i] = cached.decode('utf-8')
+            else:
+                pending.setdefault(text, []).append(i)
+
+        batches = pack_lines(list(pending), self.max_chars)
+        for batch, translations in zip(batches, self._pool.map(lambda batch: self._translate_batch(batch, target), batches)):
+            for text, translation in zip(batch, translations):
+                if not translation:
+                    continue
+                self.cache.put_bytes(self._key(text, target), translation.encode('utf-8'), ".txt")
+                for i in pending[text]:
+                    results[i] = translation
+        return results
+
+    def translate_story(self, parsed_story, language):
+        """Return a translated copy of parsed_story; any part that fails to translate stays in English."""
+        translated_story = dict(parsed_story)
+        units = []
+
+        def add(text):
+            units.append(text)
+            return len(units) - 1
+
+        title = parsed_story.get('title') or ""
+        title_index = add(title) if title and title != PLACEHOLDER_TITLE else None
+        # Paragraph layout (blank lines included), each paragraph as the indexes of its pieces
+        layout = [[add(piece) for piece in split_long(paragraph.strip(), self.max_chars)] if paragraph.strip() else []
+                  for paragraph in (parsed_story.get('story') or "").split('\n')]
+        moral = parsed_story.get('moral') or ""
+        moral_index = add(moral) if moral else None
+
+        translations = self.translate_texts(units, language)
+
+        def text(i):
+            return translations[i] or units[i]
+
+        if title_index is not None:
+            translated_story['title'] = text(title_index)
+        if parsed_story.get('story'):
+            translated_story['story'] = '\n'.join(' '.join(text(i) for i in pieces) for pieces in layout)
+        if moral_index is not None:
+            translated_story['moral'] = text(moral_index)
+        return translated_story
+
+
+translation_service = TranslationService(DiskCache(CACHE_DIR / "translations", TRANSLATION_CACHE_MB * 1024 * 1024))
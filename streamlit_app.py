@@ -1,74 +1,29 @@
 import streamlit as st
 import os
-from gtts import gTTS
-import tempfile
+import uuid
 from pathlib import Path
 from dotenv import load_dotenv
-from PIL import Image
-import random
-import requests
-from io import BytesIO
 import urllib.parse
+import time
+import base64
 
-# Google Translate
-try:
-    from deep_translator import GoogleTranslator
-    TRANSLATOR_AVAILABLE = True
-except ImportError:
-    TRANSLATOR_AVAILABLE = False
-
-# Edge TTS for natural-sounding neural voices (Microsoft)
-try:
-    import edge_tts
-    import asyncio
-    EDGE_TTS_AVAILABLE = True
-except ImportError:
-    EDGE_TTS_AVAILABLE = False
-
-# Sentiment Analysis for emotional audio control
-try:
-    from textblob import TextBlob
-    TEXTBLOB_AVAILABLE = True
-except ImportError:
-    TEXTBLOB_AVAILABLE = False
-
-# Load environment variables from .env file
+# Load environment variables from .env file (before the ikshanam modules read their settings)
 load_dotenv()
 
-# Try to import Groq
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
-
-# Try to import MoviePy
-try:
-    from moviepy import ImageClip, AudioFileClip, concatenate_videoclips
-    MOVIEPY_AVAILABLE = True
-except ImportError:
-    MOVIEPY_AVAILABLE = False
-
-# Movis for advanced animations and compositions
-try:
-    import movis as mv
-    MOVIS_AVAILABLE = True
-except ImportError:
-    MOVIS_AVAILABLE = False
-
-# FFmpeg for high-quality video processing
-try:
-    import ffmpeg
-    FFMPEG_AVAILABLE = True
-except ImportError:
-    FFMPEG_AVAILABLE = False
-
-# Imageio for frame-based video
-try:
-    import imageio
-    IMAGEIO_AVAILABLE = True
-except ImportError:
-    IMAGEIO_AVAILABLE = False
+from ikshanam.cache import DiskCache
+from ikshanam.dictionary import lookup_word, prefetch_glossary
+from ikshanam.engine import localize, needs_translation, new_story, story_image
+from ikshanam.groq_service import GROQ_AVAILABLE
+from ikshanam.image_service import fetch_image
+from ikshanam.imaging import gradient_png
+from ikshanam.jobs import RenderJobs
+from ikshanam.media import EDGE_TTS_AVAILABLE, NARRATION_VOICES, NarrationPipeline, generate_audio
+from ikshanam.media_server import MEDIA_TYPES, start_media_server
+from ikshanam.parser import MORAL_LABELS
+from ikshanam.stages import StoryStages
+from ikshanam.story import CULTURES, JSON_MODE, LANGUAGES, STORY_TYPES, TONES, story_image_prompt
+from ikshanam.story_pool import StoryPool
+from ikshanam.story_translations import translate_story_languages
 
 # Page config
 st.set_page_config(
@@ -376,39 +331,6 @@ st.markdown("""
 <link href="https://fonts.googleapis.com/css2?family=Permanent+Marker&family=UnifrakturMaguntia&display=swap" rel="stylesheet">
 """, unsafe_allow_html=True)
 
-# Cultural knowledge for prompts
-CULTURES = {
-    "Indian": "Indian culture with elements of dharma, karma, wisdom, festivals, and village life. Style: poetic with nature metaphors.",
-    "Japanese": "Japanese culture with honor, nature spirits (kami), zen philosophy, cherry blossoms. Style: contemplative and elegant.",
-    "African": "African culture with community wisdom, animal tricksters like Anansi, ancestral spirits. Style: vibrant with proverbs.",
-    "Celtic": "Celtic culture with faeries, druids, ancient magic, sacred groves. Style: mystical and lyrical.",
-    "Chinese": "Chinese culture with dragons, filial piety, immortals, Jade Emperor. Style: elegant and wise.",
-    "Greek": "Greek culture with gods of Olympus, heroes, quests, fate. Style: epic and dramatic.",
-    "Arabian": "Arabian culture with djinn, magic lamps, desert wisdom, merchants. Style: rich and ornate.",
-    "Native American": "Native American culture with animal spirits, creation stories, harmony with nature. Style: reverent and earthy."
-}
-
-
-STORY_TYPES = ["Folk Tale", "Mythology", "Historical Story", "Moral Story", "Legend", "Other (type below)"]
-TONES = ["Simple & Easy", "Dramatic & Epic", "Child-friendly", "Mysterious", "Humorous", "Other (type below)"]
-LANGUAGES = ["English", "Bengali", "Marathi", "Odia", "Assamese", "Maithili", "Malayalam", "Tamil", "Gujarati", "Punjabi", "Italian", "Spanish", "French", "German", "Japanese", "Chinese", "Arabic", "Other (type below)"]
-
-# Available narration voices (Edge TTS Neural Voices - free and high quality)
-NARRATION_VOICES = {
-    "Jenny (US, Clear)": "en-US-JennyNeural",
-    "Aria (US, Warm)": "en-US-AriaNeural",
-    "Guy (US, Male)": "en-US-GuyNeural",
-    "Davis (US, Male Deep)": "en-US-DavisNeural",
-    "Sonia (UK, Expressive)": "en-GB-SoniaNeural",
-    "Ryan (UK, Male)": "en-GB-RyanNeural",
-    "Natasha (AU, Female)": "en-AU-NatashaNeural",
-    "William (AU, Male)": "en-AU-WilliamNeural",
-    "Libby (UK, Warm)": "en-GB-LibbyNeural",
-    "Maisie (UK, Young)": "en-GB-MaisieNeural",
-    "Ana (US, Child)": "en-US-AnaNeural",
-    "Christopher (US, News)": "en-US-ChristopherNeural",
-}
-
 # Sidebar for inputs
 st.sidebar.header("✨ Create Your Story")
 
@@ -460,655 +382,123 @@ if not GROQ_AVAILABLE:
     st.error("Groq package not installed. Run: pip install groq")
     st.stop()
 
-# Generate story function using GROQ
-def generate_story(culture_name, story_type, tone, language="English", custom_prompt=""):
-    """Generate a cultural story using GROQ API with rich emotional depth."""
-    
-    culture_context = CULTURES.get(culture_name, f"A rich cultural tradition with unique stories, values, and wisdom from {culture_name} culture.")
-    culture_short = culture_name.split(' ', 1)[1] if ' ' in culture_name else culture_name
-    
-    # Random elements to ensure variety
-    import random
-    import time
-    random.seed(int(time.time() * 1000) % 1000000)
-    
-    # Varied story elements for uniqueness
-    story_seeds = [
-        "a fateful encounter", "an ancient mystery", "a forbidden journey",
-        "a sacred promise", "a forgotten prophecy", "an unexpected friendship",
-        "a test of courage", "a moment of transformation", "a clash of worlds",
-        "a redemption arc", "a sacrifice for love", "a discovery of truth"
-    ]
-    
-    emotions = [
-        "longing and hope", "fear transforming into courage", "grief becoming wisdom",
-        "love conquering doubt", "pride humbled by compassion", "joy found in sorrow",
-        "anger tempered by understanding", "despair reborn as faith"
-    ]
-    
-    sensory_focus = random.choice([
-        "the sounds of nature - rustling leaves, flowing water, distant thunder",
-        "the textures and temperatures - cool morning mist, warm embrace, rough earth",
-        "the colors and light - golden sunsets, silver moonlight, vibrant festivals",
-        "the aromas and tastes - fragrant flowers, sacred incense, traditional foods"
-    ])
-    
-    chosen_seed = random.choice(story_seeds)
-    chosen_emotion = random.choice(emotions)
-    
-    # Tone-specific writing instructions
-    tone_instructions = {
-        "Simple & Easy": "Use clear, flowing language that a child could understand, but with hidden depth. Short sentences that paint vivid pictures.",
-        "Dramatic & Epic": "Use powerful, sweeping prose with intense imagery. Build tension with long, flowing sentences that crescendo at key moments. Use metaphors of storms, fire, and destiny.",
-        "Child-friendly": "Use warm, gentle language with wonder and magic. Include friendly characters and reassuring moments. End with comfort and hope.",
-        "Mysterious": "Use atmospheric, shadowy descriptions. Create suspense with pauses and unanswered questions. Let secrets unfold slowly like morning fog lifting.",
-        "Humorous": "Weave wit and clever observations throughout. Include amusing misunderstandings, playful dialogue, and situations that make readers smile."
-    }
-    
-    tone_guide = tone_instructions.get(tone, f"Write with a {tone} style that matches the mood described.")
-    
-    # Language instruction
-    language_instruction = ""
-    if language and language.lower() != "english":
-        language_instruction = f"\n\n🗣️ **IMPORTANT - WRITE THE ENTIRE STORY IN {language.upper()}** (not English)"
-    
-    # Special handling for Mythology, Legend, Historical Story, and Literature - must be factually accurate
-    factual_instruction = ""
-    requires_factual_accuracy = False
-    story_type_lower = story_type.lower()
-    if story_type_lower in ["mythology", "legend", "historical story"]:
-        requires_factual_accuracy = True
-        if story_type_lower == "mythology":
-            story_type_name = "MYTHOLOGY"
-            examples = "Ramayana, Mahabharata, Greek/Norse myths, Egyptian mythology"
-        elif story_type_lower == "legend":
-            story_type_name = "LEGEND"
-            examples = "King Arthur, Robin Hood, Vikram-Betal, Akbar-Birbal, local folk heroes"
-        else:
-            story_type_name = "HISTORICAL"
-            examples = "Chandragupta Maurya, Ashoka, Shivaji, Rani Lakshmibai, Alexander the Great"
-        
-        factual_instruction = f"""
-
-📚 **CRITICAL - {story_type_name} ACCURACY REQUIREMENT**:
-Since this is a {story_type_name} story, you MUST follow these strict guidelines:
+# Stream story tokens so the title and first paragraphs appear while the rest is still being written
+# (JSON mode responses are only usable once complete, so they are never streamed)
+STREAM_STORY = os.getenv("IKSHANAM_STREAM_STORY", "1") != "0" and not JSON_MODE
 
-⚠️ DO NOT HALLUCINATE OR INVENT:
-- DO NOT create fictional characters, events, or places
-- DO NOT invent dialogues or scenes that contradict historical/mythological records
-- DO NOT modify established facts, relationships, timelines, or outcomes
-- DO NOT mix different mythologies or historical periods incorrectly
-
-✅ YOU MUST:
-- Base the story on REAL, well-documented figures and events (e.g., {examples})
-- Use ACCURATE names, dates, relationships, and facts as recorded in authentic sources
-- Follow the ACTUAL narrative as it exists in traditional texts and historical records
-- Include only authentic elements, places, and cultural attributes of that era
-- If adding descriptive detail (weather, emotions), ensure it doesn't contradict known facts
-- Cite the source tradition if relevant (e.g., "from the Mahabharata", "according to Greek tradition")
-
-📖 This is a FAITHFUL RETELLING with beautiful language - NOT a creative reimagining."""
-    
-    prompt = f"""You are a legendary storyteller, the kind whose voice makes listeners forget time itself. Your tales have been passed down through generations because they touch the soul.{language_instruction}{factual_instruction}
-
-CREATE A UNIQUE {story_type.upper()} from {culture_short} culture that will make the reader FEEL deeply.
-
-🎭 TONE: {tone}
-{tone_guide}
-
-🌍 CULTURAL SOUL:
-{culture_context}
-
-🎲 THIS STORY'S UNIQUE ELEMENTS:
-- Central theme: {chosen_seed}
-- Emotional journey: {chosen_emotion}
-- Sensory focus: {sensory_focus}
-{f'- Special request: {custom_prompt}' if custom_prompt else ''}
-
-📝 STORYTELLING REQUIREMENTS:
-
-1. **EMOTIONAL DEPTH**: Make the reader's heart race, ache, or soar. Show characters' inner struggles. Use the emotional journey of "{chosen_emotion}" as an undercurrent.
-
-2. **SENSORY IMMERSION**: Transport readers there! Describe how things look, sound, smell, feel. Focus especially on: {sensory_focus}
-
-3. **AUTHENTIC VOICE**: Write as if this tale has been told by firelight for a thousand years. Use rhythms, phrases, and wisdom authentic to {culture_short} storytelling traditions.
-
-4. **LIVING CHARACTERS**: Give your main character(s) a clear desire, a deep fear, and a moment of choice that defines them. Even in a short tale, make us CARE.
-
-5. **MEANINGFUL JOURNEY**: Begin with a hook that grabs attention. Build through meaningful conflict. End with a resolution that lingers in the mind like a beautiful melody.
-
-{"6. **FACTUAL ACCURACY**: Retell or expand upon a KNOWN " + story_type.lower() + " with accurate characters, dates, and events. You may add emotional depth and sensory detail, but keep ALL FACTS TRUE to history/tradition as it is widely known. DO NOT HALLUCINATE." if story_type_lower in ["mythology", "legend", "historical story"] else "6. **UNIQUE NARRATIVE**: This must be ORIGINAL - not a retelling of a famous story. Create something fresh that FEELS timeless."}
-
-{"7. **LANGUAGE**: Write the ENTIRE story in " + language + ". The title, story, and moral must all be in " + language + "." if language.lower() != "english" else ""}
-
-Write 400-500 words of rich, immersive storytelling.
-
-FORMAT:
-TITLE: [An evocative, poetic title that hints at the story's soul]
-
-STORY:
-[Your masterpiece - multiple paragraphs with natural breaks for pacing]
-
-MORAL: [A profound truth, stated beautifully - not preachy, but wise]"""
+# Narrate the story paragraph by paragraph while it streams (English stories only)
+if STREAM_STORY and EDGE_TTS_AVAILABLE:
+    narrate_while_writing = st.sidebar.toggle("🎧 Narrate while writing", value=False)
+else:
+    narrate_while_writing = False
 
-    # Determine temperature based on story type
-    # Lower temperature for factual content to reduce hallucination
-    if requires_factual_accuracy:
-        story_temperature = 0.5  # Lower temperature for factual accuracy
-        system_content = f"""You are a scholar-storyteller from the {culture_short} tradition. 
-You have spent your life studying authentic texts, historical records, and traditional narratives.
-You are deeply knowledgeable about {culture_short} mythology, history, and legends.
-Your stories are ALWAYS factually accurate - you never invent or modify established facts.
-You retell known stories with beautiful language while maintaining complete historical/mythological accuracy.
-When telling mythology or legends, you draw from authentic sources like ancient texts, scriptures, and documented traditions.
-You believe that the truth of these stories is sacred and must be preserved."""
-    else:
-        story_temperature = 0.95  # Higher temperature for creative/original stories
-        system_content = f"""You are a master storyteller from the {culture_short} tradition. 
-You have spent your life collecting and telling tales that make people laugh, cry, and think. 
-Your voice carries the wisdom of ancestors and the wonder of a child seeing magic for the first time.
-Every story you tell is unique - never the same tale twice.
-You believe that a good story is not just heard, but FELT in the bones."""
-    
+# Data URL for image bytes, falling back to a cultural gradient when there are none
+def image_data_url(image_data, culture_name, size):
+    if image_data:
+        return f"data:image/jpeg;base64,{base64.b64encode(image_data).decode('utf-8')}"
+    culture_short = culture_name.split(' ', 1)[1] if ' ' in culture_name else culture_name
+    return f"data:image/png;base64,{base64.b64encode(gradient_png(culture_short, size)).decode('utf-8')}"
+
+# Data URL for the story page illustration (the culture gradient if the fetch fails)
+def story_image_url(parsed_story, culture_name):
+    image, mime = story_image(parsed_story, culture_name)
+    return f"data:{mime};base64,{base64.b64encode(image).decode('utf-8')}"
+
+# New mp3 path under outputs/audio, where the media server can stream it
+def new_audio_file():
+    AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+    # Oldest narrations go once the directory outgrows its cap
+    DiskCache(AUDIO_DIR, OUTPUT_AUDIO_MB * 1024 * 1024).evict()
+    return str(AUDIO_DIR / f"{uuid.uuid4().hex}.mp3")
+
+# Narrate a story into a new mp3 file
+def narrate_story(text, voice_id):
+    """Return the path of the narration, or None if it could not be generated."""
+    audio_path, _, error = generate_audio(text, new_audio_file(), voice_id=voice_id)
+    return None if error else audio_path
+
+# Narrator voice last chosen on the story page (used for automatic narration)
+def current_narrator_voice():
+    voice_name = st.session_state.get('narrator_voice', list(NARRATION_VOICES.keys())[0])
+    return NARRATION_VOICES.get(voice_name, "en-US-JennyNeural")
+
+# Join the narration recorded while the story streamed into a new mp3 file
+def finish_narration(narration):
+    audio_path, _, error = narration.finish(new_audio_file())
+    return None if error else audio_path
+
+# Generated media lives under outputs/ and is streamed to the browser by the media server
+OUTPUT_DIR = Path("outputs")
+AUDIO_DIR = OUTPUT_DIR / "audio"
+OUTPUT_AUDIO_MB = int(os.getenv("IKSHANAM_OUTPUT_AUDIO_MB", "256"))
+MEDIA_HOST = os.getenv("IKSHANAM_MEDIA_HOST", "127.0.0.1")
+MEDIA_PORT = int(os.getenv("IKSHANAM_MEDIA_PORT", "8502"))
+# The browser reaches the server under the host it binds to (localhost for loopback or all interfaces)
+MEDIA_PUBLIC_HOST = "localhost" if MEDIA_HOST in ("", "0.0.0.0", "127.0.0.1", "::") else MEDIA_HOST
+MEDIA_BASE_URL = os.getenv("IKSHANAM_MEDIA_BASE_URL", f"http://{MEDIA_PUBLIC_HOST}:{MEDIA_PORT}").rstrip('/')
+# Without an explicit base URL the server is only reachable from a browser on the server machine
+MEDIA_BASE_URL_SET = bool(os.getenv("IKSHANAM_MEDIA_BASE_URL"))
+LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+# Origins of this Streamlit app, the only ones allowed to load media cross-origin
+APP_PORT = st.get_option("server.port")
+MEDIA_ALLOWED_ORIGINS = [origin.strip().rstrip('/') for origin in os.getenv(
+    "IKSHANAM_MEDIA_ALLOWED_ORIGINS", f"http://localhost:{APP_PORT},http://127.0.0.1:{APP_PORT}").split(',') if origin.strip()]
+
+@st.cache_resource
+def get_media_server():
     try:
-        client = Groq(api_key=api_key)
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": system_content
-                },
-                {"role": "user", "content": prompt}
-            ],
-            temperature=story_temperature,
-            max_tokens=2000,
-            top_p=0.9 if not requires_factual_accuracy else 0.7  # Lower top_p for factual content
-        )
-        return response.choices[0].message.content, None
-    except Exception as e:
-        return None, str(e)
-
-# Parse story response
-def parse_story(text):
-    """Parse the story response into components - handles various formats and languages."""
-    result = {"title": "", "story": "", "moral": ""}
-    
-    import re
-    
-    # Try multiple patterns to extract title
-    # Pattern 1: **TITLE:** or TITLE: at start of line
-    title_patterns = [
-        r'\*{0,2}TITLE\*{0,2}\s*:\s*\*{0,2}([^\n*]+)',  # TITLE: text
-        r'^#{1,3}\s+(.+)$',  # # Heading format
-        r'^\*\*([^*\n]+)\*\*$',  # **Title** on its own line
-    ]
-    
-    for pattern in title_patterns:
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        if match:
-            title = match.group(1).strip()
-            title = title.replace('**', '').replace('*', '').strip()
-            # Remove surrounding double quotes
-            title = title.strip('"').strip('"').strip('"')
-            if title and len(title) > 3 and not title.upper().startswith(('STORY', 'MORAL')):
-                result["title"] = title
-                break
-    
-    # Extract MORAL - check multiple patterns including translated labels
-    moral_patterns = [
-        r'\*{0,2}MORAL\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # MORAL: text
-        r'\*{0,2}नीति\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Hindi
-        r'\*{0,2}নীতিকথা\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Bengali
-        r'\*{0,2}Moraleja\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Spanish
-        r'\*{0,2}Morale\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # French/Italian
-        r'The moral of (?:the|this) story (?:is|:)\s*([^\n]+)',  # Common English pattern
-        r'Moral of the story\s*:\s*([^\n]+)',  # Another English pattern
-        r'\*{0,2}Lesson\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Lesson: format
-        r'\*{0,2}Teaching\*{0,2}\s*:\s*\*{0,2}([^\n]+)',  # Teaching: format
-    ]
-    
-    for pattern in moral_patterns:
-        moral_match = re.search(pattern, text, re.IGNORECASE)
-        if moral_match:
-            moral = moral_match.group(1).strip()
-            moral = moral.replace('**', '').replace('*', '').strip()
-            result["moral"] = moral
-            break
-    
-    # Extract story - between STORY: and MORAL: (or end)
-    story_match = re.search(r'\*{0,2}STORY\*{0,2}\s*:\s*\n(.*?)(?=\*{0,2}MORAL\*{0,2}\s*:|$)', text, re.IGNORECASE | re.DOTALL)
-    if story_match:
-        story = story_match.group(1).strip()
+        return start_media_server(OUTPUT_DIR, host=MEDIA_HOST, port=MEDIA_PORT, allowed_origins=MEDIA_ALLOWED_ORIGINS)
+    except OSError:
+        # Port taken or not allowed - media is embedded in the page instead
+        return None
+
+get_media_server()
+
+# True if this session's browser opened the app over loopback (st.context needs Streamlit 1.37+)
+def browser_on_loopback():
+    context = getattr(st, "context", None)
+    host = context.headers.get("Host", "") if context is not None else ""
+    return urllib.parse.urlsplit(f"//{host}").hostname in LOOPBACK_HOSTS
+
+# True if the browser can load media from the media server: it is running, and either its public
+# URL was configured or the browser is on the same machine
+def use_media_server():
+    return get_media_server() is not None and (MEDIA_BASE_URL_SET or browser_on_loopback())
+
+# Browser URL for a file under outputs/ - versioned by mtime so the browser can cache it,
+# or a base64 data URL when the browser cannot reach the media server
+def media_url(path, download=None):
+    path = Path(path).resolve()
+    if not use_media_server():
+        mime = MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
+        return f"data:{mime};base64,{base64.b64encode(path.read_bytes()).decode('utf-8')}"
+    relative = path.relative_to(OUTPUT_DIR.resolve()).as_posix()
+    url = f"{MEDIA_BASE_URL}/{urllib.parse.quote(relative)}?v={int(path.stat().st_mtime)}"
+    if download:
+        url += f"&download={urllib.parse.quote(download)}"
+    return url
+
+# Download button for a generated file (sent through Streamlit when the browser cannot reach the media server)
+def media_download_button(label, path, file_name):
+    if not use_media_server():
+        with open(path, 'rb') as f:
+            st.download_button(label, f.read(), file_name=file_name)
     else:
-        # Fallback: everything after TITLE line
-        story = text
-        # Remove TITLE line
-        story = re.sub(r'\*{0,2}TITLE\*{0,2}\s*:[^\n]*\n?', '', story, flags=re.IGNORECASE)
-        # Remove STORY: marker
-        story = re.sub(r'\*{0,2}STORY\*{0,2}\s*:\s*\n?', '', story, flags=re.IGNORECASE)
-    
-    # Remove all moral-related lines from story
-    moral_removal_patterns = [
-        r'\*{0,2}MORAL\*{0,2}\s*:[^\n]*\n?',  # MORAL: text
-        r'\*{0,2}नीति\*{0,2}\s*:[^\n]*\n?',  # Hindi
-        r'\*{0,2}নীতিকথা\*{0,2}\s*:[^\n]*\n?',  # Bengali
-        r'\*{0,2}Moraleja\*{0,2}\s*:[^\n]*\n?',  # Spanish
-        r'\*{0,2}Morale\*{0,2}\s*:[^\n]*\n?',  # French/Italian
-        r'The moral of (?:the|this) story (?:is|:)[^\n]*\n?',  # Common English pattern
-        r'Moral of the story\s*:[^\n]*\n?',  # Another English pattern
-        r'\*{0,2}Lesson\*{0,2}\s*:[^\n]*\n?',  # Lesson: format
-        r'\*{0,2}Teaching\*{0,2}\s*:[^\n]*\n?',  # Teaching: format
-    ]
-    for pattern in moral_removal_patterns:
-        story = re.sub(pattern, '', story, flags=re.IGNORECASE)
-    
-    # Clean story
-    story = story.replace('**', '').strip()
-    
-    # Remove title from story if it appears at the beginning
-    if result["title"]:
-        lines = story.split('\n')
-        if lines and lines[0].strip().replace('*', '') == result["title"]:
-            story = '\n'.join(lines[1:]).strip()
-    
-    result["story"] = story
-    
-    # If still no title, take first non-empty line as title
-    if not result["title"] and result["story"]:
-        lines = result["story"].split('\n')
-        for i, line in enumerate(lines):
-            line_clean = line.replace('**', '').replace('*', '').strip()
-            if line_clean and 3 < len(line_clean) < 200:
-                if not line_clean.upper().startswith(('TITLE', 'STORY', 'MORAL', 'IN THE', 'ONCE', 'LONG AGO')):
-                    result["title"] = line_clean
-                    result["story"] = '\n'.join(lines[i+1:]).strip()
-                break
-    
-    # Final fallback - generate title from first sentence
-    if not result["title"] and result["story"]:
-        first_sentence = result["story"].split('.')[0]
-        if first_sentence and len(first_sentence) < 100:
-            result["title"] = first_sentence[:60] + "..." if len(first_sentence) > 60 else first_sentence
-    
-    if not result["title"]:
-        result["title"] = "A Unique Tale"
-    
-    if not result["story"]:
-        result["story"] = text
-    
-    return result
-
-# Translate story function using GROQ
-def translate_story(story_text, title, moral, target_language):
-    """Translate the story to target language using GROQ API."""
-    
-    prompt = f"""Translate the following story into {target_language}. 
-Maintain the emotional tone, cultural essence, and storytelling style.
-Translate ONLY the content, do not add any explanations or notes.
-
-TITLE (translate this):
-{title}
+        st.link_button(label, media_url(path, download=file_name))
 
-STORY (translate this):
-{story_text}
+# Process pool for video renders, shared by every session of this server
+RENDER_WORKERS = int(os.getenv("IKSHANAM_RENDER_WORKERS", "2"))
 
-MORAL (translate this):
-{moral}
+@st.cache_resource
+def get_render_jobs():
+    return RenderJobs(OUTPUT_DIR / "jobs", max_workers=RENDER_WORKERS)
 
-Provide the translation in this exact format:
-TITLE: [translated title]
-
-STORY:
-[translated story]
-
-MORAL: [translated moral]
-"""
-    
-    try:
-        client = Groq(api_key=api_key)
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": f"You are an expert translator specializing in {target_language}. Translate with cultural sensitivity and maintain the storytelling essence."
-                },
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # Lower temperature for more accurate translation
-            max_tokens=3000
-        )
-        return response.choices[0].message.content, None
-    except Exception as e:
-        return None, str(e)
-
-# Analyze text sentiment for voice selection
-def analyze_story_mood(text):
-    """Analyze story mood using TextBlob for voice selection."""
-    if TEXTBLOB_AVAILABLE:
-        try:
-            blob = TextBlob(text[:1000])  # Analyze first 1000 chars
-            polarity = blob.sentiment.polarity
-            if polarity > 0.2:
-                return "positive"
-            elif polarity < -0.2:
-                return "dramatic"
-            return "neutral"
-        except:
-            return "neutral"
-    return "neutral"
-
-# Generate audio function with natural neural voices
-def generate_audio(text, output_path, voice_id=None):
-    """Generate audio using Edge TTS (Microsoft neural voices) or gTTS fallback.
-    
-    Args:
-        text: The text to convert to speech
-        output_path: Path to save the audio file
-        voice_id: Specific voice ID to use (e.g., 'en-US-JennyNeural')
-    """
-    
-    # Try Edge TTS first (much more natural sounding)
-    if EDGE_TTS_AVAILABLE:
-        try:
-            # Use provided voice or default based on mood
-            if voice_id:
-                voice = voice_id
-                rate = "+0%"
-            else:
-                # Analyze mood for voice selection (fallback)
-                mood = analyze_story_mood(text)
-                if mood == "positive":
-                    voice = "en-US-AriaNeural"
-                    rate = "+5%"
-                elif mood == "dramatic":
-                    voice = "en-GB-SoniaNeural"
-                    rate = "-10%"
-                else:
-                    voice = "en-US-JennyNeural"
-                    rate = "+0%"
-            
-            # Create async function for edge-tts
-            async def generate():
-                communicate = edge_tts.Communicate(text, voice, rate=rate)
-                await communicate.save(output_path)
-            
-            # Run the async function
-            asyncio.run(generate())
-            return output_path, None
-            
-        except Exception as e:
-            # Fall back to gTTS
-            pass
-    
-    # Fallback to gTTS
-    try:
-        tts = gTTS(text=text, lang='en', slow=False)
-        tts.save(output_path)
-        return output_path, None
-    except Exception as e:
-        return None, str(e)
+# Warm pool of ready stories for popular selections, shared by every session of this server
+@st.cache_resource
+def get_story_pool():
+    return StoryPool().start()
 
-# Generate video function with FFmpeg for high quality
-def generate_video(story_data, output_dir, voice_id=None):
-    """Generate a high-quality story video using FFmpeg with transitions.
-    
-    Args:
-        story_data: dict with title, story, etc.
-        output_dir: directory to save output files
-        voice_id: optional voice ID for narration
-    """
-    
-    title = story_data['title']
-    story = story_data['story']
-    culture = st.session_state.get('culture', '🇮🇳 Indian')
-    
-    # Split story into scenes (paragraphs)
-    paragraphs = [p.strip() for p in story.split('\n') if p.strip()]
-    if not paragraphs:
-        paragraphs = [story[:300]]
-    
-    # Limit to 5 scenes
-    scenes = paragraphs[:5]
-    
-    try:
-        # Create temp directory
-        temp_dir = Path(output_dir)
-        temp_dir.mkdir(exist_ok=True)
-        
-        # Generate audio first with selected voice
-        audio_path = temp_dir / "narration.mp3"
-        generate_audio(story, str(audio_path), voice_id=voice_id)
-        
-        # Get audio duration - try multiple methods
-        audio_duration = 30  # Default fallback
-        
-        # Try MoviePy first (most reliable)
-        if MOVIEPY_AVAILABLE:
-            try:
-                audio_clip = AudioFileClip(str(audio_path))
-                audio_duration = audio_clip.duration
-                audio_clip.close()
-            except:
-                pass
-        # Try FFmpeg probe as backup
-        elif FFMPEG_AVAILABLE:
-            try:
-                probe = ffmpeg.probe(str(audio_path))
-                audio_duration = float(probe['streams'][0]['duration'])
-            except:
-                pass
-        
-        scene_duration = audio_duration / len(scenes)
-        
-        # Generate a SINGLE AI scenery image for the entire video
-        culture_short = culture.split(' ', 1)[1] if ' ' in culture else culture
-        image_paths = []
-        
-        # Create a single background image for the whole video
-        single_img_path = temp_dir / "background.png"
-        
-        # Use the title and culture to create a visual prompt
-        import time
-        scene_seed = int(time.time() * 1000)
-        
-        # Create visual prompt based on the story title and culture
-        visual_prompt = f"Cinematic illustration for '{title}'. {culture_short} cultural style, beautiful scenery, dramatic lighting, fantasy art, painterly style, no text, 4k quality"
-        encoded_prompt = urllib.parse.quote(visual_prompt)
-        
-        # Fetch AI-generated image from Pollinations.ai (single attempt)
-        img_loaded = False
-        try:
-            img_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=854&height=480&nologo=true&seed={scene_seed}"
-            response = requests.get(img_url, timeout=60)
-            
-            if response.status_code == 200 and len(response.content) > 1000:
-                # Load AI image
-                ai_img = Image.open(BytesIO(response.content)).convert('RGB')
-                ai_img = ai_img.resize((854, 480), Image.Resampling.LANCZOS)
-                ai_img.save(str(single_img_path), quality=95)
-                img_loaded = True
-        except Exception as e:
-            pass  # Will use fallback
-        
-        # Fallback: create beautiful gradient background if AI image failed
-        if not img_loaded:
-            gradient_colors = {
-                'Indian': [(255, 153, 51), (128, 0, 128)],
-                'Japanese': [(255, 183, 197), (100, 149, 237)],
-                'African': [(255, 140, 0), (139, 69, 19)],
-                'Celtic': [(34, 139, 34), (75, 0, 130)],
-                'Chinese': [(255, 0, 0), (255, 215, 0)],
-                'Greek': [(30, 144, 255), (255, 255, 255)],
-                'Egyptian': [(255, 215, 0), (139, 69, 19)],
-                'Native American': [(210, 105, 30), (34, 139, 34)],
-            }
-            colors = gradient_colors.get(culture_short, [(50, 50, 100), (100, 50, 80)])
-            
-            fallback_img = Image.new('RGB', (854, 480))
-            for y in range(480):
-                ratio = y / 480
-                r = int(colors[0][0] * (1 - ratio) + colors[1][0] * ratio)
-                g = int(colors[0][1] * (1 - ratio) + colors[1][1] * ratio)
-                b = int(colors[0][2] * (1 - ratio) + colors[1][2] * ratio)
-                for x in range(854):
-                    fallback_img.putpixel((x, y), (r, g, b))
-            
-            fallback_img.save(str(single_img_path), quality=95)
-        
-        # Use the same image for all scenes
-        for i in range(len(scenes)):
-            image_paths.append(str(single_img_path))
-        
-        # Generate SRT subtitle file - one sentence at a time
-        srt_path = temp_dir / "captions.srt"
-        
-        # Format time as HH:MM:SS,mmm
-        def format_srt_time(seconds):
-            hours = int(seconds // 3600)
-            minutes = int((seconds % 3600) // 60)
-            secs = int(seconds % 60)
-            millis = int((seconds % 1) * 1000)
-            return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
-        
-        # Split all text into sentences
-        import re
-        all_sentences = []
-        for scene_text in scenes:
-            # Split by sentence-ending punctuation
-            sentences = re.split(r'(?<=[.!?])\s+', scene_text.strip())
-            sentences = [s.strip() for s in sentences if s.strip()]
-            all_sentences.extend(sentences)
-        
-        # Calculate time per sentence based on word count (better sync)
-        # Estimate speaking rate: ~150 words per minute = 2.5 words per second
-        total_words = sum(len(s.split()) for s in all_sentences)
-        if total_words > 0:
-            time_per_word = audio_duration / total_words
-        else:
-            time_per_word = 0.4  # Default: 0.4 seconds per word
-        
-        with open(srt_path, 'w', encoding='utf-8') as srt_file:
-            current_time = 0
-            for i, sentence in enumerate(all_sentences):
-                word_count = len(sentence.split())
-                sentence_duration = word_count * time_per_word
-                
-                # Exact timing - no overlap, no lead time
-                start_time = current_time
-                end_time = current_time + sentence_duration - 0.05  # Small gap to prevent overlap
-                current_time = current_time + sentence_duration
-                
-                # Write SRT entry - one sentence at a time
-                srt_file.write(f"{i + 1}\n")
-                srt_file.write(f"{format_srt_time(start_time)} --> {format_srt_time(end_time)}\n")
-                srt_file.write(f"{sentence}\n\n")
-        
-        video_path = temp_dir / "story_video.mp4"
-        temp_video = temp_dir / "temp_video.mp4"
-        
-        # Try Movis first for best quality with animations
-        if MOVIS_AVAILABLE:
-            try:
-                # Create composition with movis
-                composition = mv.Composition(size=(1280, 720), duration=audio_duration)
-                
-                # Add each scene with zoom animation and crossfade
-                for i, img_path in enumerate(image_paths):
-                    start_time = i * scene_duration
-                    
-                    # Create image layer with Ken Burns zoom effect
-                    layer = mv.layer.Image(img_path, duration=scene_duration + 0.5)  # Slight overlap for crossfade
-                    
-                    # Add subtle zoom animation (1.0 to 1.1 scale)
-                    layer.scale.enable_motion().extend([0, scene_duration], [1.0, 1.05])
-                    
-                    # Add layer to composition
-                    composition.add_layer(layer, name=f"scene_{i}", offset=start_time)
-                    
-                    # Add crossfade by controlling opacity
-                    if i > 0:
-                        layer.opacity.enable_motion().extend([0, 0.5], [0, 1.0])  # Fade in
-                
-                # Add audio track
-                audio_layer = mv.layer.Audio(str(audio_path))
-                composition.add_layer(audio_layer, name="narration")
-                
-                # Export video
-                video_path = temp_dir / "story_video.mp4"
-                composition.write_video(str(video_path), fps=30, codec="libx264", audio_codec="aac")
-                
-                # Cleanup images
-                for img_path in image_paths:
-                    if os.path.exists(img_path):
-                        os.remove(img_path)
-                
-                return str(video_path), str(srt_path), None
-                
-            except Exception as e:
-                pass  # Fall back to MoviePy
-        
-        # Fallback to MoviePy
-        if MOVIEPY_AVAILABLE:
-            try:
-                audio_clip = AudioFileClip(str(audio_path))
-                
-                clips = []
-                for i, img_path in enumerate(image_paths):
-                    clip = ImageClip(img_path).with_duration(scene_duration)
-                    clips.append(clip)
-                
-                final_clip = concatenate_videoclips(clips, method="compose")
-                final_clip = final_clip.with_audio(audio_clip)
-                
-                # Export video
-                video_path = temp_dir / "story_video.mp4"
-                final_clip.write_videofile(
-                    str(video_path),
-                    fps=24,
-                    codec='libx264',
-                    audio_codec='aac',
-                    logger=None
-                )
-                
-                final_clip.close()
-                audio_clip.close()
-                
-                # Cleanup images
-                for img_path in image_paths:
-                    if os.path.exists(img_path):
-                        os.remove(img_path)
-                
-                return str(video_path), str(srt_path), None
-                
-            except Exception as e:
-                pass  # Try next method
-        
-        # Fallback to imageio
-        if IMAGEIO_AVAILABLE:
-            fps = max(1, int(24 / scene_duration)) if scene_duration > 0 else 24
-            video_path = temp_dir / "story_video.mp4"
-            writer = imageio.get_writer(str(video_path), fps=24)
-            
-            for img_path in image_paths:
-                img = imageio.imread(img_path)
-                for _ in range(int(scene_duration * 24)):
-                    writer.append_data(img)
-            
-            writer.close()
-            
-            # Cleanup images
-            for img_path in image_paths:
-                if os.path.exists(img_path):
-                    os.remove(img_path)
-            
-            return str(video_path), str(srt_path), None
-        
-        return None, None, "No video library available"
-        
-    except Exception as e:
-        return None, None, str(e)
+get_story_pool()
 
 # Initialize session state
 if 'story_data' not in st.session_state:
@@ -1117,72 +507,90 @@ if 'audio_path' not in st.session_state:
     st.session_state['audio_path'] = None
 if 'video_path' not in st.session_state:
     st.session_state['video_path'] = None
-if 'vtt_content' not in st.session_state:
-    st.session_state['vtt_content'] = None
-if 'translated_story' not in st.session_state:
-    st.session_state['translated_story'] = None
+if 'vtt_path' not in st.session_state:
+    st.session_state['vtt_path'] = None
+if 'translations' not in st.session_state:
+    st.session_state['translations'] = {}
 if 'show_captions' not in st.session_state:
     st.session_state['show_captions'] = True
+if 'render_job' not in st.session_state:
+    st.session_state['render_job'] = None
+
+# After a browser refresh, pick the story and its render job back up from the URL
+if not st.session_state['story_data'] and st.query_params.get('render_job'):
+    job_story = get_render_jobs().story(st.query_params['render_job'])
+    if job_story:
+        st.session_state['story_data'] = job_story['story_data']
+        st.session_state['culture'] = job_story['culture']
+        st.session_state['render_job'] = st.query_params['render_job']
+    else:
+        del st.query_params['render_job']
+
+# Set while a render job is running; the page re-polls it at the end of the script
+poll_render_job = False
+
+# Placeholders holding the streamed story until the story page below redraws it
+stream_slots = ()
 
 # Main generate button
 if st.sidebar.button("🎬 Generate Story", type="primary", use_container_width=True):
     with st.spinner("✨ Weaving your cultural tale..."):
-        # Always generate story in English first
-        story_text, error = generate_story(culture, story_type, tone, "English", custom_prompt)
+        narrator_voice = current_narrator_voice()
+        
+        # Paint the title and finished paragraphs as soon as they arrive
+        on_update = None
+        narration = None
+        if STREAM_STORY:
+            stream_title = st.empty()
+            stream_body = st.empty()
+            last_paint = [0.0]
+            
+            def paint_stream(parser, new_paragraphs):
+                now = time.time()
+                if not new_paragraphs and now - last_paint[0] < 0.15:
+                    return
+                last_paint[0] = now
+                if parser.title:
+                    stream_title.markdown(f'<h2 class="story-title">📜 {parser.title}</h2>', unsafe_allow_html=True)
+                body = '<br>'.join(parser.paragraphs)
+                if parser.pending:
+                    body += ('<br>' if body else '') + parser.pending + ' ▌'
+                if body:
+                    stream_body.markdown(f'<div class="story-box">{body}</div>', unsafe_allow_html=True)
+            
+            # Pipeline mode: narrate English stories paragraph by paragraph while they are written
+            if narrate_while_writing and EDGE_TTS_AVAILABLE and story_language.lower() == "english":
+                narration = NarrationPipeline(narrator_voice)
+            
+            def on_stream_update(parser, new_paragraphs):
+                if narration:
+                    for paragraph in new_paragraphs:
+                        narration.submit(paragraph)
+                paint_stream(parser, new_paragraphs)
+            
+            on_update = on_stream_update
+        
+        # Popular selections come from the warm pool, factual ones from the story cache, the rest from Groq
+        parsed_story, story_source, error = new_story(
+            culture, story_type, tone, custom_prompt, language=story_language, voice=narrator_voice,
+            pool=get_story_pool(), on_update=on_update)
+        
+        if STREAM_STORY:
+            if error:
+                stream_title.empty()
+                stream_body.empty()
+            else:
+                # Keep the finished story on screen (without the cursor) until the story page replaces it
+                stream_title.markdown(f'<h2 class="story-title">📜 {parsed_story["title"]}</h2>', unsafe_allow_html=True)
+                stream_body.markdown(f'<div class="story-box">{parsed_story["story"].replace(chr(10), "<br>")}</div>', unsafe_allow_html=True)
+                stream_slots = (stream_title, stream_body)
+        if narration and (error or story_source != "generated"):
+            narration.close()
+            narration = None
         
         if error:
             st.error(f"❌ Error generating story: {error}")
         else:
-            # Parse the English story
-            parsed_story = parse_story(story_text)
-            
-            # Translate if non-English language selected (silently, as part of generation)
-            if story_language and story_language.lower() != "english" and TRANSLATOR_AVAILABLE:
-                try:
-                    # Create translator with target language
-                    translator = GoogleTranslator(source='en', target=story_language.lower())
-                    
-                    # Translate title
-                    if parsed_story['title'] and parsed_story['title'] != "A Unique Tale":
-                        translated_title = translator.translate(parsed_story['title'])
-                        if translated_title:
-                            parsed_story['title'] = translated_title
-                    
-                    # Translate story in chunks (Google Translate has character limits)
-                    if parsed_story['story']:
-                        full_story = parsed_story['story']
-                        # Split into smaller chunks (max ~4000 chars each)
-                        chunks = []
-                        current_chunk = ""
-                        for para in full_story.split('\n'):
-                            if len(current_chunk) + len(para) < 4000:
-                                current_chunk += para + '\n'
-                            else:
-                                if current_chunk:
-                                    chunks.append(current_chunk)
-                                current_chunk = para + '\n'
-                        if current_chunk:
-                            chunks.append(current_chunk)
-                        
-                        # Translate each chunk
-                        translated_chunks = []
-                        for chunk in chunks:
-                            if chunk.strip():
-                                translated = translator.translate(chunk.strip())
-                                if translated:
-                                    translated_chunks.append(translated)
-                        
-                        parsed_story['story'] = '\n'.join(translated_chunks)
-                    
-                    # Translate moral
-                    if parsed_story.get('moral'):
-                        translated_moral = translator.translate(parsed_story['moral'])
-                        if translated_moral:
-                            parsed_story['moral'] = translated_moral
-                            
-                except Exception as e:
-                    pass  # Silently fall back to English if translation fails
-            
             # Store in session state - reset media
             st.session_state['story_data'] = parsed_story
             st.session_state['culture'] = culture
@@ -1191,64 +599,40 @@ if st.sidebar.button("🎬 Generate Story", type="primary", use_container_width=
             st.session_state['story_language'] = story_language
             st.session_state['audio_path'] = None
             st.session_state['video_path'] = None
-            st.session_state['translated_story'] = None
+            st.session_state['translations'] = {}
             st.session_state['dictionary_input'] = ""  # Clear dictionary search field
             st.session_state['translation_input'] = ""  # Clear translation language field
             st.session_state['custom_image_prompt'] = ""  # Clear custom image prompt field
             st.session_state['generated_image'] = None  # Clear generated image
+            st.session_state['bg_image_url'] = ""
+            st.session_state['glossary'] = []
+            st.session_state['render_job'] = None
+            if 'render_job' in st.query_params:
+                del st.query_params['render_job']
             
-            # Auto-generate background image with unique seed and timeout
-            import time
-            import base64
-            unique_seed = int(time.time() * 1000)
-            culture_short = culture.split(' ', 1)[1] if ' ' in culture else culture
-            random_style = random.choice(["watercolor", "oil painting", "digital art", "fantasy art", "illustration", "concept art"])
-            img_prompt = f"Beautiful {random_style} for story '{parsed_story['title']}', {culture_short} cultural theme, mystical atmosphere, cinematic lighting, 4k quality, no text, unique composition"
-            encoded_prompt = urllib.parse.quote(img_prompt)
-            
-            # Server-side fetch with timeout
-            bg_image_data = None
-            try:
-                img_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=800&height=400&nologo=true&seed={unique_seed}"
-                response = requests.get(img_url, timeout=60)
-                if response.status_code == 200 and len(response.content) > 1000:
-                    # Convert to base64 for reliable display
-                    bg_image_data = base64.b64encode(response.content).decode('utf-8')
-            except Exception as e:
-                pass  # Will use fallback
-            
-            # Fallback: create gradient if AI image failed
-            if not bg_image_data:
-                gradient_colors = {
-                    'Indian': [(255, 153, 51), (128, 0, 128)],
-                    'Japanese': [(255, 183, 197), (100, 149, 237)],
-                    'African': [(255, 140, 0), (139, 69, 19)],
-                    'Celtic': [(34, 139, 34), (75, 0, 130)],
-                    'Chinese': [(255, 0, 0), (255, 215, 0)],
-                    'Greek': [(30, 144, 255), (255, 255, 255)],
-                    'Egyptian': [(255, 215, 0), (139, 69, 19)],
-                    'Native American': [(210, 105, 30), (34, 139, 34)],
-                }
-                colors = gradient_colors.get(culture_short, [(50, 50, 100), (100, 50, 80)])
-                
-                fallback_img = Image.new('RGB', (800, 400))
-                for y in range(400):
-                    ratio = y / 400
-                    r = int(colors[0][0] * (1 - ratio) + colors[1][0] * ratio)
-                    g = int(colors[0][1] * (1 - ratio) + colors[1][1] * ratio)
-                    b = int(colors[0][2] * (1 - ratio) + colors[1][2] * ratio)
-                    for x in range(800):
-                        fallback_img.putpixel((x, y), (r, g, b))
-                
-                # Convert fallback to base64
-                buffer = BytesIO()
-                fallback_img.save(buffer, format='PNG')
-                bg_image_data = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            
-            st.session_state['bg_image_url'] = f"data:image/png;base64,{bg_image_data}"
+            # Image, translation, narration and glossary only need the parsed story - run them side by side
+            # while the story is already on screen; each rerun collects the stages that have finished.
+            # Narration reads the translated text, so for other languages it starts once translation is done.
+            # Pooled stories are already translated; the video reuses the story's image prompt and seed.
+            if st.session_state.get('story_stages'):
+                st.session_state['story_stages'].cancel()
+            stages = StoryStages()
+            stages.submit("image", story_image_url, parsed_story, culture)
+            if needs_translation(parsed_story, story_language):
+                stages.submit("translation", localize, parsed_story, story_language)
+            elif narration:
+                stages.submit("narration", finish_narration, narration)
+            else:
+                stages.submit("narration", narrate_story, parsed_story['story'], narrator_voice)
+            # Resolve the story's rare words in the background, so looking them up is instant
+            if story_language.lower() == "english":
+                stages.submit("glossary", prefetch_glossary, parsed_story['story'])
+            st.session_state['story_stages'] = stages
 
 # Display story if available, otherwise show welcome page
 if st.session_state.get('story_data'):
+    for slot in stream_slots:
+        slot.empty()
     data = st.session_state['story_data']
     current_culture = st.session_state.get('culture', culture)
     current_type = st.session_state.get('story_type', story_type)
@@ -1285,43 +669,9 @@ if st.session_state.get('story_data'):
     
     # Moral - with translated label based on selected language
     if data['moral']:
-        # Dictionary of "Moral" translations
-        moral_translations = {
-            "english": "Moral",
-            "hindi": "नीति",
-            "bengali": "নীতিকথা",
-            "tamil": "நீதி",
-            "telugu": "నీతి",
-            "marathi": "नीति",
-            "gujarati": "નીતિ",
-            "kannada": "ನೀತಿ",
-            "malayalam": "സാരാംശം",
-            "punjabi": "ਸਿੱਖਿਆ",
-            "odia": "ନୀତି",
-            "sanskrit": "नीतिः",
-            "urdu": "سبق",
-            "maithili": "नीति",
-            "spanish": "Moraleja",
-            "french": "Morale",
-            "german": "Moral",
-            "italian": "Morale",
-            "portuguese": "Moral",
-            "russian": "Мораль",
-            "japanese": "教訓",
-            "chinese": "寓意",
-            "korean": "교훈",
-            "arabic": "العبرة",
-            "persian": "درس",
-            "turkish": "Ders",
-            "greek": "Ηθικό δίδαγμα",
-            "dutch": "Moraal",
-            "swedish": "Moral",
-            "polish": "Morał",
-        }
-        
         # Get the selected language and find translation
         selected_lang = st.session_state.get('story_language', 'English').lower()
-        moral_label = moral_translations.get(selected_lang, "Moral")
+        moral_label = MORAL_LABELS.get(selected_lang, "Moral")
         
         st.markdown(f"""
         <div class="moral-box">
@@ -1352,60 +702,17 @@ if st.session_state.get('story_data'):
     # Handle image generation
     if generate_image_btn:
         with st.spinner("🎨 Creating your image..."):
-            import time
-            import base64
             unique_seed = int(time.time() * 1000)
             current_culture = st.session_state.get('culture', culture)
-            culture_short = current_culture.split(' ', 1)[1] if ' ' in current_culture else current_culture
             
             # Use custom prompt if provided, otherwise generate story-relevant prompt
             if custom_image_prompt and custom_image_prompt.strip():
                 img_prompt = custom_image_prompt.strip()
             else:
-                random_style = random.choice(["watercolor", "oil painting", "digital art", "fantasy art", "illustration", "concept art"])
-                img_prompt = f"Beautiful {random_style} for story '{data['title']}', {culture_short} cultural theme, mystical atmosphere, cinematic lighting, 4k quality, no text, unique composition"
-            
-            encoded_prompt = urllib.parse.quote(img_prompt)
-            
-            # Server-side fetch with timeout
-            generated_image_data = None
-            try:
-                img_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=800&height=600&nologo=true&seed={unique_seed}"
-                response = requests.get(img_url, timeout=60)
-                if response.status_code == 200 and len(response.content) > 1000:
-                    generated_image_data = base64.b64encode(response.content).decode('utf-8')
-            except Exception as e:
-                pass  # Will use fallback
+                img_prompt = story_image_prompt(data['title'], current_culture)
             
-            # Fallback: create gradient if AI image failed
-            if not generated_image_data:
-                gradient_colors = {
-                    'Indian': [(255, 153, 51), (128, 0, 128)],
-                    'Japanese': [(255, 183, 197), (100, 149, 237)],
-                    'African': [(255, 140, 0), (139, 69, 19)],
-                    'Celtic': [(34, 139, 34), (75, 0, 130)],
-                    'Chinese': [(255, 0, 0), (255, 215, 0)],
-                    'Greek': [(30, 144, 255), (255, 255, 255)],
-                    'Egyptian': [(255, 215, 0), (139, 69, 19)],
-                    'Native American': [(210, 105, 30), (34, 139, 34)],
-                }
-                colors = gradient_colors.get(culture_short, [(50, 50, 100), (100, 50, 80)])
-                
-                fallback_img = Image.new('RGB', (800, 600))
-                for y in range(600):
-                    ratio = y / 600
-                    r = int(colors[0][0] * (1 - ratio) + colors[1][0] * ratio)
-                    g = int(colors[0][1] * (1 - ratio) + colors[1][1] * ratio)
-                    b = int(colors[0][2] * (1 - ratio) + colors[1][2] * ratio)
-                    for x in range(800):
-                        fallback_img.putpixel((x, y), (r, g, b))
-                
-                # Convert fallback to base64
-                buffer = BytesIO()
-                fallback_img.save(buffer, format='PNG')
-                generated_image_data = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            
-            st.session_state['generated_image'] = f"data:image/png;base64,{generated_image_data}"
+            # Fresh seed for every click; falls back to a gradient if the fetch fails
+            st.session_state['generated_image'] = image_data_url(fetch_image(img_prompt, (800, 600), unique_seed), current_culture, (800, 600))
             st.rerun()
     
     
@@ -1419,7 +726,8 @@ if st.session_state.get('story_data'):
         list(NARRATION_VOICES.keys()),
         index=0,
         horizontal=True,
-        label_visibility="collapsed"
+        label_visibility="collapsed",
+        key="narrator_voice"
     )
     selected_voice = NARRATION_VOICES[selected_voice_name]
     
@@ -1435,62 +743,67 @@ if st.session_state.get('story_data'):
     # Handle audio generation
     if audio_btn:
         with st.spinner("🎵 Creating audio narration..."):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
-                audio_path, error = generate_audio(data['story'], fp.name, voice_id=selected_voice)
-                if error:
-                    st.error(f"Audio error: {error}")
-                else:
-                    st.session_state['audio_path'] = audio_path
-                    st.rerun()
+            audio_path, _, error = generate_audio(data['story'], new_audio_file(), voice_id=selected_voice)
+            if error:
+                st.error(f"Audio error: {error}")
+            else:
+                st.session_state['audio_path'] = audio_path
+                st.rerun()
     
-    # Handle video generation
+    # Handle video generation - queue a background render so the session stays responsive
     if video_btn:
-        with st.spinner("🎬 Creating story video... This may take a minute."):
-            with tempfile.TemporaryDirectory() as temp_dir:
-                video_path, srt_path, error = generate_video(data, temp_dir, voice_id=selected_voice)
-                if error:
-                    st.error(f"Video error: {error}")
-                else:
-                    # Copy to persistent location
-                    output_dir = Path("outputs")
-                    output_dir.mkdir(exist_ok=True)
-                    import shutil
-                    
-                    # Save video
-                    final_video = output_dir / "story_video.mp4"
-                    shutil.copy(video_path, str(final_video))
-                    st.session_state['video_path'] = str(final_video)
-                    
-                    # Mark that we have a new video (to reset playback position)
-                    st.session_state['new_video_generated'] = True
-                    
-                    # Convert SRT to VTT and store content for HTML5 video subtitles
-                    if srt_path and os.path.exists(srt_path):
-                        final_srt = output_dir / "captions.srt"
-                        shutil.copy(srt_path, str(final_srt))
-                        
-                        # Convert SRT to VTT format for HTML5 video
-                        with open(srt_path, 'r', encoding='utf-8') as f:
-                            srt_content = f.read()
-                        
-                        # Convert SRT to VTT
-                        vtt_content = "WEBVTT\n\n"
-                        # Replace comma with period in timestamps (SRT uses comma, VTT uses period)
-                        vtt_content += srt_content.replace(',', '.')
-                        st.session_state['vtt_content'] = vtt_content
-                    
-                    st.rerun()
+        job_id = get_render_jobs().submit(data, voice_id=selected_voice, culture=st.session_state.get('culture', culture))
+        st.session_state['render_job'] = job_id
+        st.session_state['video_path'] = None
+        st.session_state['vtt_path'] = None
+        st.query_params['render_job'] = job_id  # Survives a browser refresh
+        st.rerun()
+    
+    # Follow the render job until its video is ready
+    render_job = st.session_state.get('render_job')
+    if render_job and not st.session_state.get('video_path'):
+        job = get_render_jobs().status(render_job)
+        if job is None:
+            st.session_state['render_job'] = None
+        elif job['state'] == "failed":
+            st.error(f"Video error: {job.get('error', 'Unknown error')}")
+            st.session_state['render_job'] = None
+        elif job['state'] == "done":
+            # The finished video stays in its job directory under outputs/
+            st.session_state['video_path'] = job['video_path']
+            
+            # Mark that we have a new video (to reset playback position)
+            st.session_state['new_video_generated'] = True
+            
+            # Convert SRT to a VTT file next to the video for HTML5 video subtitles
+            srt_path = job.get('srt_path')
+            if srt_path and os.path.exists(srt_path):
+                # Convert SRT to VTT format for HTML5 video
+                with open(srt_path, 'r', encoding='utf-8') as f:
+                    srt_content = f.read()
+                
+                # Convert SRT to VTT
+                vtt_content = "WEBVTT\n\n"
+                # Replace comma with period in timestamps (SRT uses comma, VTT uses period)
+                vtt_content += srt_content.replace(',', '.')
+                vtt_path = Path(srt_path).with_suffix(".vtt")
+                vtt_path.write_text(vtt_content, encoding='utf-8')
+                st.session_state['vtt_path'] = str(vtt_path)
+            
+            st.rerun()
+        else:
+            st.progress(job['percent'] / 100, text=f"🎬 {job['stage']}...")
+            poll_render_job = True
     
     # Display audio player
     if st.session_state.get('audio_path') and os.path.exists(st.session_state['audio_path']):
         st.markdown('<h4 class="section-header">🎧 Audio Narration</h4>', unsafe_allow_html=True)
-        st.audio(st.session_state['audio_path'])
-        with open(st.session_state['audio_path'], 'rb') as f:
-            st.download_button("⬇️ Download Audio", f.read(), "story_audio.mp3", "audio/mpeg", key="dl_audio")
+        st.audio(media_url(st.session_state['audio_path']) if use_media_server() else st.session_state['audio_path'])
+        media_download_button("⬇️ Download Audio", st.session_state['audio_path'], "story_audio.mp3")
     
     # Display video player with caption toggle
     has_video = st.session_state.get('video_path') and os.path.exists(st.session_state['video_path'])
-    has_captions = st.session_state.get('vtt_content') is not None
+    has_captions = bool(st.session_state.get('vtt_path')) and os.path.exists(st.session_state['vtt_path'])
     
     if has_video:
         st.markdown('<h4 class="section-header">🎥 Story Video</h4>', unsafe_allow_html=True)
@@ -1505,18 +818,13 @@ if st.session_state.get('story_data'):
         
         video_path = st.session_state['video_path']
         
-        # Read video file and encode to base64 for HTML5 player
-        import base64
-        with open(video_path, 'rb') as f:
-            video_bytes = f.read()
-        video_base64 = base64.b64encode(video_bytes).decode('utf-8')
+        # The player streams the video from the media server (Range requests, browser cache)
+        video_url = media_url(video_path)
         
-        # Create VTT data URL if captions are available
+        # Caption track, served the same way
         vtt_track = ""
         if has_captions and show_captions:
-            vtt_content = st.session_state['vtt_content']
-            vtt_base64 = base64.b64encode(vtt_content.encode('utf-8')).decode('utf-8')
-            vtt_track = f'''<track kind="subtitles" src="data:text/vtt;base64,{vtt_base64}" srclang="en" label="English" default>'''
+            vtt_track = f'''<track kind="subtitles" src="{media_url(st.session_state['vtt_path'])}" srclang="en" label="English" default>'''
         
         # Custom HTML5 video player with subtitle support and position persistence
         video_html = f'''
@@ -1547,8 +855,8 @@ if st.session_state.get('story_data'):
             }}
         </style>
         <div class="video-container">
-            <video id="storyVideo" controls>
-                <source src="data:video/mp4;base64,{video_base64}" type="video/mp4">
+            <video id="storyVideo" controls preload="metadata" crossorigin="anonymous">
+                <source src="{video_url}" type="video/mp4">
                 {vtt_track}
                 Your browser does not support the video tag.
             </video>
@@ -1615,14 +923,7 @@ if st.session_state.get('story_data'):
             st.session_state['new_video_generated'] = False
         
         # Download button
-        with open(video_path, 'rb') as f:
-            st.download_button(
-                "⬇️ Download Video",
-                f.read(), 
-                "story_video.mp4", 
-                "video/mp4", 
-                key="dl_video"
-            )
+        media_download_button("⬇️ Download Video", video_path, "story_video.mp4")
     
     st.divider()
 
@@ -1639,6 +940,8 @@ if st.session_state.get('story_data'):
     # Dictionary Lookup Section
     st.markdown('<h3 class="media-header">📖 Dictionary Lookup</h3>', unsafe_allow_html=True)
     st.markdown('<p style="color: #CCCCCC; font-size: 0.9rem;">Stuck somewhere? Look up the meaning of any word.</p>', unsafe_allow_html=True)
+    if st.session_state.get('glossary'):
+        st.caption(f"Words from this story: {', '.join(st.session_state['glossary'])}")
     
     # Dictionary input
     dict_col1, dict_col2 = st.columns([3, 1])
@@ -1658,14 +961,11 @@ if st.session_state.get('story_data'):
     if lookup_btn and word_to_lookup:
         with st.spinner(f"📖 Looking up '{word_to_lookup}'..."):
             try:
-                # Use Free Dictionary API
-                dict_url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word_to_lookup.strip().lower()}"
-                dict_response = requests.get(dict_url, timeout=10)
+                # Local WordNet index first (instant for glossary words), Free Dictionary API as a fallback
+                word_info, lookup_error = lookup_word(word_to_lookup)
                 
-                if dict_response.status_code == 200:
-                    dict_data = dict_response.json()
-                    if dict_data and len(dict_data) > 0:
-                        word_info = dict_data[0]
+                if not lookup_error:
+                    if word_info:
                         word = word_info.get('word', word_to_lookup)
                         
                         # Get phonetic - try main phonetic first, then phonetics array
@@ -1710,9 +1010,9 @@ if st.session_state.get('story_data'):
                         
                         st.markdown("</div>", unsafe_allow_html=True)
                     else:
-                        st.warning(f"No definition found for '{word_to_lookup}'")
+                        st.warning(f"Could not find '{word_to_lookup}' in the dictionary. Try another word.")
                 else:
-                    st.warning(f"Could not find '{word_to_lookup}' in the dictionary. Try another word.")
+                    st.error("Error looking up word: Please try again.")
             except Exception as e:
                 st.error(f"Error looking up word: Please try again.")
     
@@ -1727,7 +1027,7 @@ if st.session_state.get('story_data'):
     with trans_col1:
         target_language = st.text_input(
             "Enter target language",
-            placeholder="Enter the language of your choice, e.g. Maithili, French, etc...",
+            placeholder="Enter one or more languages, separated by commas, e.g. Maithili, French, Tamil...",
             label_visibility="collapsed",
             key="translation_input"
         )
@@ -1735,28 +1035,32 @@ if st.session_state.get('story_data'):
     with trans_col2:
         translate_btn = st.button("🔄 Translate", use_container_width=True, key="translate_btn")
     
-    # Handle translation
+    # Handle translation - every requested language at once; languages translated before come from the cache
     if translate_btn and target_language:
-        with st.spinner(f"🌐 Translating to {target_language}..."):
-            translated_text, error = translate_story(
-                data['story'],
-                data['title'],
-                data.get('moral', ''),
-                target_language
-            )
+        target_languages = [language.strip() for language in target_language.split(',') if language.strip()]
+        with st.spinner(f"🌐 Translating to {', '.join(target_languages)}..."):
+            results = translate_story_languages(data, target_languages)
+        translated = False
+        for language, (translated_data, error) in results.items():
             if error:
-                st.error(f"Translation error: {error}")
+                st.error(f"Translation error ({language}): {error}")
             else:
-                # Parse the translated text
-                translated_data = parse_story(translated_text)
-                st.session_state['translated_story'] = translated_data
-                st.session_state['translation_language'] = target_language
-                st.rerun()
+                st.session_state['translations'][language] = translated_data
+                if not translated:
+                    st.session_state['translation_language'] = language
+                    translated = True
+        if translated:
+            st.rerun()
     
-    # Display translated story if available
-    if st.session_state.get('translated_story'):
-        trans_data = st.session_state['translated_story']
-        trans_lang = st.session_state.get('translation_language', 'Translated')
+    # Display translated story if available - switching between translations needs no new request
+    translations = st.session_state.get('translations') or {}
+    if translations:
+        if st.session_state.get('translation_language') not in translations:
+            st.session_state['translation_language'] = next(iter(translations))
+        if len(translations) > 1:
+            st.radio("Translation", list(translations), horizontal=True, label_visibility="collapsed", key="translation_language")
+        trans_lang = st.session_state['translation_language']
+        trans_data = translations[trans_lang]
         
         st.markdown(f'<h4 class="section-header">📖 Story in {trans_lang}</h4>', unsafe_allow_html=True)
         
@@ -1781,7 +1085,6 @@ if st.session_state.get('story_data'):
 else:
     # Welcome Page - shown when no story has been generated yet
     # Display the Ikshanam logo image at the top - fits width, no stretching
-    import base64
     with open("Ikshanam.png", "rb") as img_file:
         img_base64 = base64.b64encode(img_file.read()).decode()
     st.markdown(f'''
@@ -1874,4 +1177,27 @@ st.markdown("""
 <div style="text-align: center; color: #CCCCCC; padding: 1rem;">
     <small>Powered by GROQ AI (Llama 3.3) • Built for Learning, by Anushtup Dutta</small>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Collect the story's finished stages; the rerun draws them (and keeps collecting until all are done)
+story_stages = st.session_state.get('story_stages')
+if story_stages:
+    for stage, result in story_stages.collect(timeout=1):
+        if stage == "image":
+            st.session_state['bg_image_url'] = result
+        elif stage == "translation":
+            st.session_state['story_data'] = result
+            story_stages.submit("narration", narrate_story, result['story'], current_narrator_voice())
+        elif stage == "narration":
+            st.session_state['audio_path'] = result
+        elif stage == "glossary":
+            st.session_state['glossary'] = result
+    if not story_stages.pending():
+        story_stages.close()
+        st.session_state['story_stages'] = None
+    st.rerun()
+
+# Poll the running render job without blocking the rest of the page
+if poll_render_job:
+    time.sleep(1)
+    st.rerun()
@@ -0,0 +1,49 @@
+"""Tests for the on-disk LRU cache in ikshanam.cache."""
+
+import os
+
+from ikshanam.cache import DiskCache
+
+
+def test_key_is_stable_and_input_sensitive():
+    assert DiskCache.key("narration", "text", 1) == DiskCache.key("narration", "text", 1)
+    assert DiskCache.key("narration", "text", 1) != DiskCache.key("narration", "text", 2)
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1024)
+    path = cache.put_bytes("a", b"hello", ".txt")
+    assert path == tmp_path / "a.txt"
+    assert cache.get_bytes("a", ".txt") == b"hello"
+    assert cache.get_bytes("missing", ".txt") is None
+
+
+def test_put_file_copies_into_the_cache(tmp_path):
+    source = tmp_path / "source.mp3"
+    source.write_bytes(b"frames")
+    cache = DiskCache(tmp_path / "cache", max_bytes=1024)
+    cache.put_file("n", source, ".mp3")
+    assert cache.get_bytes("n", ".mp3") == b"frames"
+
+
+def test_eviction_removes_least_recently_used_first(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=250)
+    for i, name in enumerate("abc"):
+        cache.put_bytes(name, b"x" * 100)
+        os.utime(tmp_path / name, (1000 + i, 1000 + i))
+    # c pushed the cache over its cap, so a (the oldest) is gone
+    assert cache.get("a") is None
+    # Reading b makes it the most recently used; the next put evicts c instead
+    assert cache.get("b") is not None
+    cache.put_bytes("d", b"x" * 100)
+    assert cache.get("c") is None
+    assert cache.get_bytes("b") == b"x" * 100
+    assert cache.get_bytes("d") == b"x" * 100
+
+
+def test_eviction_ignores_temporary_files(tmp_path):
+    (tmp_path / "partial.tmp").write_bytes(b"x" * 1000)
+    cache = DiskCache(tmp_path, max_bytes=150)
+    cache.put_bytes("a", b"x" * 100)
+    assert cache.get("a") is not None
+    assert (tmp_path / "partial.tmp").exists()
@@ -0,0 +1,57 @@
+"""Tests for caption and scene timing in ikshanam.media."""
+
+import pytest
+
+from ikshanam.media import align_sentence_starts, build_caption_cues, build_scene_timeline, split_caption_sentences
+
+
+def words_for(text, start=0.0, step=0.5):
+    """Fake WordBoundary events, one word every step seconds."""
+    return [[start + i * step, start + (i + 1) * step, word] for i, word in enumerate(text.split())]
+
+
+def test_split_caption_sentences_keeps_paragraph_index():
+    sentences = split_caption_sentences(["One. Two!", "Three?"])
+    assert sentences == [(0, "One."), (0, "Two!"), (1, "Three?")]
+
+
+def test_align_sentence_starts_ignores_punctuation_differences():
+    sentences = ["Hello, world.", "It's a fine day!"]
+    # TTS tokenizes "It's" as two words and drops the punctuation
+    words = [[0.0, 0.4, "Hello"], [0.4, 0.9, "world"], [1.2, 1.4, "It"], [1.4, 1.5, "s"],
+             [1.5, 1.7, "a"], [1.7, 2.0, "fine"], [2.0, 2.4, "day"]]
+    assert align_sentence_starts(sentences, words) == [0.0, 1.2]
+
+
+def test_align_sentence_starts_gives_up_when_words_run_out():
+    assert align_sentence_starts(["One two.", "Three."], words_for("One two")) is None
+
+
+def test_caption_cues_use_word_timing():
+    sentences = [(0, "The fox ran."), (1, "The moon rose high.")]
+    timing = {"duration": 4.0, "words": words_for("The fox ran The moon rose high", start=0.2)}
+    cues = build_caption_cues(sentences, 4.0, timing)
+    assert [cue[0] for cue in cues] == [0.2, pytest.approx(1.7)]
+    assert cues[0][1] == pytest.approx(1.65)  # Ends just before the next cue
+    assert cues[-1][1] == pytest.approx(3.95)
+    assert [(cue[2], cue[3]) for cue in cues] == sentences
+
+
+def test_caption_cues_fall_back_to_word_counts():
+    sentences = [(0, "One two three."), (0, "Four.")]
+    cues = build_caption_cues(sentences, 8.0)
+    assert [cue[0] for cue in cues] == [0, pytest.approx(6.0)]
+
+
+def test_scene_timeline_starts_scenes_at_their_first_cue():
+    cues = [(0.0, 1.0, 0, "a"), (1.0, 2.5, 0, "b"), (2.5, 4.0, 1, "c")]
+    starts, durations = build_scene_timeline(cues, [0, 2], 5.0)
+    assert starts == [0.0, 2.5]
+    assert durations == [2.5, 2.5]
+
+
+def test_scene_timeline_splits_evenly_without_usable_timing():
+    cues = [(0.0, 1.0, 0, "a"), (0.0, 1.0, 1, "b")]
+    starts, durations = build_scene_timeline(cues, [0, 1], 6.0)
+    assert starts == [0.0, 3.0]
+    assert durations == [3.0, 3.0]
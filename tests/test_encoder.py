@@ -0,0 +1,87 @@
+"""Tests for the ffmpeg filter graphs in ikshanam.encoder and the shots they are given (no ffmpeg needed)."""
+
+import pytest
+from PIL import Image
+
+from ikshanam import media
+from ikshanam.encoder import (
+    ANIMATED_FPS, FADE_SECONDS, animated_filter_graph, fit_filter, segment_filter_graph, slideshow_filter_graph,
+)
+
+
+@pytest.fixture
+def scene_images(tmp_path):
+    """Three scene images: one larger than the canvas, one smaller, one with an odd size."""
+    paths = []
+    for i, size in enumerate([(2560, 1440), (640, 480), (801, 601)]):
+        path = tmp_path / f"scene_{i}.png"
+        Image.new("RGB", size).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_fit_filter():
+    assert fit_filter((1280, 720)) == (
+        "scale=1280:720:force_original_aspect_ratio=increase,crop=1280:720,setsar=1,format=yuv420p"
+    )
+
+
+def test_animated_filter_graph(scene_images):
+    graph = animated_filter_graph(scene_images, [0.0, 4.0, 9.5], [4.0, 5.5, 3.0], size=(1280, 720))
+    chains = graph.split(';')
+    assert len(chains) == 5
+    # Larger images are shrunk to the canvas, smaller ones keep their size, and both are rounded to even
+    assert chains[0].startswith("[0:v]scale=2560:1440,") and "s=1280x720" in chains[0]
+    assert "s=640x480" in chains[1] and "pad=1280:720" in chains[1]
+    assert "s=800x600" in chains[2]
+    # Each scene runs on through the crossfade into the next one
+    assert f"d={round((4.0 + FADE_SECONDS) * ANIMATED_FPS)}:" in chains[0]
+    assert chains[3] == f"[scene0][scene1]xfade=transition=fade:duration={FADE_SECONDS}:offset=4.000[fade1]"
+    assert chains[4] == f"[fade1][scene2]xfade=transition=fade:duration={FADE_SECONDS}:offset=9.500[video]"
+
+
+def test_animated_filter_graph_single_scene(scene_images):
+    graph = animated_filter_graph(scene_images[:1], [0.0], [6.0])
+    assert graph.endswith(";[scene0]null[video]")
+    assert "xfade" not in graph
+
+
+def test_segment_filter_graph(scene_images):
+    first = segment_filter_graph(scene_images, 0, 120)
+    assert first.startswith("[0:v]") and first.endswith("[video]") and "xfade" not in first
+
+    chains = segment_filter_graph(scene_images, 2, 90).split(';')
+    fade_frames = round(FADE_SECONDS * ANIMATED_FPS)
+    # The previous scene is held at full zoom for the length of the crossfade
+    assert chains[0].startswith("[0:v]") and f"d={fade_frames}:" in chains[0] and "s=640x480" in chains[0]
+    assert "z='1.05'" in chains[0]
+    assert chains[1].startswith("[1:v]") and "d=90:" in chains[1] and "s=800x600" in chains[1]
+    assert chains[2] == f"[previous][scene]xfade=transition=fade:duration={fade_frames / ANIMATED_FPS:.3f}:offset=0[video]"
+
+
+def test_segment_filter_graph_short_scene(scene_images):
+    # A scene shorter than the crossfade fades in over its whole length
+    graph = segment_filter_graph(scene_images, 1, 5)
+    assert f"duration={5 / ANIMATED_FPS:.3f}:" in graph
+
+
+def test_slideshow_filter_graph():
+    fit = fit_filter((854, 480))
+    assert slideshow_filter_graph(3, size=(854, 480)) == (
+        f"[0:v]{fit}[scene0];[1:v]{fit}[scene1];[2:v]{fit}[scene2];"
+        "[scene0][scene1][scene2]concat=n=3:v=1:a=0[video]"
+    )
+
+
+def test_still_render_merges_repeated_images(monkeypatch):
+    calls = []
+    monkeypatch.setattr(media, "encode_still_video", lambda *args, **kwargs: calls.append(("still", args, kwargs)))
+    monkeypatch.setattr(media, "encode_slideshow_video", lambda *args, **kwargs: calls.append(("slideshow", args, kwargs)))
+
+    # Scenes that fell back to the story illustration share one shot
+    media.render_ffmpeg_still(["a.jpg", "a.jpg", "b.jpg", "b.jpg", "a.jpg"], "n.mp3", [0, 2, 4, 6, 8], [2] * 5, 10, "v.mp4")
+    media.render_ffmpeg_still(["a.jpg", "a.jpg"], "n.mp3", [0, 5], [5, 5], 10, "v.mp4")
+    assert calls == [
+        ("slideshow", (["a.jpg", "b.jpg", "a.jpg"], "n.mp3", "v.mp4", [0, 4, 8], 10), {}),
+        ("still", ("a.jpg", "n.mp3", "v.mp4"), {"duration": 10}),
+    ]
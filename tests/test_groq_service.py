@@ -0,0 +1,153 @@
+"""Tests for the rate limits and retries in ikshanam.groq_service (no Groq calls are made)."""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from ikshanam import groq_service
+from ikshanam.groq_service import GroqService, RateLimitWait, TokenBucket, _retry_after
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping moves the clock forward instead of blocking."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(groq_service, "time", clock)
+    monkeypatch.setattr(groq_service.random, "uniform", lambda low, high: high)
+    return clock
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def test_bucket_waits_for_its_debt(clock):
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0
+    # Callers queue in arrival order: each one waits for everything reserved before it
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(2) == pytest.approx(3.0)
+    clock.now += 3
+    assert bucket.reserve(0) == 0
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(per_minute=60, capacity=10)
+    bucket.reserve(10)
+    clock.now += 3600
+    assert bucket.reserve(10) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_bucket_refund(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.reserve(90)
+    bucket.refund(30)
+    assert bucket.reserve(0) == 0
+    bucket.refund(-5)
+    assert bucket.reserve(0) == 0
+
+
+def test_bucket_pause(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.pause(7)
+    bucket.pause(2)
+    assert bucket.reserve(1) == pytest.approx(7.0)
+    clock.now += 7
+    assert bucket.reserve(1) == 0
+
+
+def test_retry_after(clock):
+    assert _retry_after(APIError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert _retry_after(APIError(429, {"retry-after": "12"})) == 12
+    date = format_datetime(datetime.fromtimestamp(clock.now + 30, timezone.utc), usegmt=True)
+    assert _retry_after(APIError(429, {"retry-after": date})) == pytest.approx(30, abs=1)
+    assert _retry_after(APIError(429, {"retry-after": "soon"})) is None
+    assert _retry_after(APIError(429)) is None
+    assert _retry_after(ValueError("no response")) is None
+
+
+def fake_service(responses):
+    """A GroqService whose client returns (or raises) each of responses in turn."""
+    service = GroqService(requests_per_minute=60, tokens_per_minute=6000, max_wait=60, attempts=3)
+    calls = []
+
+    def create(**request):
+        calls.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    service.client = lambda: client
+    return service, calls
+
+
+REQUEST = {"model": "test-model", "messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 100}
+
+
+def test_retries_transient_errors(clock):
+    response = SimpleNamespace(usage=SimpleNamespace(total_tokens=150))
+    service, calls = fake_service([APIError(503), APIError(429, {"retry-after": "5"}), response])
+    assert service.chat_completion(**REQUEST) is response
+    assert len(calls) == 3
+    # Backoff after the 503; after the 429, jitter and then the rest of its retry-after as a budget wait
+    assert clock.slept == [1.0, 1.0, 4.0]
+    # Only the real usage stays charged
+    assert service.buckets("test-model")[1]._level == pytest.approx(6000 - 150)
+
+
+def test_does_not_retry_client_errors(clock):
+    service, calls = fake_service([APIError(400), SimpleNamespace(usage=None)])
+    with pytest.raises(APIError):
+        service.chat_completion(**REQUEST)
+    assert len(calls) == 1
+
+
+def test_gives_up_when_told_to_wait_too_long(clock):
+    service, calls = fake_service([APIError(429, {"retry-after": "600"})])
+    with pytest.raises(APIError):
+        service.chat_completion(**REQUEST)
+    assert len(calls) == 1
+
+
+def test_fails_fast_when_over_budget(clock):
+    service, calls = fake_service([])
+    service.buckets("test-model")[0].pause(120)
+    with pytest.raises(RateLimitWait):
+        service.chat_completion(**REQUEST)
+    assert calls == [] and clock.slept == []
+
+
+def test_stream_settles_after_it_is_consumed(clock):
+    chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="y" * 40))]) for _ in range(3)]
+    service, _ = fake_service([iter(chunks)])
+    stream = service.chat_completion(stream=True, **REQUEST)
+    tokens_bucket = service.buckets("test-model")[1]
+    assert tokens_bucket._level == pytest.approx(6000 - 200)
+    assert list(stream) == chunks
+    # 100 prompt tokens plus 120 streamed characters
+    assert tokens_bucket._level == pytest.approx(6000 - 130)
@@ -0,0 +1,94 @@
+"""Tests for master derivation and fetch coalescing in ikshanam.image_service (no network)."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from ikshanam.cache import DiskCache
+from ikshanam.image_service import ImageService
+
+
+def jpeg(size):
+    buffer = BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class CountingService(ImageService):
+    """Stands in for Pollinations: each download waits for release, then returns a JPEG (or fails)."""
+
+    def __init__(self, cache, fail=False):
+        super().__init__(cache)
+        self.downloads = []
+        self.release = threading.Event()
+        self.fail = fail
+
+    def _download(self, prompt, size, seed):
+        self.downloads.append((prompt, size, seed))
+        self.release.wait(5)
+        return None if self.fail else jpeg(size)
+
+
+@pytest.fixture
+def service(tmp_path):
+    return CountingService(DiskCache(tmp_path, max_bytes=16 * 1024 * 1024))
+
+
+def fetch_concurrently(service, requests):
+    """Start every fetch, let them pile up on the in-flight download, then release it."""
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        futures = [pool.submit(service.fetch, "A lantern on the Ganga", size, 7) for size in requests]
+        time.sleep(0.2)
+        service.release.set()
+        return [future.result() for future in futures]
+
+
+@pytest.mark.parametrize("size, derived", [
+    ((1024, 576), True),
+    ((800, 400), True),
+    ((854, 480), True),
+    ((800, 600), False),
+    ((1280, 720), False),
+])
+def test_derives(service, size, derived):
+    assert service.derives(size) is derived
+
+
+def test_page_and_video_sizes_share_one_upstream_fetch(service):
+    results = fetch_concurrently(service, [(800, 400), (854, 480)] * 4)
+    assert service.downloads == [("A lantern on the Ganga", (1024, 576), 7)]
+    assert [Image.open(BytesIO(result)).size for result in results] == [(800, 400), (854, 480)] * 4
+    assert service._inflight == {}
+    # Later requests are served from the cache
+    service.fetch("A lantern on the Ganga", (800, 400), 7)
+    service.fetch("A lantern on the Ganga", (640, 360), 7)
+    assert len(service.downloads) == 1
+
+
+def test_other_aspects_are_fetched_natively(service):
+    service.release.set()
+    image = service.fetch("A lantern on the Ganga", (800, 600), 7)
+    assert Image.open(BytesIO(image)).size == (800, 600)
+    assert service.downloads == [("A lantern on the Ganga", (800, 600), 7)]
+
+
+def test_different_seeds_are_different_images(service):
+    service.release.set()
+    service.fetch("A lantern on the Ganga", (800, 400), 7)
+    service.fetch("A lantern on the Ganga", (800, 400), 8)
+    assert [seed for _, _, seed in service.downloads] == [7, 8]
+
+
+def test_failed_fetch_is_not_cached_and_is_retried(tmp_path):
+    service = CountingService(DiskCache(tmp_path, max_bytes=16 * 1024 * 1024), fail=True)
+    assert fetch_concurrently(service, [(800, 400), (854, 480)] * 2) == [None] * 4
+    assert len(service.downloads) == 1
+    assert service._inflight == {}
+
+    service.fail = False
+    assert service.fetch("A lantern on the Ganga", (800, 400), 7) is not None
+    assert len(service.downloads) == 2
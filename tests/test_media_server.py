@@ -0,0 +1,89 @@
+"""Tests for Range serving and CORS in ikshanam.media_server."""
+
+import http.client
+
+import pytest
+
+from ikshanam.media_server import MediaRequestHandler, start_media_server
+
+BODY = bytes(range(256)) * 4  # 1024 bytes
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=1000-", (1000, 1023)),
+    ("bytes=-24", (1000, 1023)),
+    ("bytes=10-5000", (10, 1023)),
+    ("bytes=1024-", None),
+    ("bytes=5-1", None),
+    ("bytes=-0", None),
+    ("bytes=-", None),
+    ("items=0-1", None),
+])
+def test_parse_range(header, expected):
+    assert MediaRequestHandler._parse_range(header, len(BODY)) == expected
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "story.mp4").write_bytes(BODY)
+    (tmp_path / "notes.txt").write_text("not media")
+    server = start_media_server(tmp_path, port=0, allowed_origins=["http://localhost:8501"])
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, path, **headers):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def test_full_request(server):
+    response, body = request(server, "/story.mp4")
+    assert response.status == 200
+    assert response.getheader("Content-Type") == "video/mp4"
+    assert response.getheader("Accept-Ranges") == "bytes"
+    assert body == BODY
+
+
+def test_range_request(server):
+    response, body = request(server, "/story.mp4", Range="bytes=100-199")
+    assert response.status == 206
+    assert response.getheader("Content-Range") == f"bytes 100-199/{len(BODY)}"
+    assert body == BODY[100:200]
+
+
+def test_unsatisfiable_range(server):
+    response, _ = request(server, "/story.mp4", Range="bytes=5000-")
+    assert response.status == 416
+    assert response.getheader("Content-Range") == f"bytes */{len(BODY)}"
+
+
+def test_revalidation_returns_not_modified(server):
+    response, _ = request(server, "/story.mp4")
+    response, body = request(server, "/story.mp4", **{"If-None-Match": response.getheader("ETag")})
+    assert response.status == 304
+    assert body == b""
+
+
+def test_only_media_inside_the_root_is_served(server):
+    assert request(server, "/notes.txt")[0].status == 404
+    assert request(server, "/../story.mp4")[0].status == 404
+    assert request(server, "/missing.mp4")[0].status == 404
+
+
+def test_cors_only_for_allowed_origins(server):
+    allowed, _ = request(server, "/story.mp4", Origin="http://localhost:8501")
+    other, _ = request(server, "/story.mp4", Origin="http://example.com")
+    assert allowed.getheader("Access-Control-Allow-Origin") == "http://localhost:8501"
+    assert other.getheader("Access-Control-Allow-Origin") is None
+
+
+def test_download_sets_content_disposition(server):
+    response, _ = request(server, "/story.mp4?download=story_video.mp4")
+    assert response.getheader("Content-Disposition") == 'attachment; filename="story_video.mp4"'
@@ -0,0 +1,108 @@
+"""Tests for the story parsers in ikshanam.parser."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ikshanam.parser import StreamingStoryParser, parse_story, parse_story_json
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "benchmarks" / "parser_corpus.jsonl"
+CORPUS = [json.loads(line) for line in CORPUS_PATH.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def feed_in_chunks(parser, text, size):
+    """Feed text in fixed-size deltas, like a token stream; return every completed paragraph."""
+    completed = []
+    for i in range(0, len(text), size):
+        completed += parser.feed(text[i:i + size])
+    return completed + parser.close()
+
+
+COMPLETION = (
+    "TITLE: The Lantern of Varanasi\n"
+    "STORY:\n"
+    "Arjun sold clay lamps at the ghats.\n"
+    "\n"
+    "One monsoon night the river rose.\n"
+    "MORAL: The light we carry for others\n"
+    "guides us too."
+)
+
+
+def test_streaming_parser_splits_sections():
+    parser = StreamingStoryParser()
+    paragraphs = feed_in_chunks(parser, COMPLETION, 7)
+    assert parser.title == "The Lantern of Varanasi"
+    assert paragraphs == ["Arjun sold clay lamps at the ghats.", "One monsoon night the river rose."]
+    assert parser.paragraphs == paragraphs
+    assert parser.moral == "The light we carry for others guides us too."
+
+
+def test_streaming_parser_result_does_not_depend_on_chunking():
+    results = set()
+    for size in (1, 3, 16, len(COMPLETION)):
+        parser = StreamingStoryParser()
+        feed_in_chunks(parser, COMPLETION, size)
+        results.add((parser.title, tuple(parser.paragraphs), parser.moral))
+    assert len(results) == 1
+
+
+def test_streaming_parser_reports_paragraphs_as_lines_complete():
+    parser = StreamingStoryParser()
+    assert parser.feed("TITLE: A Tale\nSTORY:\nThe first line") == []
+    assert parser.pending == "The first line"
+    assert parser.feed(" ends here.\nThe second") == ["The first line ends here."]
+    assert parser.close() == ["The second"]
+
+
+def test_streaming_parser_hides_labels_while_they_are_written():
+    parser = StreamingStoryParser()
+    parser.feed("TITLE: A Tale\nSTORY:\nOnce.\nMORAL: Be ki")
+    assert parser.pending == ""
+
+
+def test_streaming_parser_takes_a_heading_as_title():
+    parser = StreamingStoryParser()
+    feed_in_chunks(parser, "# The Fox and the Moon\nThe fox looked up.\n", 5)
+    assert parser.title == "The Fox and the Moon"
+    assert parser.paragraphs == ["The fox looked up."]
+
+
+@pytest.mark.parametrize("sample", CORPUS, ids=[sample["name"] for sample in CORPUS])
+def test_parse_story_corpus(sample):
+    assert parse_story(sample["text"]) == sample["expected"]
+
+
+def test_parse_story_matches_streaming_parser():
+    parser = StreamingStoryParser()
+    feed_in_chunks(parser, COMPLETION, 5)
+    parsed_story = parse_story(COMPLETION)
+    assert parsed_story["title"] == parser.title
+    assert parsed_story["story"] == "\n\n".join(parser.paragraphs)
+
+
+def test_parse_story_json():
+    response = json.dumps({
+        "title": " The Jade Brush ",
+        "paragraphs": ["Li Wei owned a brush.", "  ", "It painted only the truth."],
+        "moral": "Truth is worth more than jade.",
+        "language": "English",
+    })
+    assert parse_story_json(response) == {
+        "title": "The Jade Brush",
+        "story": "Li Wei owned a brush.\n\nIt painted only the truth.",
+        "moral": "Truth is worth more than jade.",
+    }
+
+
+@pytest.mark.parametrize("response", [
+    "TITLE: not json",
+    "[]",
+    json.dumps({"title": "T", "paragraphs": "not a list", "moral": "", "language": "English"}),
+    json.dumps({"title": "T", "paragraphs": ["p"], "moral": ""}),
+    json.dumps({"title": " ", "paragraphs": ["p"], "moral": "", "language": "English"}),
+    json.dumps({"title": "T", "paragraphs": [" "], "moral": "", "language": "English"}),
+])
+def test_parse_story_json_rejects_invalid_responses(response):
+    assert parse_story_json(response) is None
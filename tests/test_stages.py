@@ -0,0 +1,66 @@
+"""Tests for the story stage runner in ikshanam.stages."""
+
+import threading
+
+from ikshanam.stages import StoryStages
+
+
+def collect_all(stages, on_result):
+    """Collect like the app's reruns do, calling on_result for each finished stage."""
+    results = {}
+    while stages.pending():
+        for name, result in stages.collect(timeout=5):
+            results[name] = result
+            on_result(name, result)
+    stages.close()
+    return results
+
+
+def test_collects_every_stage():
+    stages = StoryStages()
+    stages.submit("image", lambda: "image.jpg")
+    stages.submit("glossary", lambda words: sorted(words), ["b", "a"])
+    assert collect_all(stages, lambda name, result: None) == {"image": "image.jpg", "glossary": ["a", "b"]}
+
+
+def test_narration_chained_after_translation():
+    # A cached story's image and translation finish in the same collect window
+    both_done = threading.Barrier(3)
+
+    def finish(result):
+        both_done.wait()
+        return result
+
+    stages = StoryStages()
+    stages.submit("image", finish, "image.jpg")
+    stages.submit("translation", finish, {"story": "கதை"})
+    both_done.wait()
+
+    def on_result(name, result):
+        if name == "translation":
+            stages.submit("narration", lambda text: f"narration of {text}", result["story"])
+
+    results = collect_all(stages, on_result)
+    assert results["narration"] == "narration of கதை"
+    assert set(results) == {"image", "translation", "narration"}
+
+
+def test_collect_can_return_nothing_yet():
+    release = threading.Event()
+    stages = StoryStages()
+    stages.submit("image", release.wait)
+    assert stages.collect(timeout=0.01) == []
+    assert stages.pending()
+    release.set()
+    assert stages.collect(timeout=5) == [("image", True)]
+    assert not stages.pending()
+
+
+def test_cancel_drops_pending_stages():
+    release = threading.Event()
+    stages = StoryStages(max_workers=1)
+    stages.submit("image", release.wait)
+    stages.submit("translation", lambda: "never collected")
+    stages.cancel()
+    release.set()
+    assert not stages.pending()
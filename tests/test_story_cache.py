@@ -0,0 +1,84 @@
+"""Tests for the factual story variant cache in ikshanam.story_cache."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from ikshanam import story_cache
+from ikshanam.cache import DiskCache
+from ikshanam.story_cache import StoryCache
+
+SELECTION = ("🇮🇳 Indian", "Mythology", "Dramatic & Epic", "English", "")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(story_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return StoryCache(DiskCache(tmp_path, max_bytes=1024 * 1024), variants=3, ttl_seconds=3600, enabled=True)
+
+
+def variant(n):
+    return {"title": f"Telling {n}", "story": f"Story {n}.", "moral": "", "image_prompt": "p", "image_seed": n}
+
+
+def test_served_only_once_all_variants_exist(cache):
+    for n in range(2):
+        cache.put(*SELECTION, variant(n))
+        assert cache.get(*SELECTION) is None
+    cache.put(*SELECTION, variant(2))
+    assert cache.get(*SELECTION) == variant(0)
+
+
+def test_round_robin_through_the_variants(cache):
+    for n in range(3):
+        cache.put(*SELECTION, variant(n))
+    titles = [cache.get(*SELECTION)["title"] for _ in range(4)]
+    assert titles == ["Telling 0", "Telling 1", "Telling 2", "Telling 0"]
+
+
+def test_keeps_only_the_newest_variants(cache):
+    for n in range(5):
+        cache.put(*SELECTION, variant(n))
+    assert [cache.get(*SELECTION)["image_seed"] for _ in range(3)] == [2, 3, 4]
+
+
+def test_variants_expire_after_the_ttl(cache, clock):
+    for n in range(3):
+        cache.put(*SELECTION, variant(n))
+        clock.now += 1000
+    # The first variant is now 3000 seconds old; it expires first
+    clock.now += 700
+    assert cache.get(*SELECTION) is None
+    cache.put(*SELECTION, variant(3))
+    assert [cache.get(*SELECTION)["image_seed"] for _ in range(3)] == [1, 2, 3]
+
+
+def test_keys_are_normalized(cache):
+    for n in range(3):
+        cache.put(*SELECTION, variant(n))
+    assert cache.get("🇮🇳  indian", "MYTHOLOGY", "dramatic & epic ") is not None
+    assert cache.get("🇮🇳 Indian", "Mythology", "Dramatic & Epic", custom_prompt="about Karna") is None
+
+
+def test_only_factual_types_are_cached(cache):
+    selection = ("🇮🇳 Indian", "Folk Tale", "Child-friendly", "English", "")
+    for n in range(3):
+        cache.put(*selection, variant(n))
+    assert cache.get(*selection) is None
+
+
+def test_stores_only_story_fields_and_returns_copies(cache):
+    for n in range(3):
+        cache.put(*SELECTION, dict(variant(n), language="Tamil", audio_path="narration.mp3"))
+    story = cache.get(*SELECTION)
+    assert story == variant(0)
+    story["title"] = "Changed"
+    cache.get(*SELECTION)
+    cache.get(*SELECTION)
+    assert cache.get(*SELECTION)["title"] == "Telling 0"
@@ -0,0 +1,22 @@
+"""Tests for pooled story generation in ikshanam.story_pool (no Groq calls are made)."""
+
+from ikshanam import engine, story_pool
+from ikshanam.story_pool import StoryPool
+
+
+def test_pooled_story_illustrates_the_english_title(monkeypatch):
+    english_story = {"title": "The Lantern of Varanasi", "story": "Arjun sold lamps.", "moral": "Carry light."}
+    monkeypatch.setattr(story_pool, "generate_parsed_story", lambda *args: (dict(english_story), None))
+    monkeypatch.setattr(engine, "needs_translation", lambda parsed_story, language: True)
+    monkeypatch.setattr(engine, "translate_parsed_story",
+                        lambda parsed_story, language: dict(parsed_story, title="வாரணாசியின் விளக்கு"))
+    fetched = []
+    monkeypatch.setattr(story_pool, "story_image", lambda parsed_story, culture: fetched.append(parsed_story))
+
+    pooled_story = StoryPool(size=1, narration=False, configs=[])._make_story(
+        ("🇮🇳 Indian", "Folk Tale", "Child-friendly", "Tamil"), None)
+
+    assert pooled_story["title"] == "வாரணாசியின் விளக்கு"
+    assert "'The Lantern of Varanasi'" in pooled_story["image_prompt"]
+    assert isinstance(pooled_story["image_seed"], int)
+    assert fetched == [pooled_story]
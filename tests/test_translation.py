@@ -0,0 +1,115 @@
+"""Tests for request packing and the translation memory in ikshanam.translation."""
+
+import pytest
+
+from ikshanam.cache import DiskCache
+from ikshanam.translation import TranslationService, pack_lines, split_long
+
+
+class FakeTranslator(TranslationService):
+    """Translates by upper-casing each line and records every request it is sent."""
+
+    def __init__(self, cache, max_chars=100, merge_lines=False, fail=()):
+        super().__init__(cache, backend="fake", max_chars=max_chars, workers=1)
+        self.requests = []
+        self.merge_lines = merge_lines
+        self.fail = set(fail)
+
+    def _request(self, text, target):
+        self.requests.append(text)
+        if text in self.fail:
+            raise ConnectionError("translation failed")
+        if self.merge_lines and '\n' in text:
+            return text.upper().replace('\n', ' ')
+        return text.upper()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(tmp_path, max_bytes=1024 * 1024)
+
+
+def test_split_long_keeps_short_text_whole():
+    assert split_long("One. Two.", max_chars=20) == ["One. Two."]
+
+
+def test_split_long_at_sentence_boundaries():
+    text = "The river rose. Arjun held up his lamp. The child saw the light! Dawn came."
+    pieces = split_long(text, max_chars=40)
+    assert pieces == ["The river rose. Arjun held up his lamp.", "The child saw the light! Dawn came."]
+    assert all(len(piece) <= 40 for piece in pieces)
+
+
+def test_split_long_cuts_overlong_sentences_at_spaces():
+    text = "Short one. " + "word " * 20 + "end."
+    pieces = split_long(text, max_chars=30)
+    assert pieces[0] == "Short one."
+    assert all(len(piece) <= 30 for piece in pieces)
+    assert ' '.join(pieces).split() == text.split()
+
+
+def test_split_long_handles_devanagari_full_stops():
+    assert split_long("पहला वाक्य। दूसरा वाक्य।", max_chars=15) == ["पहला वाक्य।", "दूसरा वाक्य।"]
+
+
+def test_pack_lines():
+    assert pack_lines(["aaaa", "bbbb", "cccc", "dd"], max_chars=9) == [["aaaa", "bbbb"], ["cccc", "dd"]]
+    assert pack_lines(["a" * 20, "b"], max_chars=10) == [["a" * 20], ["b"]]
+    assert pack_lines([], max_chars=10) == []
+
+
+def test_translate_texts_packs_units_into_requests(cache):
+    translator = FakeTranslator(cache, max_chars=20)
+    assert translator.translate_texts(["title", "first line", "moral"], "Hindi") == ["TITLE", "FIRST LINE", "MORAL"]
+    assert translator.requests == ["title\nfirst line", "moral"]
+
+
+def test_translate_texts_falls_back_when_lines_do_not_match(cache):
+    translator = FakeTranslator(cache, merge_lines=True)
+    assert translator.translate_texts(["one", "two"], "hindi") == ["ONE", "TWO"]
+    assert translator.requests == ["one\ntwo", "one", "two"]
+
+
+def test_translate_texts_uses_the_translation_memory(cache):
+    FakeTranslator(cache).translate_texts(["one", "two"], "hindi")
+    translator = FakeTranslator(cache)
+    # Repeated units are translated once; remembered ones not at all
+    assert translator.translate_texts(["two", "three", "three", "one"], "Hindi") == ["TWO", "THREE", "THREE", "ONE"]
+    assert translator.requests == ["three"]
+    # The memory is per target language
+    translator.translate_texts(["one"], "tamil")
+    assert translator.requests == ["three", "one"]
+
+
+def test_failed_translations_are_none_and_not_remembered(cache):
+    translator = FakeTranslator(cache, fail={"two", "one\ntwo"})
+    assert translator.translate_texts(["one", "two"], "hindi") == ["ONE", None]
+    translator.fail.clear()
+    assert translator.translate_texts(["one", "two"], "hindi") == ["ONE", "TWO"]
+    assert translator.requests[-1] == "two"
+
+
+def test_translate_story(cache):
+    # The moral fails both packed with the last paragraph and on its own
+    translator = FakeTranslator(cache, max_chars=40, fail={"He waded in.\nMoral text.", "Moral text."})
+    parsed_story = {
+        "title": "The Lamp",
+        "story": "A boy sold lamps. The river rose high.\n\nHe waded in.",
+        "moral": "Moral text.",
+        "image_seed": 7,
+    }
+    translated_story = translator.translate_story(parsed_story, "hindi")
+    assert translated_story == {
+        "title": "THE LAMP",
+        "story": "A BOY SOLD LAMPS. THE RIVER ROSE HIGH.\n\nHE WADED IN.",
+        "moral": "Moral text.",
+        "image_seed": 7,
+    }
+    assert translator.requests[:2] == ["The Lamp", "A boy sold lamps. The river rose high."]
+    assert parsed_story["title"] == "The Lamp"
+
+
+def test_placeholder_title_is_kept(cache):
+    translator = FakeTranslator(cache)
+    assert translator.translate_story({"title": "A Unique Tale", "story": "Text.", "moral": ""}, "hindi")["title"] == "A Unique Tale"
+    assert translator.requests == ["Text."]